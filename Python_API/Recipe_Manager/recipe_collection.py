@@ -0,0 +1,307 @@
+'''
+RecipeCollection - Catalogo di ricette in formato colonnare
+
+Per cataloghi grandi (100k+ ricette) le ricette non vengono tenute come oggetti:
+il catalogo è un insieme di array piatti
+
+  • offsets    int64    inizio degli ingredienti di ogni ricetta (n + 1 valori)
+  • calories   float64  calorie di tutti gli ingredienti, ricetta dopo ricetta
+  • type_codes int8     tipo della ricetta (indice in RECIPE_TYPES)
+
+più la lista piatta dei nomi degli ingredienti e quella dei nomi delle ricette.
+Calorie totali, tempi di preparazione, calorie a porzione e ingredienti ad alto
+contenuto calorico sono calcolati con NumPy in un solo passaggio su tutto il
+catalogo; gli oggetti Recipe vengono creati solo quando servono.
+
+Uso:
+    from recipe_collection import RecipeCollection
+
+    catalog = RecipeCollection.from_recipes([tiramisu, carbonara, caprese])
+    metrics = catalog.metrics()
+    print(metrics['total_calories'], metrics['prep_time'])
+    print(catalog[1])  # Recipe ricostruita al volo
+
+Richiede NumPy (pip install numpy).
+'''
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from recipe_manager import (
+    Recipe, Dessert, MainDish, Appetizer, Salad, SERVINGS, HIGH_CALORIE_SHARE
+)
+
+# Tipi di ricetta supportati; il codice di tipo è l'indice nella tupla
+RECIPE_TYPES = (Dessert, MainDish, Appetizer, Salad)
+
+
+class RecipeCollection:
+    """
+    Catalogo colonnare di ricette.
+
+    Le ricette possono essere aggiunte una alla volta (add/extend) o a blocchi di
+    array (append_chunk, usato dai loader); i blocchi vengono uniti al primo
+    calcolo, e le metriche restano in cache fino all'inserimento successivo.
+
+    Args:
+        types: Classi di ricetta ammesse (devono definire base_prep_time e
+               prep_time_per_ingredient)
+
+    Raises:
+        TypeError: Se una classe non definisce i parametri del tempo di preparazione
+    """
+
+    def __init__(self, types: Sequence[type] = RECIPE_TYPES):
+        for cls in types:
+            if not hasattr(cls, 'base_prep_time') or not hasattr(cls, 'prep_time_per_ingredient'):
+                raise TypeError(
+                    f"'{cls.__name__}' must define base_prep_time and prep_time_per_ingredient"
+                )
+        self.types = tuple(types)
+        self._type_code = {cls: code for code, cls in enumerate(self.types)}
+        self._base_prep = np.array([cls.base_prep_time for cls in self.types], dtype=np.int64)
+        self._prep_per_ingredient = np.array(
+            [cls.prep_time_per_ingredient for cls in self.types], dtype=np.int64
+        )
+
+        self.names: List[str] = []
+        self.ingredients: List[str] = []
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._calories = np.zeros(0, dtype=np.float64)
+        self._type_codes = np.zeros(0, dtype=np.int8)
+        # Blocchi in attesa di essere uniti: (conteggi ingredienti, calorie, codici tipo)
+        self._pending: List[tuple] = []
+        self._metrics: Optional[Dict[str, np.ndarray]] = None
+
+    @classmethod
+    def from_recipes(cls, recipes: Iterable[Recipe], types: Sequence[type] = RECIPE_TYPES) -> 'RecipeCollection':
+        """Crea un catalogo da oggetti Recipe"""
+        collection = cls(types)
+        collection.extend(recipes)
+        return collection
+
+    # ------------------------------------------------------------------
+    # Inserimento
+    # ------------------------------------------------------------------
+
+    def type_code(self, recipe_type) -> int:
+        """Codice di una classe di ricetta (o del suo nome `type`, es. 'Dessert')"""
+        if isinstance(recipe_type, str):
+            for code, cls in enumerate(self.types):
+                if cls.type == recipe_type or cls.__name__ == recipe_type:
+                    return code
+            raise ValueError(f"Unknown recipe type: {recipe_type}")
+        try:
+            return self._type_code[recipe_type]
+        except KeyError:
+            raise ValueError(f"Unsupported recipe class: {recipe_type.__name__}") from None
+
+    def add(self, recipe: Recipe) -> None:
+        """Aggiunge una ricetta (già validata dal costruttore di Recipe)"""
+        self.extend([recipe])
+
+    def extend(self, recipes: Iterable[Recipe]) -> None:
+        """Aggiunge più ricette come un unico blocco"""
+        names, codes, counts, ingredients, calories = [], [], [], [], []
+        for recipe in recipes:
+            names.append(recipe.name)
+            # FrozenRecipe: le regole sono quelle della classe concreta da cui deriva
+            codes.append(self.type_code(getattr(recipe, 'recipe_class', type(recipe))))
+            counts.append(len(recipe.ingredients))
+            ingredients.extend(recipe.ingredients)
+            calories.extend(recipe.calories_per_ingredient)
+        if names:
+            self.append_chunk(names, codes, counts, ingredients, calories)
+
+    def append_chunk(self, names: Sequence[str], type_codes, ingredient_counts,
+                     ingredients: Sequence[str], calories) -> None:
+        """
+        Aggiunge un blocco di ricette già in forma colonnare.
+
+        Args:
+            names: Nome di ogni ricetta
+            type_codes: Codice di tipo di ogni ricetta
+            ingredient_counts: Numero di ingredienti di ogni ricetta
+            ingredients: Nomi degli ingredienti di tutte le ricette del blocco, in ordine
+            calories: Calorie degli ingredienti (stessa lunghezza di ingredients)
+
+        Raises:
+            ValueError: Se le lunghezze non sono coerenti o i valori non sono validi
+        """
+        type_codes = np.asarray(type_codes, dtype=np.int8)
+        counts = np.asarray(ingredient_counts, dtype=np.int64)
+        calories = np.asarray(calories, dtype=np.float64)
+        if not (len(names) == len(type_codes) == len(counts)):
+            raise ValueError("names, type_codes and ingredient_counts must have the same length")
+        if len(ingredients) != len(calories) or int(counts.sum()) != len(calories):
+            raise ValueError(
+                f"Mismatch: {len(ingredients)} ingredients, {len(calories)} calorie values, "
+                f"{int(counts.sum())} expected from ingredient_counts"
+            )
+        if (counts < 1).any():
+            raise ValueError("Recipe must have at least one ingredient")
+        if (calories < 0).any():
+            raise ValueError("Calories cannot be negative")
+        if ((type_codes < 0) | (type_codes >= len(self.types))).any():
+            raise ValueError("Unknown recipe type code")
+
+        self.names.extend(names)
+        self.ingredients.extend(ingredients)
+        self._pending.append((counts, calories, type_codes))
+        self._metrics = None
+
+    def _consolidate(self) -> None:
+        """Unisce i blocchi in attesa agli array del catalogo"""
+        if not self._pending:
+            return
+        counts = [chunk[0] for chunk in self._pending]
+        self._offsets = np.concatenate([self._offsets, self._offsets[-1] + np.cumsum(np.concatenate(counts))])
+        self._calories = np.concatenate([self._calories] + [chunk[1] for chunk in self._pending])
+        self._type_codes = np.concatenate([self._type_codes] + [chunk[2] for chunk in self._pending])
+        self._pending = []
+
+    # ------------------------------------------------------------------
+    # Array del catalogo
+    # ------------------------------------------------------------------
+
+    @property
+    def offsets(self) -> np.ndarray:
+        self._consolidate()
+        return self._offsets
+
+    @property
+    def calories(self) -> np.ndarray:
+        self._consolidate()
+        return self._calories
+
+    @property
+    def type_codes(self) -> np.ndarray:
+        self._consolidate()
+        return self._type_codes
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ------------------------------------------------------------------
+    # Analisi vettoriale
+    # ------------------------------------------------------------------
+
+    def metrics(self) -> Dict[str, np.ndarray]:
+        """
+        Metriche di tutte le ricette, calcolate in un solo passaggio.
+
+        Returns:
+            dict: Array di lunghezza len(self) {
+                'ingredients_count': int64,
+                'total_calories': float64,
+                'prep_time': int64 (minuti),
+                'calories_per_serving': float64,
+                'calorie_density': float64 (calorie medie per ingrediente),
+                'has_high_calorie_ingredient': bool
+            }
+        """
+        if self._metrics is not None:
+            return self._metrics
+        offsets, calories, codes = self.offsets, self.calories, self.type_codes
+        counts = np.diff(offsets)
+        if len(counts):
+            totals = np.add.reduceat(calories, offsets[:-1])
+            high = self.high_calorie_mask(totals)
+            has_high = np.logical_or.reduceat(high, offsets[:-1])
+        else:
+            totals = np.zeros(0, dtype=np.float64)
+            has_high = np.zeros(0, dtype=bool)
+        self._metrics = {
+            'ingredients_count': counts,
+            'total_calories': totals,
+            'prep_time': self._base_prep[codes] + self._prep_per_ingredient[codes] * counts,
+            'calories_per_serving': totals / SERVINGS,
+            'calorie_density': totals / np.maximum(counts, 1),
+            'has_high_calorie_ingredient': has_high
+        }
+        return self._metrics
+
+    def high_calorie_mask(self, totals: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per ogni ingrediente del catalogo: True se supera HIGH_CALORIE_SHARE del totale della ricetta"""
+        if totals is None:
+            totals = self.metrics()['total_calories']
+        per_ingredient_total = np.repeat(totals, np.diff(self.offsets))
+        return self.calories > per_ingredient_total * HIGH_CALORIE_SHARE
+
+    def total_calories(self) -> np.ndarray:
+        return self.metrics()['total_calories']
+
+    def prep_times(self) -> np.ndarray:
+        return self.metrics()['prep_time']
+
+    def calories_per_serving(self) -> np.ndarray:
+        return self.metrics()['calories_per_serving']
+
+    def high_calorie_flags(self) -> np.ndarray:
+        return self.metrics()['has_high_calorie_ingredient']
+
+    def top_k(self, k: int, metric: str = 'total_calories', largest: bool = False) -> np.ndarray:
+        """
+        Indici delle k ricette con i valori più piccoli (o più grandi) di una metrica.
+
+        Selezione con argpartition (O(n)) e ordinamento dei soli k risultati;
+        a parità di valore vince l'indice minore.
+
+        Args:
+            k: Numero di ricette
+            metric: Chiave di metrics() (es. 'prep_time', 'calorie_density')
+            largest: True per i valori più grandi
+        """
+        values = self.metrics()[metric]
+        keys = -values if largest else values
+        k = min(k, len(keys))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        if k < len(keys):
+            threshold = np.partition(keys, k - 1)[k - 1]
+            candidates = np.flatnonzero(keys <= threshold)
+        else:
+            candidates = np.arange(len(keys))
+        order = np.lexsort((candidates, keys[candidates]))
+        return candidates[order[:k]]
+
+    def analyze(self, index: int) -> Dict:
+        """Stessa analisi di Recipe.analyze() letta dalle metriche del catalogo"""
+        metrics = self.metrics()
+        start, end = self.offsets[index], self.offsets[index + 1]
+        total = float(metrics['total_calories'][index])
+        high = self.calories[start:end] > total * HIGH_CALORIE_SHARE
+        return {
+            'name': self.names[index],
+            'type': self.types[self.type_codes[index]].type,
+            'ingredients_count': int(end - start),
+            'total_calories': total,
+            'prep_time_minutes': int(metrics['prep_time'][index]),
+            'calories_per_serving': total / SERVINGS,
+            'high_calorie_ingredients': [
+                ing for ing, flag in zip(self.ingredients[start:end], high) if flag
+            ]
+        }
+
+    # ------------------------------------------------------------------
+    # Accesso alle ricette
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, index: int) -> Recipe:
+        """Ricostruisce la ricetta `index` come oggetto Recipe"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("recipe index out of range")
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        cls = self.types[self.type_codes[index]]
+        return cls(
+            ingredients=self.ingredients[start:end],
+            calories_per_ingredient=self.calories[start:end].tolist(),
+            name=self.names[index]
+        )
+
+    def __iter__(self) -> Iterator[Recipe]:
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,202 @@
+'''
+RecipeIndex - Indici per interrogare un RecipeCollection senza scansioni complete
+
+  • IngredientTable: interning dei nomi degli ingredienti (nome -> id intero);
+    il confronto ignora maiuscole e spazi ai bordi ('guanciale' == 'Guanciale ')
+  • indice invertito: id ingrediente -> id ricette ordinati (array NumPy)
+  • indici di range: ricette ordinate per calorie totali e per tempo di preparazione
+
+Una query con più ingredienti interseca le liste di ricette partendo dalla più
+corta; i filtri numerici vengono applicati sui candidati rimasti, oppure, senza
+ingredienti, con una ricerca binaria sull'indice di range.
+
+Uso:
+    from recipe_index import RecipeIndex
+
+    index = RecipeIndex(catalog)
+    ids = index.query(ingredients=['Guanciale'], max_calories=600)
+    for recipe in index.recipes(ids):
+        print(recipe)
+
+Richiede NumPy (pip install numpy).
+'''
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from recipe_manager import Recipe
+from recipe_collection import RecipeCollection
+
+
+class IngredientTable:
+    """Tabella di interning degli ingredienti: ogni nome distinto ha un id intero"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []  # nome come appare la prima volta
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.strip().casefold()
+
+    def intern(self, name: str) -> int:
+        """Id dell'ingrediente, assegnato al primo inserimento"""
+        key = self.normalize(name)
+        ingredient_id = self._ids.get(key)
+        if ingredient_id is None:
+            ingredient_id = self._ids[key] = len(self.names)
+            self.names.append(name)
+        return ingredient_id
+
+    def intern_many(self, names: Sequence[str]) -> np.ndarray:
+        """Id di una sequenza di nomi (ogni nome distinto viene normalizzato una volta)"""
+        ids = {name: self.intern(name) for name in dict.fromkeys(names)}
+        return np.fromiter(map(ids.__getitem__, names), dtype=np.int32, count=len(names))
+
+    def get(self, name: str) -> Optional[int]:
+        """Id di un ingrediente già visto (None se sconosciuto)"""
+        return self._ids.get(self.normalize(name))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return self.normalize(name) in self._ids
+
+
+class RecipeIndex:
+    """
+    Indice invertito per ingrediente e indici di range su un RecipeCollection.
+
+    L'indice si ricostruisce automaticamente alla prima query dopo che il
+    catalogo è cresciuto.
+
+    Args:
+        collection: Catalogo da indicizzare
+    """
+
+    def __init__(self, collection: RecipeCollection):
+        self.collection = collection
+        self.ingredients = IngredientTable()
+        self._indexed = -1
+        self.refresh()
+
+    def refresh(self) -> None:
+        """(Ri)costruisce gli indici se il catalogo è cambiato"""
+        collection = self.collection
+        if self._indexed == len(collection):
+            return
+        offsets = collection.offsets
+        metrics = collection.metrics()
+        n = len(collection)
+
+        # Indice invertito: coppie (ingrediente, ricetta) ordinate e senza ripetizioni
+        ingredient_ids = self.ingredients.intern_many(collection.ingredients)
+        recipe_ids = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+        pairs = np.sort(ingredient_ids.astype(np.int64) * max(n, 1) + recipe_ids)
+        pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))] if len(pairs) else pairs
+        self._posting_recipes = pairs % max(n, 1)
+        self._posting_starts = np.searchsorted(pairs // max(n, 1), np.arange(len(self.ingredients) + 1))
+
+        # Indici di range: permutazione ordinata e valori ordinati
+        self._range = {}
+        for metric in ('total_calories', 'prep_time'):
+            values = metrics[metric]
+            order = np.argsort(values, kind='stable')
+            self._range[metric] = (order, values[order])
+        self._metrics = metrics
+        self._type_codes = collection.type_codes
+        self._indexed = n
+
+    # ------------------------------------------------------------------
+    # Accesso agli indici
+    # ------------------------------------------------------------------
+
+    def postings(self, ingredient: str) -> np.ndarray:
+        """Id (ordinati) delle ricette che contengono l'ingrediente"""
+        self.refresh()
+        ingredient_id = self.ingredients.get(ingredient)
+        if ingredient_id is None or ingredient_id >= len(self._posting_starts) - 1:
+            return np.zeros(0, dtype=np.int64)
+        start, end = self._posting_starts[ingredient_id], self._posting_starts[ingredient_id + 1]
+        return self._posting_recipes[start:end]
+
+    def range(self, metric: str, low: Optional[float] = None, high: Optional[float] = None) -> np.ndarray:
+        """
+        Id (ordinati) delle ricette con low <= metrica <= high.
+
+        Args:
+            metric: 'total_calories' o 'prep_time'
+            low, high: Estremi inclusi (None = aperto)
+        """
+        self.refresh()
+        order, values = self._range[metric]
+        start = np.searchsorted(values, low, side='left') if low is not None else 0
+        end = np.searchsorted(values, high, side='right') if high is not None else len(values)
+        return np.sort(order[start:end])
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def query(self, ingredients: Sequence[str] = (), exclude: Sequence[str] = (),
+              min_calories: Optional[float] = None, max_calories: Optional[float] = None,
+              min_prep_time: Optional[int] = None, max_prep_time: Optional[int] = None,
+              recipe_type: Optional[str] = None) -> np.ndarray:
+        """
+        Ricette che soddisfano tutti i filtri.
+
+        Args:
+            ingredients: Ingredienti che devono essere tutti presenti
+            exclude: Ingredienti che non devono essere presenti
+            min_calories, max_calories: Calorie totali (estremi inclusi)
+            min_prep_time, max_prep_time: Tempo di preparazione in minuti (estremi inclusi)
+            recipe_type: Tipo di ricetta (es. 'Main Dish' o 'MainDish')
+
+        Returns:
+            np.ndarray: Id delle ricette in ordine crescente
+        """
+        self.refresh()
+        ranges = [
+            ('total_calories', min_calories, max_calories),
+            ('prep_time', min_prep_time, max_prep_time)
+        ]
+        ranges = [r for r in ranges if r[1] is not None or r[2] is not None]
+
+        if ingredients:
+            # Intersezione partendo dalla lista più corta
+            postings = sorted((self.postings(name) for name in ingredients), key=len)
+            candidates = postings[0]
+            for other in postings[1:]:
+                if not len(candidates):
+                    break
+                candidates = np.intersect1d(candidates, other, assume_unique=True)
+        elif ranges:
+            # Il range più selettivo dall'indice, gli altri come filtro
+            slices = sorted((self.range(*r) for r in ranges), key=len)
+            candidates = slices[0]
+        else:
+            candidates = np.arange(len(self.collection), dtype=np.int64)
+
+        mask = np.ones(len(candidates), dtype=bool)
+        for metric, low, high in ranges:
+            values = self._metrics[metric][candidates]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        if recipe_type is not None:
+            mask &= self._type_codes[candidates] == self.collection.type_code(recipe_type)
+        candidates = candidates[mask]
+
+        for name in exclude:
+            if not len(candidates):
+                break
+            candidates = np.setdiff1d(candidates, self.postings(name), assume_unique=True)
+        return candidates
+
+    def recipes(self, ids: Iterable[int]) -> Iterator[Recipe]:
+        """Ricette corrispondenti agli id, create al volo"""
+        for recipe_id in ids:
+            yield self.collection[int(recipe_id)]
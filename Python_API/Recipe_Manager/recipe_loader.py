@@ -0,0 +1,230 @@
+'''
+Caricamento in streaming di ricette da file JSON Lines o CSV
+
+Il file viene letto a blocchi di `chunk_size` righe: ogni blocco viene validato
+tutto insieme (conversione e controllo delle calorie vettoriali con NumPy) e
+aggiunto direttamente a un RecipeCollection, senza creare oggetti Recipe. Le
+righe non valide vengono scartate e riportate con numero di riga e motivo; la
+memoria usata dipende dalla dimensione del blocco, non da quella del file.
+
+Formati:
+    JSONL: {"name": "Carbonara", "type": "Main Dish",
+            "ingredients": ["Pasta", "Guanciale"], "calories_per_ingredient": [350, 420]}
+    CSV:   name,type,ingredients,calories_per_ingredient
+           Carbonara,Main Dish,Pasta;Guanciale,350;420
+
+Il tipo può essere il valore `type` della classe ('Main Dish') o il suo nome ('MainDish').
+
+Uso:
+    from recipe_loader import load_recipes
+
+    catalog, report = load_recipes('ricette.jsonl')
+    print(report.loaded, report.rejected, report.errors[:5])
+
+Richiede NumPy (pip install numpy).
+'''
+
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import IO, Iterator, List, Optional, Tuple, Union
+import csv
+import json
+import os
+
+import numpy as np
+
+from recipe_collection import RecipeCollection
+
+# Separatore degli elementi delle liste nelle celle CSV
+CSV_LIST_SEPARATOR = ';'
+# Colonne obbligatorie dei file CSV
+CSV_COLUMNS = ('name', 'type', 'ingredients', 'calories_per_ingredient')
+
+
+@dataclass
+class RowError:
+    """Riga scartata: numero di riga nel file (1 = prima riga) e motivo"""
+    line: int
+    message: str
+
+
+@dataclass
+class LoadReport:
+    """Esito di un caricamento (errori conservati fino a max_errors)"""
+    loaded: int = 0
+    rejected: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+
+def _jsonl_rows(f: IO[str]) -> Iterator[Tuple[int, object]]:
+    """(numero di riga, dizionario o eccezione) per ogni riga non vuota"""
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"invalid JSON: {e}")
+
+
+def _csv_rows(f: IO[str]) -> Iterator[Tuple[int, object]]:
+    """Come _jsonl_rows; le liste sono celle separate da CSV_LIST_SEPARATOR"""
+    reader = csv.DictReader(f)
+    for row in reader:
+        line_number = reader.line_num
+        try:
+            cells = {column: row[column] for column in CSV_COLUMNS}
+        except KeyError as e:
+            # Colonna assente nell'intestazione
+            yield line_number, ValueError(f"missing column {e}")
+            continue
+        # Riga più corta dell'intestazione: DictReader riempie le celle con None
+        empty = next((column for column, value in cells.items() if value is None), None)
+        if empty is not None:
+            yield line_number, ValueError(f"missing value in column '{empty}'")
+            continue
+        yield line_number, {
+            'name': cells['name'],
+            'type': cells['type'],
+            'ingredients': [item.strip() for item in cells['ingredients'].split(CSV_LIST_SEPARATOR)],
+            'calories_per_ingredient': cells['calories_per_ingredient'].split(CSV_LIST_SEPARATOR)
+        }
+
+
+def _parse_row(row, collection: RecipeCollection) -> tuple:
+    """Controlli strutturali di una riga; restituisce (nome, codice tipo, ingredienti, calorie)"""
+    if isinstance(row, Exception):
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError("row must be an object")
+    ingredients = row.get('ingredients')
+    calories = row.get('calories_per_ingredient', row.get('calories'))
+    if not isinstance(ingredients, list) or not isinstance(calories, list):
+        raise ValueError("ingredients and calories_per_ingredient must be lists")
+    if len(ingredients) != len(calories):
+        raise ValueError(f"Mismatch: {len(ingredients)} ingredients but {len(calories)} calorie values")
+    if not ingredients:
+        raise ValueError("Recipe must have at least one ingredient")
+    if not all(isinstance(ing, str) and ing for ing in ingredients):
+        raise ValueError("ingredient names must be non-empty strings")
+    # NumPy convertirebbe true/false in 1.0/0.0
+    if any(isinstance(cal, bool) for cal in calories):
+        raise ValueError("calorie values must be numbers")
+    name = row.get('name') or "Unnamed Recipe"
+    return str(name), collection.type_code(str(row.get('type'))), ingredients, calories
+
+
+def _to_float(values: list) -> np.ndarray:
+    return np.asarray([float(v) for v in values], dtype=np.float64)
+
+
+def _load_chunk(rows: List[Tuple[int, object]], collection: RecipeCollection,
+                report: LoadReport, max_errors: int) -> None:
+    """Valida un blocco di righe, aggiunge quelle valide al catalogo e registra le altre"""
+    errors: List[RowError] = []
+    report.loaded += _append_valid_rows(rows, collection, errors)
+    report.rejected += len(errors)
+    # Errori del blocco in ordine di riga
+    errors.sort(key=lambda error: error.line)
+    report.errors.extend(errors[:max(max_errors - len(report.errors), 0)])
+
+
+def _append_valid_rows(rows: List[Tuple[int, object]], collection: RecipeCollection,
+                       errors: List[RowError]) -> int:
+    """Validazione del blocco; restituisce il numero di ricette aggiunte"""
+    def reject(line_number: int, message: str) -> None:
+        errors.append(RowError(line_number, message))
+
+    lines, parsed = [], []
+    for line_number, row in rows:
+        try:
+            parsed.append(_parse_row(row, collection))
+            lines.append(line_number)
+        except ValueError as e:
+            reject(line_number, str(e))
+    if not parsed:
+        return 0
+
+    counts = np.fromiter((len(p[2]) for p in parsed), dtype=np.int64, count=len(parsed))
+    flat_calories = [cal for p in parsed for cal in p[3]]
+    valid = np.ones(len(parsed), dtype=bool)
+    try:
+        # Caso comune: tutto il blocco si converte in una volta
+        calories = np.asarray(flat_calories, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Altrimenti conversione per riga, per sapere quali righe scartare
+        pieces = []
+        for i, p in enumerate(parsed):
+            try:
+                pieces.append(_to_float(p[3]))
+            except (TypeError, ValueError):
+                valid[i] = False
+                reject(lines[i], "calorie values must be numbers")
+                pieces.append(np.zeros(len(p[3])))
+        calories = np.concatenate(pieces)
+
+    # Calorie negative o non finite: controllo vettoriale, riportato alle righe
+    bad_values = ~np.isfinite(calories) | (calories < 0)
+    if bad_values.any():
+        row_of_value = np.repeat(np.arange(len(parsed)), counts)
+        bad_rows = np.unique(row_of_value[bad_values])
+        for i in bad_rows[valid[bad_rows]]:
+            reject(lines[i], "Calories cannot be negative or non-finite")
+        valid[bad_rows] = False
+
+    if not valid.all():
+        keep = np.repeat(valid, counts)
+        calories = calories[keep]
+        parsed = [p for p, ok in zip(parsed, valid) if ok]
+        counts = counts[valid]
+    if parsed:
+        collection.append_chunk(
+            [p[0] for p in parsed],
+            [p[1] for p in parsed],
+            counts,
+            [ing for p in parsed for ing in p[2]],
+            calories
+        )
+    return len(parsed)
+
+
+def load_recipes(source: Union[str, IO[str]], collection: Optional[RecipeCollection] = None,
+                 file_format: Optional[str] = None, chunk_size: int = 10000,
+                 max_errors: int = 1000) -> Tuple[RecipeCollection, LoadReport]:
+    """
+    Carica ricette da un file JSONL o CSV in un RecipeCollection.
+
+    Args:
+        source: Percorso o file di testo già aperto
+        collection: Catalogo a cui aggiungere le ricette (default: nuovo)
+        file_format: 'jsonl' o 'csv' (default: dall'estensione del file)
+        chunk_size: Righe lette e validate per blocco
+        max_errors: Errori conservati nel report (il conteggio include tutti)
+
+    Returns:
+        tuple: (catalogo, LoadReport)
+
+    Raises:
+        ValueError: Se il formato non è riconosciuto
+    """
+    if file_format is None:
+        name = source if isinstance(source, str) else getattr(source, 'name', '')
+        extension = os.path.splitext(str(name))[1].lower()
+        file_format = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}.get(extension)
+    if file_format not in ('jsonl', 'csv'):
+        raise ValueError(f"Unknown recipe file format: {file_format}")
+
+    collection = collection if collection is not None else RecipeCollection()
+    report = LoadReport()
+    f = open(source, encoding='utf-8', newline='') if isinstance(source, str) else source
+    try:
+        rows = _jsonl_rows(f) if file_format == 'jsonl' else _csv_rows(f)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            _load_chunk(chunk, collection, report, max_errors)
+    finally:
+        if isinstance(source, str):
+            f.close()
+    return collection, report
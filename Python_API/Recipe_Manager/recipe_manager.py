@@ -30,8 +30,14 @@ License: MIT
 '''
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 from dataclasses import dataclass
+import heapq
+
+# Porzioni assunte per le calorie a porzione
+SERVINGS = 4
+# Un ingrediente è ad alto contenuto calorico se supera questa quota del totale
+HIGH_CALORIE_SHARE = 0.3
 
 
 # ============================================================================
@@ -126,11 +132,13 @@ class Recipe(ABC):
         Returns:
             list: Lista di dizionari con ingrediente e calorie
         """
+        # Totale calcolato una volta sola (non per ogni ingrediente)
+        total_cal = self.total_calories()
         return [
             {
                 'ingredient': ing,
                 'calories': cal,
-                'percentage': (cal / self.total_calories() * 100)
+                'percentage': (cal / total_cal * 100)
             }
             for ing, cal in zip(self.ingredients, self.calories_per_ingredient)
         ]
@@ -150,10 +158,10 @@ class Recipe(ABC):
             'ingredients_count': len(self.ingredients),
             'total_calories': total_cal,
             'prep_time_minutes': self.prep_time(),
-            'calories_per_serving': total_cal / 4,  # assume 4 porzioni
+            'calories_per_serving': total_cal / SERVINGS,
             'high_calorie_ingredients': [
                 ing for ing, cal in zip(self.ingredients, self.calories_per_ingredient)
-                if cal > total_cal * 0.3  # ingredienti >30% del totale
+                if cal > total_cal * HIGH_CALORIE_SHARE  # ingredienti >30% del totale
             ]
         }
 
@@ -170,6 +178,7 @@ class Dessert(Recipe):
     """
     type = "Dessert"
     base_prep_time = 30  # minuti
+    prep_time_per_ingredient = 10
     
     def total_calories(self) -> float:
         """Somma calorie di tutti gli ingredienti"""
@@ -177,7 +186,7 @@ class Dessert(Recipe):
     
     def prep_time(self) -> int:
         """Tempo base + 10 minuti per ingrediente (lavorazione complessa)"""
-        return self.base_prep_time + 10 * len(self.ingredients)
+        return self.base_prep_time + self.prep_time_per_ingredient * len(self.ingredients)
 
 
 class MainDish(Recipe):
@@ -188,6 +197,7 @@ class MainDish(Recipe):
     """
     type = "Main Dish"
     base_prep_time = 45  # minuti
+    prep_time_per_ingredient = 5
     
     def total_calories(self) -> float:
         """Somma calorie di tutti gli ingredienti"""
@@ -195,7 +205,7 @@ class MainDish(Recipe):
     
     def prep_time(self) -> int:
         """Tempo base + 5 minuti per ingrediente"""
-        return self.base_prep_time + 5 * len(self.ingredients)
+        return self.base_prep_time + self.prep_time_per_ingredient * len(self.ingredients)
 
 
 class Appetizer(Recipe):
@@ -206,13 +216,14 @@ class Appetizer(Recipe):
     """
     type = "Appetizer"
     base_prep_time = 15
+    prep_time_per_ingredient = 3
     
     def total_calories(self) -> float:
         return sum(self.calories_per_ingredient)
     
     def prep_time(self) -> int:
         """Preparazione più veloce"""
-        return self.base_prep_time + 3 * len(self.ingredients)
+        return self.base_prep_time + self.prep_time_per_ingredient * len(self.ingredients)
 
 
 class Salad(Recipe):
@@ -223,13 +234,275 @@ class Salad(Recipe):
     """
     type = "Salad"
     base_prep_time = 10
+    prep_time_per_ingredient = 2
     
     def total_calories(self) -> float:
         return sum(self.calories_per_ingredient)
     
     def prep_time(self) -> int:
         """Preparazione velocissima"""
-        return self.base_prep_time + 2 * len(self.ingredients)
+        return self.base_prep_time + self.prep_time_per_ingredient * len(self.ingredients)
+
+
+# ============================================================================
+# Ricette Immutabili
+# ============================================================================
+
+class FrozenRecipe:
+    """
+    Versione immutabile di una ricetta, con metriche memoizzate.
+    
+    Ingredienti e calorie sono tuple, gli attributi sono in __slots__ (niente
+    __dict__ per oggetto) e calorie totali, tempo, dettagli e analisi vengono
+    calcolati al primo utilizzo e poi riusati. Le "modifiche" (replace,
+    with_ingredient, without_ingredient) restituiscono una nuova ricetta, con
+    metriche da ricalcolare: i valori memoizzati non diventano mai obsoleti.
+    
+    È registrata come sottoclasse virtuale di Recipe, quindi funziona con
+    recipe_analyzer e compare_recipes.
+    
+    Args:
+        recipe_class: Classe concreta che definisce le regole (es. Dessert)
+        ingredients: Nomi ingredienti
+        calories_per_ingredient: Calorie per ogni ingrediente
+        name: Nome della ricetta
+    
+    Raises:
+        TypeError, ValueError: Come il costruttore di Recipe
+    """
+    __slots__ = (
+        'recipe_class', 'name', 'ingredients', 'calories_per_ingredient',
+        '_total_calories', '_prep_time', '_details', '_analysis'
+    )
+    
+    def __init__(self, recipe_class: type, ingredients, calories_per_ingredient,
+                 name: str = "Unnamed Recipe"):
+        # Validazione e regole di calcolo delegate alla classe concreta
+        source = recipe_class(list(ingredients), list(calories_per_ingredient), name)
+        set_attr = object.__setattr__
+        set_attr(self, 'recipe_class', recipe_class)
+        set_attr(self, 'name', name)
+        set_attr(self, 'ingredients', tuple(source.ingredients))
+        set_attr(self, 'calories_per_ingredient', tuple(source.calories_per_ingredient))
+        set_attr(self, '_total_calories', source.total_calories())
+        set_attr(self, '_prep_time', source.prep_time())
+        set_attr(self, '_details', None)
+        set_attr(self, '_analysis', None)
+    
+    @classmethod
+    def from_recipe(cls, recipe: Recipe) -> 'FrozenRecipe':
+        """Copia immutabile di una ricetta"""
+        if isinstance(recipe, FrozenRecipe):
+            return recipe
+        return cls(type(recipe), recipe.ingredients, recipe.calories_per_ingredient, recipe.name)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{type(self).__name__}' is immutable, use replace()")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"'{type(self).__name__}' is immutable")
+    
+    @property
+    def type(self) -> str:
+        return self.recipe_class.type
+    
+    def __str__(self):
+        return f"{self.name} ({self.type})"
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.recipe_class.__name__}, name='{self.name}', ingredients={len(self.ingredients)})"
+    
+    def __eq__(self, other):
+        if not isinstance(other, FrozenRecipe):
+            return NotImplemented
+        return self._key() == other._key()
+    
+    def __hash__(self):
+        return hash(self._key())
+    
+    def _key(self) -> tuple:
+        return (self.recipe_class, self.name, self.ingredients, self.calories_per_ingredient)
+    
+    def __reduce__(self):
+        # Pickle (es. verso un process pool) ricostruendo dal costruttore: __setattr__ è bloccato
+        return (type(self), (self.recipe_class, self.ingredients, self.calories_per_ingredient, self.name))
+    
+    # Metriche memoizzate
+    
+    def total_calories(self) -> float:
+        return self._total_calories
+    
+    def prep_time(self) -> int:
+        return self._prep_time
+    
+    def get_ingredient_details(self) -> List[Dict]:
+        """Come Recipe.get_ingredient_details (lista calcolata una volta, restituita in copia)"""
+        if self._details is None:
+            total_cal = self._total_calories
+            object.__setattr__(self, '_details', tuple(
+                {'ingredient': ing, 'calories': cal, 'percentage': cal / total_cal * 100}
+                for ing, cal in zip(self.ingredients, self.calories_per_ingredient)
+            ))
+        return [dict(detail) for detail in self._details]
+    
+    def analyze(self) -> Dict:
+        """Come Recipe.analyze (calcolata una volta, restituita in copia)"""
+        if self._analysis is None:
+            total_cal = self._total_calories
+            object.__setattr__(self, '_analysis', {
+                'name': self.name,
+                'type': self.type,
+                'ingredients_count': len(self.ingredients),
+                'total_calories': total_cal,
+                'prep_time_minutes': self._prep_time,
+                'calories_per_serving': total_cal / SERVINGS,
+                'high_calorie_ingredients': [
+                    ing for ing, cal in zip(self.ingredients, self.calories_per_ingredient)
+                    if cal > total_cal * HIGH_CALORIE_SHARE
+                ]
+            })
+        analysis = dict(self._analysis)
+        analysis['high_calorie_ingredients'] = list(analysis['high_calorie_ingredients'])
+        return analysis
+    
+    # "Modifiche": nuove istanze, con metriche ricalcolate
+    
+    def replace(self, **changes) -> 'FrozenRecipe':
+        """
+        Nuova ricetta con i campi indicati sostituiti.
+        
+        Args:
+            **changes: recipe_class, name, ingredients, calories_per_ingredient
+        """
+        fields = {
+            'recipe_class': self.recipe_class,
+            'ingredients': self.ingredients,
+            'calories_per_ingredient': self.calories_per_ingredient,
+            'name': self.name
+        }
+        unknown = set(changes) - set(fields)
+        if unknown:
+            raise TypeError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        fields.update(changes)
+        return type(self)(**fields)
+    
+    def with_ingredient(self, ingredient: str, calories: float) -> 'FrozenRecipe':
+        """Nuova ricetta con un ingrediente in più"""
+        return self.replace(
+            ingredients=self.ingredients + (ingredient,),
+            calories_per_ingredient=self.calories_per_ingredient + (calories,)
+        )
+    
+    def without_ingredient(self, ingredient: str) -> 'FrozenRecipe':
+        """
+        Nuova ricetta senza l'ingrediente indicato.
+        
+        Raises:
+            ValueError: Se l'ingrediente non è presente
+        """
+        index = self.ingredients.index(ingredient)
+        return self.replace(
+            ingredients=self.ingredients[:index] + self.ingredients[index + 1:],
+            calories_per_ingredient=self.calories_per_ingredient[:index] + self.calories_per_ingredient[index + 1:]
+        )
+
+
+Recipe.register(FrozenRecipe)
+
+
+def freeze(recipe: Recipe) -> FrozenRecipe:
+    """Scorciatoia per FrozenRecipe.from_recipe"""
+    return FrozenRecipe.from_recipe(recipe)
+
+
+# ============================================================================
+# Classifiche
+# ============================================================================
+
+# Metriche ordinabili: funzione che calcola il valore per una ricetta
+RANKING_METRICS = {
+    'calories': lambda r: r.total_calories(),
+    'prep_time': lambda r: r.prep_time(),
+    'ingredients': lambda r: len(r.ingredients),
+    # Densità calorica: calorie medie per ingrediente
+    'density': lambda r: r.total_calories() / len(r.ingredients),
+}
+
+
+class RecipeRanking:
+    """
+    Classifiche top-k su una lista di ricette.
+    
+    Ogni metrica viene calcolata una sola volta per ricetta (un passaggio per
+    metrica, al primo utilizzo) e le classifiche usano le chiavi precalcolate
+    con selezione a heap: O(n log k) invece di ordinare o di richiamare i metodi
+    delle ricette per ogni confronto.
+    
+    Args:
+        recipes: Ricette da classificare
+    """
+    
+    def __init__(self, recipes: Sequence[Recipe]):
+        self.recipes = list(recipes)
+        self._columns: Dict[str, List[float]] = {}
+    
+    def column(self, metric: str) -> List[float]:
+        """
+        Valori di una metrica per tutte le ricette (calcolati una volta).
+        
+        Raises:
+            ValueError: Se la metrica non è in RANKING_METRICS
+        """
+        values = self._columns.get(metric)
+        if values is None:
+            if metric not in RANKING_METRICS:
+                raise ValueError(
+                    f"Unknown metric '{metric}', choose from {', '.join(RANKING_METRICS)}"
+                )
+            values = self._columns[metric] = [RANKING_METRICS[metric](r) for r in self.recipes]
+        return values
+    
+    def top(self, k: int, *keys: str) -> List[Recipe]:
+        """
+        Le k ricette con le chiavi più piccole, a parità in ordine di lista.
+        
+        Args:
+            k: Numero di ricette
+            *keys: Metriche in ordine di priorità; il prefisso '-' inverte l'ordine
+                   (es. top(5, '-density', 'prep_time'): più dense, poi più veloci)
+        
+        Returns:
+            list: Ricette in ordine di classifica
+        """
+        return [self.recipes[i] for i in self.top_indices(k, *keys)]
+    
+    def top_indices(self, k: int, *keys: str) -> List[int]:
+        """Come top(), ma restituisce le posizioni nella lista"""
+        if not keys:
+            raise ValueError("At least one metric is required")
+        columns = []
+        for key in keys:
+            descending = key.startswith('-')
+            values = self.column(key.lstrip('-'))
+            columns.append([-v for v in values] if descending else values)
+        if len(columns) == 1:
+            sort_key = columns[0].__getitem__
+        else:
+            sort_keys = list(zip(*columns))
+            sort_key = sort_keys.__getitem__
+        return heapq.nsmallest(k, range(len(self.recipes)), key=sort_key)
+    
+    def lightest(self, k: int = 1) -> List[Recipe]:
+        return self.top(k, 'calories')
+    
+    def fastest(self, k: int = 1) -> List[Recipe]:
+        return self.top(k, 'prep_time')
+    
+    def simplest(self, k: int = 1) -> List[Recipe]:
+        return self.top(k, 'ingredients')
+    
+    def densest(self, k: int = 1) -> List[Recipe]:
+        return self.top(k, '-density')
 
 
 # ============================================================================
@@ -252,58 +525,60 @@ def recipe_analyzer(recipe: Recipe) -> str:
     if not isinstance(recipe, Recipe):
         raise TypeError("Argument must be a Recipe object")
     
+    # Report costruito come lista di pezzi, unita una volta sola alla fine
     # Header
-    output = f'\n{recipe.type:-^60}\n'
-    output += f'{recipe.name:^60}\n'
-    output += f'{"-" * 60}\n\n'
+    parts = [f'\n{recipe.type:-^60}\n']
+    parts.append(f'{recipe.name:^60}\n')
+    parts.append(f'{"-" * 60}\n\n')
     
     # Informazioni base
-    output += f'{"INFORMAZIONI GENERALI":-^60}\n\n'
-    output += f'{"Numero ingredienti:":<30} {len(recipe.ingredients):>29}\n'
+    parts.append(f'{"INFORMAZIONI GENERALI":-^60}\n\n')
+    parts.append(f'{"Numero ingredienti:":<30} {len(recipe.ingredients):>29}\n')
     
-    prep_time = recipe.prep_time()
+    # Metriche calcolate una volta e riusate in tutto il report
+    analysis = recipe.analyze()
+    prep_time = analysis['prep_time_minutes']
     hours, mins = divmod(prep_time, 60)
     if hours > 0:
         time_str = f"{hours}h {mins}min"
     else:
         time_str = f"{mins} min"
-    output += f'{"Tempo preparazione:":<30} {time_str:>29}\n'
+    parts.append(f'{"Tempo preparazione:":<30} {time_str:>29}\n')
     
     # Calorie
-    total_cal = recipe.total_calories()
-    output += f'\n{"INFORMAZIONI NUTRIZIONALI":-^60}\n\n'
-    output += f'{"Calorie totali:":<30} {total_cal:>24.0f} kcal\n'
-    output += f'{"Calorie per porzione (4):":<30} {total_cal/4:>24.0f} kcal\n'
+    total_cal = analysis['total_calories']
+    parts.append(f'\n{"INFORMAZIONI NUTRIZIONALI":-^60}\n\n')
+    parts.append(f'{"Calorie totali:":<30} {total_cal:>24.0f} kcal\n')
+    parts.append(f'{f"Calorie per porzione ({SERVINGS}):":<30} {total_cal/SERVINGS:>24.0f} kcal\n')
     
     # Classificazione calorica
-    output += f'{"Classificazione:":<30}'
+    parts.append(f'{"Classificazione:":<30}')
     if total_cal < 300:
-        output += f'{"⭐ Leggera":>29}\n'
+        parts.append(f'{"⭐ Leggera":>29}\n')
     elif total_cal < 600:
-        output += f'{"⭐⭐ Moderata":>29}\n'
+        parts.append(f'{"⭐⭐ Moderata":>29}\n')
     elif total_cal < 900:
-        output += f'{"⭐⭐⭐ Sostanziosa":>29}\n'
+        parts.append(f'{"⭐⭐⭐ Sostanziosa":>29}\n')
     else:
-        output += f'{"⭐⭐⭐⭐ Molto calorica":>29}\n'
+        parts.append(f'{"⭐⭐⭐⭐ Molto calorica":>29}\n')
     
     # Dettagli ingredienti
-    output += f'\n{"INGREDIENTI":-^60}\n\n'
-    output += f'{"Ingrediente":<25} {"Calorie":>15} {"% Totale":>15}\n'
-    output += f'{"-" * 60}\n'
+    parts.append(f'\n{"INGREDIENTI":-^60}\n\n')
+    parts.append(f'{"Ingrediente":<25} {"Calorie":>15} {"% Totale":>15}\n')
+    parts.append(f'{"-" * 60}\n')
     
     for detail in recipe.get_ingredient_details():
-        output += f'{detail["ingredient"]:<25} '
-        output += f'{detail["calories"]:>15.0f} '
-        output += f'{detail["percentage"]:>14.1f}%\n'
+        parts.append(f'{detail["ingredient"]:<25} ')
+        parts.append(f'{detail["calories"]:>15.0f} ')
+        parts.append(f'{detail["percentage"]:>14.1f}%\n')
     
     # Suggerimenti
-    output += f'\n{"SUGGERIMENTI":-^60}\n\n'
+    parts.append(f'\n{"SUGGERIMENTI":-^60}\n\n')
     
-    analysis = recipe.analyze()
     if analysis['high_calorie_ingredients']:
-        output += f'⚠️  Ingredienti ad alto contenuto calorico:\n'
+        parts.append(f'⚠️  Ingredienti ad alto contenuto calorico:\n')
         for ing in analysis['high_calorie_ingredients']:
-            output += f'   • {ing}\n'
+            parts.append(f'   • {ing}\n')
     
     # Livello difficoltà basato su tempo
     if prep_time < 20:
@@ -313,11 +588,11 @@ def recipe_analyzer(recipe: Recipe) -> str:
     else:
         difficulty = "Complessa 🔥"
     
-    output += f'\n{"Difficoltà stimata:":<30} {difficulty:>29}\n'
+    parts.append(f'\n{"Difficoltà stimata:":<30} {difficulty:>29}\n')
     
-    output += f'\n{"-" * 60}\n'
+    parts.append(f'\n{"-" * 60}\n')
     
-    return output
+    return ''.join(parts)
 
 
 def compare_recipes(recipes: List[Recipe]) -> str:
@@ -333,35 +608,41 @@ def compare_recipes(recipes: List[Recipe]) -> str:
     if not recipes:
         return "Nessuna ricetta da confrontare"
     
-    output = f'\n{"CONFRONTO RICETTE":=^80}\n\n'
+    # Metriche calcolate una volta per ricetta (un passaggio per metrica)
+    ranking = RecipeRanking(recipes)
+    calories = ranking.column('calories')
+    prep_times = ranking.column('prep_time')
+    counts = ranking.column('ingredients')
+    
+    parts = [f'\n{"CONFRONTO RICETTE":=^80}\n\n']
     
     # Header tabella
-    output += f'{"Nome":<25} {"Tipo":<15} {"Cal":<10} {"Tempo (min)":<15} {"Ingredienti"}\n'
-    output += f'{"-" * 80}\n'
+    parts.append(f'{"Nome":<25} {"Tipo":<15} {"Cal":<10} {"Tempo (min)":<15} {"Ingredienti"}\n')
+    parts.append(f'{"-" * 80}\n')
     
     # Righe ricette
-    for r in recipes:
-        output += f'{r.name:<25} {r.type:<15} '
-        output += f'{r.total_calories():<10.0f} {r.prep_time():<15} '
-        output += f'{len(r.ingredients)}\n'
+    for r, cal, prep, count in zip(ranking.recipes, calories, prep_times, counts):
+        parts.append(f'{r.name:<25} {r.type:<15} ')
+        parts.append(f'{cal:<10.0f} {prep:<15} ')
+        parts.append(f'{count}\n')
     
-    output += f'{"-" * 80}\n'
+    parts.append(f'{"-" * 80}\n')
     
     # Raccomandazioni
-    output += f'\n{"RACCOMANDAZIONI":-^80}\n\n'
+    parts.append(f'\n{"RACCOMANDAZIONI":-^80}\n\n')
     
-    lightest = min(recipes, key=lambda r: r.total_calories())
-    output += f'🥗 Più leggera: {lightest.name} ({lightest.total_calories():.0f} kcal)\n'
+    lightest = ranking.top_indices(1, 'calories')[0]
+    parts.append(f'🥗 Più leggera: {ranking.recipes[lightest].name} ({calories[lightest]:.0f} kcal)\n')
     
-    fastest = min(recipes, key=lambda r: r.prep_time())
-    output += f'⚡ Più veloce: {fastest.name} ({fastest.prep_time()} min)\n'
+    fastest = ranking.top_indices(1, 'prep_time')[0]
+    parts.append(f'⚡ Più veloce: {ranking.recipes[fastest].name} ({prep_times[fastest]} min)\n')
     
-    simplest = min(recipes, key=lambda r: len(r.ingredients))
-    output += f'👍 Più semplice: {simplest.name} ({len(simplest.ingredients)} ingredienti)\n'
+    simplest = ranking.top_indices(1, 'ingredients')[0]
+    parts.append(f'👍 Più semplice: {ranking.recipes[simplest].name} ({counts[simplest]} ingredienti)\n')
     
-    output += f'\n{"=" * 80}\n'
+    parts.append(f'\n{"=" * 80}\n')
     
-    return output
+    return ''.join(parts)
 
 
 # ============================================================================
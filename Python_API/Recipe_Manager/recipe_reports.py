@@ -0,0 +1,118 @@
+'''
+Generazione massiva dei report di recipe_analyzer
+
+I report di un intero catalogo vengono generati in un process pool, a blocchi di
+ricette, e scritti man mano su disco: un file .txt per ricetta in una cartella,
+oppure un unico archivio ZIP scritto in streaming. I blocchi in volo sono al
+massimo `max_pending`, quindi la memoria resta limitata anche con cataloghi
+molto grandi; i report escono nell'ordine delle ricette.
+
+Uso:
+    from recipe_reports import bulk_reports
+
+    bulk_reports(catalog, output_dir='reports')           # un file per ricetta
+    bulk_reports(catalog, archive='reports.zip', workers=8)
+'''
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import os
+import re
+import zipfile
+
+from recipe_manager import Recipe, recipe_analyzer
+
+_UNSAFE_CHARS = re.compile(r'[^\w-]+')
+
+
+def report_filename(index: int, recipe: Recipe) -> str:
+    """Nome del file del report: posizione nel catalogo + nome della ricetta"""
+    slug = _UNSAFE_CHARS.sub('_', recipe.name).strip('_')[:60] or 'recipe'
+    return f'{index:06d}_{slug}.txt'
+
+
+def _render_chunk(chunk: List[Tuple[int, Recipe]]) -> List[Tuple[str, str]]:
+    """Report di un blocco di ricette (eseguito nei processi del pool)"""
+    return [(report_filename(index, recipe), recipe_analyzer(recipe)) for index, recipe in chunk]
+
+
+def _chunks(recipes: Iterable[Recipe], size: int) -> Iterator[List[Tuple[int, Recipe]]]:
+    numbered = enumerate(recipes)
+    while True:
+        chunk = list(islice(numbered, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_reports(recipes: Iterable[Recipe], workers: Optional[int] = None,
+                   chunk_size: int = 200, max_pending: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Genera i report (nome file, testo) nell'ordine delle ricette.
+
+    Args:
+        recipes: Ricette (lista, generatore o RecipeCollection)
+        workers: Processi del pool (default: numero di CPU; 1 = nel processo corrente)
+        chunk_size: Ricette per blocco inviato a un processo
+        max_pending: Blocchi in elaborazione al massimo (default: 2 per processo)
+
+    Yields:
+        tuple: (nome file, report)
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(recipes, chunk_size):
+            yield from _render_chunk(chunk)
+        return
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in _chunks(recipes, chunk_size):
+            # Finestra limitata: prima di inviare altro si consuma il blocco più vecchio
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_render_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def bulk_reports(recipes: Iterable[Recipe], output_dir: Optional[str] = None,
+                 archive: Union[str, BinaryIO, None] = None, workers: Optional[int] = None,
+                 chunk_size: int = 200, max_pending: Optional[int] = None) -> Dict:
+    """
+    Scrive i report di tutte le ricette in una cartella o in un archivio ZIP.
+
+    Args:
+        recipes: Ricette da analizzare
+        output_dir: Cartella in cui scrivere un file per ricetta
+        archive: Percorso o file binario dell'archivio ZIP (anche non seekable)
+        workers, chunk_size, max_pending: Vedi render_reports
+
+    Returns:
+        dict: {'reports': numero di report, 'characters': lunghezza totale dei report}
+
+    Raises:
+        ValueError: Se non è indicata esattamente una destinazione
+    """
+    if (output_dir is None) == (archive is None):
+        raise ValueError("Specify exactly one of output_dir or archive")
+
+    reports = render_reports(recipes, workers, chunk_size, max_pending)
+    count = size = 0
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        for filename, text in reports:
+            with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+                f.write(text)
+            count += 1
+            size += len(text)
+    else:
+        with zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for filename, text in reports:
+                zf.writestr(filename, text.encode('utf-8'))
+                count += 1
+                size += len(text)
+    return {'reports': count, 'characters': size}
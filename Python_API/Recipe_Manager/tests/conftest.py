@@ -0,0 +1,8 @@
+"""Configurazione dei test del Recipe Manager: i moduli del progetto diventano importabili"""
+
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
@@ -0,0 +1,24 @@
+"""Ricette casuali per i test del Recipe Manager"""
+
+import random
+
+from recipe_manager import Appetizer, Dessert, MainDish, Salad
+
+INGREDIENTS = [
+    'Pasta', 'Guanciale', 'Uova', 'Pecorino', 'Pomodoro', 'Mozzarella', 'Basilico', 'Olio',
+    'Mascarpone', 'Savoiardi', 'Caffè', 'Zucchero', 'Lattuga', 'Tonno', 'Pane', 'Aglio',
+]
+
+
+def random_recipes(n: int, seed: int = 0) -> list:
+    """n ricette di tutti i tipi, con ingredienti distinti e calorie intere (anche ripetute)"""
+    rng = random.Random(seed)
+    recipes = []
+    for i in range(n):
+        cls = rng.choice((Dessert, MainDish, Appetizer, Salad))
+        ingredients = rng.sample(INGREDIENTS, rng.randint(1, 6))
+        calories = [rng.randint(0, 60) * 10 for _ in ingredients]
+        if sum(calories) == 0:
+            calories[0] = 10
+        recipes.append(cls(ingredients=ingredients, calories_per_ingredient=calories, name=f'Ricetta {i}'))
+    return recipes
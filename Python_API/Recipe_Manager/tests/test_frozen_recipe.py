@@ -0,0 +1,65 @@
+"""Test delle ricette immutabili con metriche memoizzate"""
+
+import pickle
+
+import pytest
+
+from recipe_collection import RecipeCollection
+from recipe_factory import random_recipes
+from recipe_manager import Dessert, FrozenRecipe, MainDish, Recipe, compare_recipes, freeze, recipe_analyzer
+
+
+@pytest.fixture
+def tiramisu():
+    return Dessert(['Mascarpone', 'Uova', 'Savoiardi', 'Caffè'], [450, 155, 380, 2], 'Tiramisù')
+
+
+def test_same_metrics_and_report_as_source(tiramisu):
+    frozen = freeze(tiramisu)
+    assert isinstance(frozen, Recipe)
+    assert frozen.analyze() == tiramisu.analyze()
+    assert frozen.get_ingredient_details() == tiramisu.get_ingredient_details()
+    assert recipe_analyzer(frozen) == recipe_analyzer(tiramisu)
+    assert freeze(frozen) is frozen
+
+
+def test_immutable_and_memoized_results_are_copies(tiramisu):
+    frozen = freeze(tiramisu)
+    with pytest.raises(AttributeError):
+        frozen.name = 'Altro'
+    with pytest.raises(AttributeError):
+        del frozen.ingredients
+    analysis = frozen.analyze()
+    analysis['high_calorie_ingredients'].append('Zucchero')
+    frozen.get_ingredient_details()[0]['calories'] = 0
+    assert frozen.analyze() == tiramisu.analyze()
+    assert frozen.get_ingredient_details() == tiramisu.get_ingredient_details()
+
+
+def test_modifications_return_new_recipes(tiramisu):
+    frozen = freeze(tiramisu)
+    richer = frozen.with_ingredient('Cacao', 20)
+    assert richer.total_calories() == frozen.total_calories() + 20
+    assert richer.prep_time() == frozen.prep_time() + Dessert.prep_time_per_ingredient
+    assert richer.without_ingredient('Cacao') == frozen
+    main = frozen.replace(recipe_class=MainDish)
+    assert main.type == MainDish.type
+    assert main.prep_time() == MainDish(list(tiramisu.ingredients), list(tiramisu.calories_per_ingredient)).prep_time()
+    with pytest.raises(TypeError):
+        frozen.replace(colour='red')
+    with pytest.raises(ValueError):
+        frozen.without_ingredient('Panna')
+    with pytest.raises(ValueError):
+        FrozenRecipe(Dessert, ['Zucchero'], [-1])
+
+
+def test_hash_pickle_and_collection():
+    recipes = random_recipes(30, seed=4)
+    frozen = [freeze(r) for r in recipes]
+    restored = pickle.loads(pickle.dumps(frozen))
+    assert restored == frozen and {hash(r) for r in restored} == {hash(r) for r in frozen}
+    assert len(set(frozen + restored)) == len(frozen)
+
+    catalog = RecipeCollection.from_recipes(frozen)
+    assert [catalog.analyze(i) for i in range(len(catalog))] == [r.analyze() for r in recipes]
+    assert compare_recipes(frozen) == compare_recipes(recipes)
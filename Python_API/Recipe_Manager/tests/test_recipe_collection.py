@@ -0,0 +1,59 @@
+"""Test del catalogo colonnare contro l'analisi ricetta per ricetta"""
+
+import numpy as np
+import pytest
+
+from recipe_collection import RecipeCollection
+from recipe_factory import random_recipes
+from recipe_manager import Dessert
+
+
+def test_vectorized_analysis_matches_recipe_analyze():
+    recipes = random_recipes(300, seed=1)
+    catalog = RecipeCollection()
+    catalog.extend(recipes[:100])
+    catalog.add(recipes[100])
+    catalog.extend(recipes[101:])
+
+    assert len(catalog) == len(recipes)
+    for index, recipe in enumerate(recipes):
+        assert catalog.analyze(index) == recipe.analyze()
+    metrics = catalog.metrics()
+    assert metrics['has_high_calorie_ingredient'].tolist() == [
+        bool(r.analyze()['high_calorie_ingredients']) for r in recipes
+    ]
+    assert np.allclose(metrics['calorie_density'], [r.total_calories() / len(r.ingredients) for r in recipes])
+
+
+def test_recipes_are_rebuilt_on_access():
+    recipes = random_recipes(20, seed=2)
+    catalog = RecipeCollection.from_recipes(recipes)
+    rebuilt = catalog[-1]
+    assert type(rebuilt) is type(recipes[-1])
+    assert (rebuilt.name, rebuilt.ingredients) == (recipes[-1].name, recipes[-1].ingredients)
+    assert [r.total_calories() for r in catalog] == [r.total_calories() for r in recipes]
+    with pytest.raises(IndexError):
+        catalog[20]
+
+
+def test_top_k_matches_sorting_with_ties_by_index():
+    catalog = RecipeCollection.from_recipes(random_recipes(200, seed=3))
+    for metric in ('total_calories', 'prep_time', 'calorie_density'):
+        values = catalog.metrics()[metric].tolist()
+        expected = sorted(range(len(values)), key=lambda i: (values[i], i))
+        assert catalog.top_k(15, metric).tolist() == expected[:15]
+        expected_largest = sorted(range(len(values)), key=lambda i: (-values[i], i))
+        assert catalog.top_k(15, metric, largest=True).tolist() == expected_largest[:15]
+    assert catalog.top_k(0).tolist() == []
+    assert len(catalog.top_k(500)) == 200
+
+
+def test_append_chunk_validates_and_invalidates_metrics():
+    catalog = RecipeCollection.from_recipes([Dessert(['Zucchero'], [400], 'Caramello')])
+    assert catalog.total_calories().tolist() == [400]
+    catalog.append_chunk(['Tonno'], [catalog.type_code('Salad')], [2], ['Tonno', 'Lattuga'], [120, 15])
+    assert catalog.total_calories().tolist() == [400, 135]
+    with pytest.raises(ValueError):
+        catalog.append_chunk(['X'], [0], [2], ['A'], [1])
+    with pytest.raises(ValueError):
+        catalog.append_chunk(['X'], [0], [1], ['A'], [-1])
@@ -0,0 +1,69 @@
+"""Test di RecipeIndex contro una scansione completa del catalogo"""
+
+import random
+
+import pytest
+
+from recipe_collection import RecipeCollection
+from recipe_factory import INGREDIENTS, random_recipes
+from recipe_index import RecipeIndex
+
+
+def _scan(recipes, ingredients=(), exclude=(), min_calories=None, max_calories=None,
+          min_prep_time=None, max_prep_time=None, recipe_type=None):
+    """Riferimento: controlla ogni ricetta con i metodi di Recipe"""
+    result = []
+    for i, recipe in enumerate(recipes):
+        names = {name.strip().lower() for name in recipe.ingredients}
+        calories, prep = recipe.total_calories(), recipe.prep_time()
+        if (all(name.strip().lower() in names for name in ingredients)
+                and not any(name.strip().lower() in names for name in exclude)
+                and (min_calories is None or calories >= min_calories)
+                and (max_calories is None or calories <= max_calories)
+                and (min_prep_time is None or prep >= min_prep_time)
+                and (max_prep_time is None or prep <= max_prep_time)
+                and (recipe_type is None or recipe.type == recipe_type)):
+            result.append(i)
+    return result
+
+
+@pytest.fixture(scope='module')
+def recipes():
+    return random_recipes(400, seed=5)
+
+
+def test_random_queries_match_full_scan(recipes):
+    index = RecipeIndex(RecipeCollection.from_recipes(recipes))
+    rng = random.Random(6)
+    for _ in range(200):
+        filters = {}
+        if rng.random() < 0.7:
+            filters['ingredients'] = rng.sample(INGREDIENTS, rng.randint(1, 2))
+        if rng.random() < 0.3:
+            filters['exclude'] = rng.sample(INGREDIENTS, 1)
+        if rng.random() < 0.5:
+            filters['max_calories'] = rng.randint(0, 30) * 50
+        if rng.random() < 0.3:
+            filters['min_calories'] = rng.randint(0, 10) * 50
+        if rng.random() < 0.3:
+            filters['min_prep_time'], filters['max_prep_time'] = 20, rng.randint(20, 80)
+        if rng.random() < 0.3:
+            filters['recipe_type'] = rng.choice(['Dessert', 'Main Dish', 'Appetizer', 'Salad'])
+        assert index.query(**filters).tolist() == _scan(recipes, **filters), filters
+
+
+def test_names_are_normalized_and_unknown_ingredients_match_nothing(recipes):
+    index = RecipeIndex(RecipeCollection.from_recipes(recipes))
+    assert index.query(ingredients=[' guanciale ']).tolist() == _scan(recipes, ingredients=['Guanciale'])
+    assert index.query(ingredients=['Tartufo']).tolist() == []
+    assert index.query().tolist() == list(range(len(recipes)))
+
+
+def test_index_refreshes_when_the_catalog_grows(recipes):
+    catalog = RecipeCollection.from_recipes(recipes[:100])
+    index = RecipeIndex(catalog)
+    assert index.query(ingredients=['Pasta']).tolist() == _scan(recipes[:100], ingredients=['Pasta'])
+    catalog.extend(recipes[100:])
+    assert index.query(ingredients=['Pasta']).tolist() == _scan(recipes, ingredients=['Pasta'])
+    ids = index.query(ingredients=['Pasta'], max_calories=400)
+    assert [r.name for r in index.recipes(ids)] == [recipes[i].name for i in ids]
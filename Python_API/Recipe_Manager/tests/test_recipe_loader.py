@@ -0,0 +1,67 @@
+"""Test del caricamento in streaming (JSONL/CSV) e del report degli errori per riga"""
+
+import io
+import json
+
+from recipe_loader import load_recipes
+
+
+def _jsonl(*rows):
+    return io.StringIO('\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows) + '\n')
+
+
+def _errors(report):
+    return [(error.line, error.message) for error in report.errors]
+
+
+def test_jsonl_rejects_invalid_rows_with_line_numbers():
+    source = _jsonl(
+        {'name': 'Carbonara', 'type': 'Main Dish', 'ingredients': ['Pasta', 'Guanciale'],
+         'calories_per_ingredient': [350, 420]},
+        '{not json',
+        {'name': 'Bool', 'type': 'Dessert', 'ingredients': ['Zucchero'], 'calories_per_ingredient': [True]},
+        {'name': 'Negativa', 'type': 'Salad', 'ingredients': ['Lattuga'], 'calories_per_ingredient': [-1]},
+        {'name': 'Mismatch', 'type': 'Salad', 'ingredients': ['Lattuga', 'Olio'], 'calories_per_ingredient': [15]},
+        {'name': 'Testo', 'type': 'Appetizer', 'ingredients': ['Pane'], 'calories_per_ingredient': ['molte']},
+        {'name': 'Caprese', 'type': 'Appetizer', 'ingredients': ['Mozzarella', 'Pomodoro'],
+         'calories_per_ingredient': [280, 20]},
+    )
+    catalog, report = load_recipes(source, file_format='jsonl', chunk_size=3)
+
+    assert (report.loaded, report.rejected) == (2, 5)
+    errors = _errors(report)
+    assert [line for line, _ in errors] == [2, 3, 4, 5, 6]
+    assert errors[0][1].startswith('invalid JSON')
+    assert errors[1][1] == 'calorie values must be numbers'
+    assert errors[2][1] == 'Calories cannot be negative or non-finite'
+    assert errors[3][1].startswith('Mismatch')
+    assert errors[4][1] == 'calorie values must be numbers'
+    assert [catalog[i].name for i in range(len(catalog))] == ['Carbonara', 'Caprese']
+    assert list(catalog.total_calories()) == [770, 300]
+
+
+def test_csv_reports_short_rows_and_missing_columns():
+    source = io.StringIO(
+        'name,type,ingredients,calories_per_ingredient\n'
+        'Carbonara,Main Dish,Pasta;Guanciale,350;420\n'
+        'Corta,Salad\n'
+        'Bool,Dessert,Zucchero,True\n'
+        'Tiramisù,Dessert,Mascarpone;Savoiardi,450;380\n'
+    )
+    catalog, report = load_recipes(source, file_format='csv')
+    assert (report.loaded, report.rejected) == (2, 2)
+    assert _errors(report) == [
+        (3, "missing value in column 'ingredients'"),
+        (4, 'calorie values must be numbers'),
+    ]
+    assert len(catalog) == 2
+
+    _, report = load_recipes(io.StringIO('name,type,ingredients\nA,Salad,Lattuga\n'), file_format='csv')
+    assert _errors(report) == [(2, "missing column 'calories_per_ingredient'")]
+
+
+def test_max_errors_limits_report_but_not_count():
+    source = _jsonl(*['{bad'] * 5)
+    _, report = load_recipes(source, file_format='jsonl', chunk_size=2, max_errors=3)
+    assert report.rejected == 5
+    assert [error.line for error in report.errors] == [1, 2, 3]
@@ -0,0 +1,56 @@
+"""Test delle classifiche top-k contro l'ordinamento completo"""
+
+import pytest
+
+from recipe_factory import random_recipes
+from recipe_manager import RANKING_METRICS, RecipeRanking, compare_recipes
+
+
+@pytest.fixture(scope='module')
+def recipes():
+    return random_recipes(150, seed=7)
+
+
+def _sorted_indices(recipes, *keys):
+    def sort_key(i):
+        values = []
+        for key in keys:
+            value = RANKING_METRICS[key.lstrip('-')](recipes[i])
+            values.append(-value if key.startswith('-') else value)
+        return (*values, i)
+    return sorted(range(len(recipes)), key=sort_key)
+
+
+@pytest.mark.parametrize('keys', [('calories',), ('prep_time',), ('-density',),
+                                  ('ingredients', '-calories'), ('-prep_time', 'density')])
+def test_top_matches_full_sort(recipes, keys):
+    ranking = RecipeRanking(recipes)
+    assert ranking.top_indices(10, *keys) == _sorted_indices(recipes, *keys)[:10]
+    assert ranking.top(200, *keys) == [recipes[i] for i in _sorted_indices(recipes, *keys)]
+
+
+def test_shortcuts_and_metric_columns_are_computed_once(recipes, monkeypatch):
+    calls = []
+    ranking = RecipeRanking(recipes)
+    original = RANKING_METRICS['calories']
+    monkeypatch.setitem(RANKING_METRICS, 'calories', lambda r: calls.append(r) or original(r))
+    ranking.top(3, 'calories')
+    ranking.top(5, '-calories')
+    assert len(calls) == len(recipes)
+    monkeypatch.undo()
+
+    assert ranking.lightest(2) == ranking.top(2, 'calories')
+    assert ranking.fastest()[0] is recipes[_sorted_indices(recipes, 'prep_time')[0]]
+    assert ranking.simplest()[0] is recipes[_sorted_indices(recipes, 'ingredients')[0]]
+    assert ranking.densest()[0] is recipes[_sorted_indices(recipes, '-density')[0]]
+    with pytest.raises(ValueError):
+        ranking.top(1, 'colour')
+    with pytest.raises(ValueError):
+        ranking.top(1)
+
+
+def test_compare_recipes_recommendations(recipes):
+    report = compare_recipes(recipes[:5])
+    lightest = recipes[_sorted_indices(recipes[:5], 'calories')[0]]
+    assert f'Più leggera: {lightest.name} ({lightest.total_calories():.0f} kcal)' in report
+    assert compare_recipes([]) == "Nessuna ricetta da confrontare"
@@ -0,0 +1,60 @@
+"""Test della generazione massiva dei report (cartella e ZIP in streaming)"""
+
+import io
+import os
+import zipfile
+
+import pytest
+
+from recipe_collection import RecipeCollection
+from recipe_factory import random_recipes
+from recipe_manager import Dessert, recipe_analyzer
+from recipe_reports import bulk_reports, render_reports, report_filename
+
+
+class UnseekableStream:
+    """File binario in sola scrittura, come una risposta HTTP o una pipe"""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture(scope='module')
+def recipes():
+    return random_recipes(45, seed=8)
+
+
+def test_directory_reports_equal_recipe_analyzer(recipes, tmp_path):
+    output = tmp_path / 'reports'
+    summary = bulk_reports(recipes, output_dir=str(output), workers=2, chunk_size=4, max_pending=2)
+    expected = {report_filename(i, r): recipe_analyzer(r) for i, r in enumerate(recipes)}
+    assert summary == {'reports': len(recipes), 'characters': sum(map(len, expected.values()))}
+    assert sorted(os.listdir(output)) == sorted(expected)
+    for filename, text in expected.items():
+        assert (output / filename).read_text(encoding='utf-8') == text
+
+
+def test_streamed_zip_keeps_catalog_order(recipes):
+    stream = UnseekableStream()
+    catalog = RecipeCollection.from_recipes(recipes)
+    bulk_reports(catalog, archive=stream, workers=2, chunk_size=7)
+    with zipfile.ZipFile(io.BytesIO(stream.buffer.getvalue())) as zf:
+        names = zf.namelist()
+        assert names == [report_filename(i, r) for i, r in enumerate(recipes)]
+        assert zf.read(names[3]).decode('utf-8') == recipe_analyzer(recipes[3])
+
+
+def test_in_process_rendering_and_arguments():
+    recipe = Dessert(['Zucchero'], [400], 'Crème brûlée / "special"')
+    assert list(render_reports([recipe], workers=1)) == [(report_filename(0, recipe), recipe_analyzer(recipe))]
+    assert report_filename(12, recipe) == '000012_Crème_brûlée_special.txt'
+    with pytest.raises(ValueError):
+        bulk_reports([recipe])
+    with pytest.raises(ValueError):
+        bulk_reports([recipe], output_dir='x', archive='y.zip')
@@ -0,0 +1,188 @@
+"""
+Cache dei risultati di analisi sentiment.
+
+Le chiavi sono calcolate sul testo normalizzato (URL rimossi, spazi compattati): varianti
+che differiscono solo per link o spaziatura condividono lo stesso risultato. Le maiuscole
+restano nella chiave perché TextBlob le usa (es. 'happy :D' e 'happy :d' hanno polarity
+diverse).
+
+Backend disponibili:
+  • MemoryCache  - LRU in memoria con TTL, per singolo processo
+  • SQLiteCache  - file SQLite condiviso tra processi/worker sulla stessa macchina
+
+Entrambi espongono contatori di hit, miss ed eviction (per processo).
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+
+
+def normalize_text(text: str) -> str:
+    """Normalizza il testo per il confronto: rimuove URL e compatta gli spazi (maiuscole invariate)"""
+    return ' '.join(_URL_RE.sub(' ', text).split())
+
+
+def cache_key(text: str) -> str:
+    """Chiave compatta e di lunghezza fissa del testo normalizzato"""
+    # person distingue queste chiavi da quelle (case-insensitive) già salvate nelle cache SQLite
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=16,
+                           person=b'sentiment-key-v2').hexdigest()
+
+
+class CacheStats:
+    """Contatori di utilizzo della cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add(self, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        """Somma contatori misurati altrove (es. processi del pool batch)"""
+        self.hits += hits
+        self.misses += misses
+        self.evictions += evictions
+
+    def as_dict(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+class MemoryCache:
+    """Cache LRU in memoria con dimensione massima e TTL"""
+
+    backend = 'memory'
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                del self._data[key]
+                self.stats.evictions += 1
+            self.stats.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Cache condivisa su file SQLite (modalità WAL), utilizzabile da più processi.
+
+    Ogni thread/processo apre la propria connessione; la pulizia degli elementi scaduti
+    e in eccesso avviene ogni `cleanup_every` inserimenti.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str = 'sentiment_cache.db', max_size: int = 100000,
+                 ttl: float = 86400, cleanup_every: int = 1000):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cleanup_every = cleanup_every
+        self.stats = CacheStats()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS analysis_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_expires ON analysis_cache(expires_at)')
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connessione per thread, ricreata dopo un fork (pid diverso)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            'SELECT value FROM analysis_cache WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO analysis_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), time.time() + self.ttl)
+            )
+        with self._lock:
+            self._writes += 1
+            cleanup = self._writes % self.cleanup_every == 0
+        if cleanup:
+            self._cleanup()
+
+    def _cleanup(self) -> None:
+        """Rimuove gli elementi scaduti e quelli in eccesso (i più vicini alla scadenza)"""
+        with self._connection() as conn:
+            removed = conn.execute('DELETE FROM analysis_cache WHERE expires_at <= ?', (time.time(),)).rowcount
+            removed += conn.execute(
+                'DELETE FROM analysis_cache WHERE key IN ('
+                'SELECT key FROM analysis_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_size,)
+            ).rowcount
+        with self._lock:
+            self.stats.evictions += removed
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+
+
+def create_cache(backend: str = 'memory', **options):
+    """Crea il backend di cache richiesto ('memory', 'sqlite' o 'none')"""
+    if backend == 'none':
+        return None
+    if backend == 'sqlite':
+        return SQLiteCache(**options)
+    if backend == 'memory':
+        options.pop('path', None)
+        return MemoryCache(**options)
+    raise ValueError(f"Backend cache sconosciuto: {backend}")
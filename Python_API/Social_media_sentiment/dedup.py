@@ -0,0 +1,165 @@
+"""
+Deduplicazione dei post all'interno di un batch.
+
+  • Duplicati esatti: post con lo stesso testo normalizzato (stessa chiave della
+    cache di analisi, che conserva le maiuscole) vengono analizzati una sola volta
+    e il risultato viene riportato su tutte le posizioni. Retweet e copia-incolla
+    non costano nulla.
+  • Quasi-duplicati (opzionale): MinHash sugli shingle di parole (in minuscolo) e
+    LSH a bande raggruppano i post molto simili; i cluster servono solo per le
+    statistiche, l'analisi resta per testo.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import random
+
+from analysis_cache import cache_key, normalize_text
+
+# Primo di Mersenne 2^61 - 1 per le permutazioni (a * x + b) mod p
+_PRIME = (1 << 61) - 1
+
+
+def group_duplicates(posts: Sequence) -> Tuple[List, List[int]]:
+    """
+    Raggruppa i post con lo stesso testo normalizzato.
+
+    La chiave è cache_key, che distingue le maiuscole: TextBlob può dare polarity
+    diverse a 'Nice :-D' e 'nice :-d', quindi non sono duplicati.
+
+    Args:
+        posts: Post del batch (i valori non stringa restano tutti distinti)
+
+    Returns:
+        tuple: (post unici in ordine di prima occorrenza,
+                indice del post unico per ogni posizione del batch)
+    """
+    unique = []
+    positions = []
+    seen: Dict[str, int] = {}
+    for post in posts:
+        if isinstance(post, str):
+            key = cache_key(post)
+            index = seen.get(key)
+            if index is None:
+                index = seen[key] = len(unique)
+                unique.append(post)
+        else:
+            index = len(unique)
+            unique.append(post)
+        positions.append(index)
+    return unique, positions
+
+
+def _shingles(text: str, size: int) -> set:
+    """Hash a 64 bit degli n-grammi di parole del testo normalizzato (senza maiuscole)"""
+    words = normalize_text(text).lower().split()
+    if not words:
+        return set()
+    grams = [' '.join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))]
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'little')
+        for gram in grams
+    }
+
+
+class MinHashLSH:
+    """
+    Clustering di quasi-duplicati con MinHash e Locality Sensitive Hashing.
+
+    Le firme hanno `bands * rows` valori; due testi diventano candidati se
+    coincidono in almeno una banda e vengono uniti se la similarità di Jaccard
+    stimata dalle firme è almeno `threshold`.
+
+    Args:
+        threshold: Similarità minima (0-1) per considerare due post quasi-duplicati
+        bands: Numero di bande LSH
+        rows: Valori della firma per banda
+        shingle_size: Parole per shingle
+        seed: Seme delle permutazioni (firme riproducibili)
+    """
+
+    def __init__(self, threshold: float = 0.8, bands: int = 16, rows: int = 4,
+                 shingle_size: int = 3, seed: int = 1):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(bands * rows)
+        ]
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        """Firma MinHash del testo (None per testi vuoti, mai raggruppati)"""
+        shingles = _shingles(text, self.shingle_size)
+        if not shingles:
+            return None
+        return tuple(min((a * x + b) % _PRIME for x in shingles) for a, b in self._permutations)
+
+    def clusters(self, texts: Sequence[str]) -> List[int]:
+        """Id del cluster (indice del primo testo del cluster) per ogni testo"""
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        signatures = [self.signature(text) for text in texts]
+        required = self.threshold * len(self._permutations)
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets: Dict[tuple, int] = {}
+            for i, sig in enumerate(signatures):
+                if sig is None:
+                    continue
+                first = buckets.setdefault(sig[start:start + self.rows], i)
+                if first == i:
+                    continue
+                root_i, root_first = find(i), find(first)
+                if root_i == root_first:
+                    continue
+                matches = sum(x == y for x, y in zip(sig, signatures[first]))
+                if matches >= required:
+                    # Radice = indice minore, così l'id del cluster è il primo testo
+                    parent[max(root_i, root_first)] = min(root_i, root_first)
+        return [find(i) for i in range(len(texts))]
+
+
+def near_duplicate_stats(unique: Sequence, positions: Sequence[int], lsh: MinHashLSH,
+                         max_sizes: int = 20) -> Dict:
+    """
+    Cluster di quasi-duplicati di un batch, per le statistiche.
+
+    Lavora sul risultato di group_duplicates (una sola firma per testo unico);
+    le dimensioni dei cluster contano tutti i post, ripetizioni comprese.
+
+    Args:
+        unique: Post unici del batch
+        positions: Indice del post unico per ogni posizione
+        lsh: Indice MinHash/LSH configurato
+        max_sizes: Numero massimo di dimensioni riportate
+
+    Returns:
+        dict: {
+            'clusters': cluster con almeno 2 post,
+            'posts_in_clusters': post che appartengono a quei cluster,
+            'largest_cluster': dimensione del cluster più grande,
+            'cluster_sizes': dimensioni in ordine decrescente (al massimo max_sizes)
+        }
+    """
+    texts = [post if isinstance(post, str) else '' for post in unique]
+    cluster_of = lsh.clusters(texts)
+    sizes: Dict[int, int] = {}
+    for index in positions:
+        root = cluster_of[index]
+        sizes[root] = sizes.get(root, 0) + 1
+    multi = sorted((size for size in sizes.values() if size > 1), reverse=True)
+    return {
+        'clusters': len(multi),
+        'posts_in_clusters': sum(multi),
+        'largest_cluster': multi[0] if multi else 1 if positions else 0,
+        'cluster_sizes': multi[:max_sizes]
+    }
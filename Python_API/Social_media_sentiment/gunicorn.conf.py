@@ -0,0 +1,57 @@
+"""
+Configurazione gunicorn per la Sentiment Analysis API.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+L'app viene caricata nel master (preload_app) e il modello di sentiment viene
+scaldato prima del fork: i worker condividono in copy-on-write moduli, lessico e
+corpora già caricati, quindi la prima richiesta dopo un deploy o un riciclo dei
+worker non paga il caricamento di TextBlob.
+
+Processi e thread per worker web:
+  • pool batch: SENTIMENT_BATCH_WORKERS processi (default CPU / worker web),
+    avviati con forkserver e scaldati in post_fork, mai con fork dal worker
+  • job asincroni: SENTIMENT_JOB_WORKERS thread (default 1 con gunicorn); i
+    worker si coordinano tramite i lease sul database della coda, quindi in
+    totale i job elaborati in parallelo sono worker web x SENTIMENT_JOB_WORKERS
+"""
+
+import gc
+import os
+
+bind = os.environ.get('SENTIMENT_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('SENTIMENT_WEB_WORKERS', 4))
+threads = int(os.environ.get('SENTIMENT_WEB_THREADS', 1))
+timeout = int(os.environ.get('SENTIMENT_WEB_TIMEOUT', 120))
+max_requests = int(os.environ.get('SENTIMENT_WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+preload_app = True
+
+# Letti da main.py all'import (il file di configurazione viene caricato prima
+# dell'app): dimensionamento del pool batch e thread dei job per worker
+os.environ['SENTIMENT_WEB_WORKERS'] = str(workers)
+os.environ.setdefault('SENTIMENT_JOB_WORKERS', '1')
+
+
+def on_starting(server):
+    """Warm-up nel master (l'app è già importata grazie a preload_app)"""
+    import main
+    main.SentimentAnalyzer.warm_up()
+    # Sposta gli oggetti già creati fuori dal GC: le sue scansioni non sporcano
+    # le pagine condivise con i worker (copy-on-write)
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    Nei worker: avvia il pool batch e riprende i job in sospeso (thread e
+    connessioni sono per processo).
+
+    Il pool viene creato e scaldato qui, così il primo batch grande non paga
+    l'avvio dei processi e il caricamento del modello; i suoi processi partono
+    con forkserver, quindi non ereditano i lock dei thread avviati dopo.
+    """
+    import main
+    if main.app.config['BATCH_WORKERS'] > 1:
+        main.get_batch_pool()
+    main.get_job_queue()
@@ -0,0 +1,332 @@
+"""
+Coda persistente di job di analisi su SQLite.
+
+Un job contiene i post da analizzare (tabella job_items); i worker in background
+prendono un job alla volta, lo elaborano a chunk e salvano i risultati dopo ogni
+chunk. Un job in esecuzione rinnova periodicamente il proprio lease: se il processo
+termina, dopo `lease_seconds` il job torna disponibile e riprende dai post non
+ancora analizzati, quindi i job sopravvivono ai riavvii. Gli errori transitori del
+database rilasciano il lease (il job riprende), quelli dell'analisi segnano il job
+come 'failed'. I job conclusi (e gli upload interrotti) vengono eliminati dopo
+`retention_seconds`.
+"""
+
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    finished_at TEXT,
+    lease_until REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished_at);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    result TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+'''
+
+
+class JobQueue:
+    """
+    Coda di job con worker thread in background.
+
+    Args:
+        path: File SQLite della coda
+        analyze: Funzione lista di testi -> lista di analisi (stesso ordine)
+        on_results: Callback (topic, testi, analisi) chiamata dopo ogni chunk
+        workers: Numero di thread worker
+        chunk_size: Post analizzati e salvati per transazione
+        lease_seconds: Durata del lease di un job in esecuzione
+        retention_seconds: Dopo quanto eliminare i job conclusi (None = mai)
+    """
+
+    def __init__(self, path: str, analyze: Callable[[List[str]], List[Dict]],
+                 on_results: Optional[Callable] = None, workers: int = 2,
+                 chunk_size: int = 1000, lease_seconds: float = 60,
+                 retention_seconds: Optional[float] = None):
+        self.path = path
+        self.analyze = analyze
+        self.on_results = on_results
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def submit(self, topic: str, posts: Iterable[str]) -> str:
+        """
+        Registra un job; i post vengono inseriti a blocchi senza tenerli tutti in memoria.
+
+        Ogni blocco è una transazione breve: il lock di scrittura non resta acquisito
+        mentre si legge l'upload, quindi worker e altre richieste possono scrivere.
+        Il job resta 'pending' (invisibile ai worker) finché tutti i post sono salvati.
+        """
+        job_id = uuid.uuid4().hex
+        conn = self._connection()
+        conn.execute(
+            'INSERT INTO jobs (id, topic, status, created_at) VALUES (?, ?, ?, ?)',
+            (job_id, topic, 'pending', datetime.now().isoformat())
+        )
+        total = 0
+        posts = iter(posts)
+        try:
+            while True:
+                batch = [(job_id, total + i, post) for i, post in enumerate(islice(posts, self.chunk_size))]
+                if not batch:
+                    break
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.executemany('INSERT INTO job_items (job_id, idx, text) VALUES (?, ?, ?)', batch)
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                total += len(batch)
+            conn.execute('UPDATE jobs SET status = ?, total = ? WHERE id = ?', ('queued', total, job_id))
+        except Exception:
+            # Upload interrotto: il job parziale viene eliminato (altrimenti ci pensa cleanup)
+            try:
+                self._delete_job(conn, job_id)
+            except sqlite3.Error as e:
+                logger.error(f"Impossibile eliminare il job interrotto {job_id}: {e}")
+            raise
+        self._wakeup.set()
+        logger.info(f"Job {job_id} in coda: {total} post per topic '{topic}'")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Stato e avanzamento di un job"""
+        row = self._connection().execute(
+            'SELECT id, topic, status, total, processed, created_at, finished_at, error '
+            'FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, topic, status, total, processed, created_at, finished_at, error = row
+        return {
+            'job_id': job_id,
+            'topic': topic,
+            'status': status,
+            'total': total,
+            'processed': processed,
+            'progress': f"{(processed / total * 100 if total else 100):.1f}%",
+            'created_at': created_at,
+            'finished_at': finished_at,
+            'error': error
+        }
+
+    def results(self, job_id: str, page: int = 1, page_size: int = 1000) -> List[Dict]:
+        """Pagina di risultati in ordine di inserimento (solo post già analizzati)"""
+        start = (page - 1) * page_size
+        rows = self._connection().execute(
+            'SELECT idx, text, result FROM job_items WHERE job_id = ? AND idx >= ? AND idx < ? '
+            'AND result IS NOT NULL ORDER BY idx',
+            (job_id, start, start + page_size)
+        ).fetchall()
+        return [{'index': idx, 'post': text, **json.loads(result)} for idx, text, result in rows]
+
+    def cleanup(self) -> int:
+        """
+        Elimina i job conclusi ('done' o 'failed') da più di retention_seconds e gli
+        upload rimasti 'pending' da altrettanto tempo (processo terminato durante submit).
+
+        Returns:
+            int: Numero di job eliminati
+        """
+        if not self.retention_seconds:
+            return 0
+        cutoff = (datetime.now() - timedelta(seconds=self.retention_seconds)).isoformat()
+        conn = self._connection()
+        expired = [job_id for (job_id,) in conn.execute(
+            "SELECT id FROM jobs WHERE (status IN ('done', 'failed') AND finished_at < ?) "
+            "OR (status = 'pending' AND created_at < ?)", (cutoff, cutoff)
+        ).fetchall()]
+        for job_id in expired:
+            self._delete_job(conn, job_id)
+        if expired:
+            logger.info(f"Eliminati {len(expired)} job conclusi")
+        return len(expired)
+
+    def _delete_job(self, conn: sqlite3.Connection, job_id: str) -> None:
+        """Elimina un job e i suoi post (una transazione per job)"""
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM job_items WHERE job_id = ?', (job_id,))
+            conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Avvia i worker thread (idempotente)"""
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+
+    def _claim(self) -> Optional[tuple]:
+        """Prende il job più vecchio in coda o con lease scaduto"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT id, topic FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY created_at LIMIT 1", (now,)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = 'running', lease_until = ? WHERE id = ?",
+                             (now + self.lease_seconds, row[0]))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                logger.error(f"Errore coda job: {e}")
+                job = None
+            if job is None:
+                # Coda vuota: momento buono per la retention dei job conclusi
+                try:
+                    self.cleanup()
+                except sqlite3.Error as e:
+                    logger.error(f"Errore retention job: {e}")
+                self._wakeup.wait(timeout=self.lease_seconds / 2)
+                self._wakeup.clear()
+                continue
+            try:
+                self._process(*job)
+            except Exception as e:
+                # Il thread non deve morire: il job riparte alla scadenza del lease
+                logger.error(f"Errore inatteso nel job {job[0]}: {e}")
+
+    def _renew_lease(self, conn: sqlite3.Connection, job_id: str) -> None:
+        conn.execute('UPDATE jobs SET lease_until = ? WHERE id = ?',
+                     (time.time() + self.lease_seconds, job_id))
+
+    def _save_chunk(self, conn: sqlite3.Connection, job_id: str, rows: List[tuple],
+                    analyses: List[Dict]) -> List[tuple]:
+        """
+        Salva i risultati di un chunk e rinnova il lease.
+
+        Un post già salvato da un altro worker (lease scaduto e job ripreso) non
+        viene sovrascritto né conteggiato: restituisce solo le coppie (testo,
+        analisi) effettivamente salvate.
+        """
+        saved = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for (idx, text), analysis in zip(rows, analyses):
+                cursor = conn.execute(
+                    'UPDATE job_items SET result = ? WHERE job_id = ? AND idx = ? AND result IS NULL',
+                    (json.dumps(analysis, ensure_ascii=False), job_id, idx)
+                )
+                if cursor.rowcount:
+                    saved.append((text, analysis))
+            conn.execute(
+                'UPDATE jobs SET processed = processed + ?, lease_until = ? WHERE id = ?',
+                (len(saved), time.time() + self.lease_seconds, job_id)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return saved
+
+    def _set_status(self, conn: sqlite3.Connection, job_id: str, sql: str, params: tuple) -> None:
+        """Aggiorna lo stato dopo un errore; se anche questa scrittura fallisce il lease scade da solo"""
+        try:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            conn.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.error(f"Impossibile aggiornare lo stato del job {job_id}: {e}")
+
+    def _process(self, job_id: str, topic: str) -> None:
+        conn = self._connection()
+        try:
+            while not self._stopping.is_set():
+                rows = conn.execute(
+                    'SELECT idx, text FROM job_items WHERE job_id = ? AND result IS NULL '
+                    'ORDER BY idx LIMIT ?', (job_id, self.chunk_size)
+                ).fetchall()
+                if not rows:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'done', finished_at = ? WHERE id = ?",
+                        (datetime.now().isoformat(), job_id)
+                    )
+                    logger.info(f"Job {job_id} completato")
+                    return
+
+                # Lease rinnovato prima dell'analisi: vale per tutto il chunk
+                self._renew_lease(conn, job_id)
+                analyses = self.analyze([text for _, text in rows])
+                saved = self._save_chunk(conn, job_id, rows, analyses)
+                if saved and self.on_results is not None:
+                    self.on_results(topic, [text for text, _ in saved], [a for _, a in saved])
+        except sqlite3.OperationalError as e:
+            # Errore transitorio del database (es. "database is locked"): il lease viene
+            # rilasciato e il job riprende dai post non ancora salvati
+            logger.warning(f"Job {job_id} rimesso in coda dopo un errore del database: {e}")
+            self._set_status(conn, job_id, 'UPDATE jobs SET lease_until = ? WHERE id = ?',
+                             (time.time(), job_id))
+        except Exception as e:
+            logger.error(f"Errore nel job {job_id}: {e}")
+            self._set_status(conn, job_id,
+                             "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                             (str(e), datetime.now().isoformat(), job_id))
@@ -1,14 +1,26 @@
-from flask import Flask, request, jsonify, render_template_string
-from textblob import TextBlob
-from datetime import datetime
+import time
+_MODULE_START = time.perf_counter()  # inizio dell'avvio (vedi STARTUP_TIMINGS)
+
+from flask import Flask, request, jsonify, render_template_string, Response, stream_with_context, g
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import atexit
 import logging
-from collections import defaultdict
-from functools import lru_cache
+import multiprocessing
+import os
+import threading
 import json
 import csv
 import io
 
+from sentiment_store import SentimentStorage, RunningStats, SENTIMENT_CODES, TIMESERIES_INTERVALS, ms_to_iso
+from analysis_cache import create_cache, cache_key
+from jobs import JobQueue
+from persistence import SQLiteSentimentStorage
+from dedup import MinHashLSH, group_duplicates, near_duplicate_stats
+from metrics import MetricsRegistry, Histogram, Gauge, BATCH_SIZE_BUCKETS
+
 # Rate limiting (opzionale, decommentare se installato flask-limiter)
 # from flask_limiter import Limiter
 # from flask_limiter.util import get_remote_address
@@ -21,6 +33,22 @@ import io
 app = Flask(__name__)
 app.config['JSON_AS_ASCII'] = False  # Supporto caratteri UTF-8
 
+# Analisi batch parallela: worker del process pool, post per chunk e soglia
+# sotto la quale il batch resta nel processo (evita l'overhead IPC). Ogni worker
+# web ha il proprio pool: di default le CPU vengono divise tra i worker web
+_WEB_WORKERS = max(int(os.environ.get('SENTIMENT_WEB_WORKERS', 1)), 1)
+app.config['BATCH_WORKERS'] = int(os.environ.get(
+    'SENTIMENT_BATCH_WORKERS', max((os.cpu_count() or 1) // _WEB_WORKERS, 1)
+))
+app.config['BATCH_CHUNK_SIZE'] = int(os.environ.get('SENTIMENT_BATCH_CHUNK_SIZE', 500))
+app.config['BATCH_PARALLEL_THRESHOLD'] = int(os.environ.get('SENTIMENT_BATCH_PARALLEL_THRESHOLD', 1000))
+
+# Quasi-duplicati (richiesta batch con "near_duplicates": true): similarità di
+# Jaccard minima e forma delle firme MinHash (bande x righe)
+app.config['NEAR_DUP_THRESHOLD'] = float(os.environ.get('SENTIMENT_NEAR_DUP_THRESHOLD', 0.8))
+app.config['NEAR_DUP_BANDS'] = int(os.environ.get('SENTIMENT_NEAR_DUP_BANDS', 16))
+app.config['NEAR_DUP_ROWS'] = int(os.environ.get('SENTIMENT_NEAR_DUP_ROWS', 4))
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +56,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Tempi di avvio (secondi): import del modulo e warm-up del modello, per tenere
+# traccia delle regressioni del cold start (esposti da /api/v1/health)
+STARTUP_TIMINGS = {'import_seconds': None, 'warm_up_seconds': None}
+
 # Rate limiter (decommentare per abilitare)
 # limiter = Limiter(
 #     app=app,
@@ -35,14 +67,123 @@ logger = logging.getLogger(__name__)
 #     default_limits=["100 per hour"]
 # )
 
-# Storage in-memory per statistiche (in produzione usare un database)
-sentiment_storage = defaultdict(list)
+# Storage per statistiche: con SENTIMENT_DB_PATH i risultati vanno su SQLite (WAL,
+# write-behind) e sono condivisi tra i worker; altrimenti storage in-memory colonnare
+# con retention per topic (numero massimo di post e/o età massima; testo opzionale)
+if os.environ.get('SENTIMENT_DB_PATH'):
+    sentiment_storage = SQLiteSentimentStorage(
+        os.environ['SENTIMENT_DB_PATH'],
+        max_records=int(os.environ.get('SENTIMENT_MAX_RECORDS', 1_000_000)) or None,
+        max_age_seconds=float(os.environ.get('SENTIMENT_MAX_AGE_SECONDS', 0)) or None,
+        keep_text=os.environ.get('SENTIMENT_KEEP_TEXT', '1') == '1',
+        flush_interval=float(os.environ.get('SENTIMENT_DB_FLUSH_INTERVAL', 1.0)),
+        batch_size=int(os.environ.get('SENTIMENT_DB_BATCH_SIZE', 1000))
+    )
+else:
+    sentiment_storage = SentimentStorage(
+        max_records=int(os.environ.get('SENTIMENT_MAX_RECORDS', 1_000_000)) or None,
+        max_age_seconds=float(os.environ.get('SENTIMENT_MAX_AGE_SECONDS', 0)) or None,
+        keep_text=os.environ.get('SENTIMENT_KEEP_TEXT', '1') == '1'
+    )
+
+
+# Cache dei risultati di analisi: 'memory' (per processo), 'sqlite' (condivisa
+# tra worker sulla stessa macchina) o 'none'
+analysis_cache = create_cache(
+    os.environ.get('SENTIMENT_CACHE_BACKEND', 'memory'),
+    max_size=int(os.environ.get('SENTIMENT_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('SENTIMENT_CACHE_TTL', 3600)),
+    path=os.environ.get('SENTIMENT_CACHE_PATH', 'sentiment_cache.db')
+)
+
+
+# ============================================================================
+# Metriche (Prometheus, /metrics)
+# ============================================================================
+
+metrics = MetricsRegistry()
+
+REQUEST_LATENCY = metrics.register(Histogram(
+    'sentiment_http_request_duration_seconds', 'Latenza delle richieste per endpoint',
+    labelnames=('endpoint', 'method', 'status')
+))
+ANALYZE_LATENCY = metrics.register(Histogram(
+    'sentiment_analyze_duration_seconds', 'Tempo speso in analyze_text (cache: hit, miss, none)',
+    labelnames=('cache',)
+))
+BATCH_SIZE = metrics.register(Histogram(
+    'sentiment_batch_size_posts', 'Post per richiesta batch o job',
+    buckets=BATCH_SIZE_BUCKETS, labelnames=('source',)
+))
+
+
+def _cache_counters(field: str):
+    def collect():
+        if analysis_cache is not None:
+            yield (analysis_cache.backend,), getattr(analysis_cache.stats, field)
+    return collect
+
+
+def _cache_hit_ratio():
+    if analysis_cache is not None:
+        yield (analysis_cache.backend,), analysis_cache.stats.as_dict()['hit_ratio']
+
+
+def _topic_records():
+    for topic, store in sentiment_storage.topics():
+        yield (topic,), len(store)
+
+
+def _topic_memory():
+    for topic, store in sentiment_storage.topics():
+        if hasattr(store, 'memory_bytes'):
+            yield (topic,), store.memory_bytes()
+
+
+for _field in ('hits', 'misses', 'evictions'):
+    metrics.register(Gauge(
+        f'sentiment_cache_{_field}_total', f'Cache di analisi: {_field} (per processo)',
+        _cache_counters(_field), labelnames=('backend',), kind='counter'
+    ))
+metrics.register(Gauge('sentiment_cache_hit_ratio', 'Cache di analisi: hit / lookup',
+                       _cache_hit_ratio, labelnames=('backend',)))
+metrics.register(Gauge('sentiment_topic_records', 'Post conservati per topic',
+                       _topic_records, labelnames=('topic',)))
+metrics.register(Gauge('sentiment_topic_memory_bytes', 'Memoria degli array per topic (storage in memoria)',
+                       _topic_memory, labelnames=('topic',)))
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _record_request_latency(response):
+    # Per le risposte in streaming misura il tempo fino all'invio degli header
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint, request.method, str(response.status_code))
+    return response
 
 
 # ============================================================================
 # Sentiment Analyzer
 # ============================================================================
 
+_TextBlob = None
+
+
+def _textblob():
+    """Importa TextBlob al primo utilizzo: home page e statistiche non lo caricano"""
+    global _TextBlob
+    if _TextBlob is None:
+        from textblob import TextBlob
+        _TextBlob = TextBlob
+    return _TextBlob
+
+
 class SentimentAnalyzer:
     """Classe per l'analisi del sentiment con TextBlob"""
     
@@ -58,10 +199,14 @@ class SentimentAnalyzer:
     }
     
     @staticmethod
-    @lru_cache(maxsize=1000)  # Cache per testi già analizzati
     def analyze_text(text: str) -> Dict:
         """
-        Analizza il sentiment di un testo.
+        Analizza il sentiment di un testo, usando la cache dei risultati.
+        
+        La chiave di cache è il testo normalizzato (spazi e URL non cambiano
+        il risultato di TextBlob; le maiuscole sì). Restituisce sempre una copia,
+        quindi il chiamante può modificare il dizionario. Il tempo impiegato
+        finisce nell'istogramma sentiment_analyze_duration_seconds.
         
         Args:
             text: Testo da analizzare
@@ -74,6 +219,30 @@ class SentimentAnalyzer:
                 'confidence': float
             }
         """
+        start = time.perf_counter()
+        analysis, cache_result = SentimentAnalyzer._analyze_cached(text)
+        ANALYZE_LATENCY.observe(time.perf_counter() - start, cache_result)
+        return analysis
+    
+    @staticmethod
+    def _analyze_cached(text: str) -> tuple:
+        """Analisi con cache; restituisce (analisi, esito cache)"""
+        if analysis_cache is None or not isinstance(text, str) or not text.strip():
+            return SentimentAnalyzer._analyze(text), 'none'
+        
+        key = cache_key(text)
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            return dict(cached), 'hit'
+        
+        analysis = SentimentAnalyzer._analyze(text)
+        if 'error' not in analysis:
+            analysis_cache.set(key, dict(analysis))
+        return analysis, 'miss'
+    
+    @staticmethod
+    def _analyze(text: str) -> Dict:
+        """Analisi TextBlob senza cache"""
         if not text or not text.strip():
             return {
                 'sentiment': 'neutro',
@@ -85,7 +254,7 @@ class SentimentAnalyzer:
         
         try:
             # Analisi con TextBlob
-            blob = TextBlob(text)
+            blob = _textblob()(text)
             polarity = blob.sentiment.polarity
             subjectivity = blob.sentiment.subjectivity
             
@@ -118,6 +287,27 @@ class SentimentAnalyzer:
                 'error': str(e)
             }
     
+    @staticmethod
+    def warm_up() -> float:
+        """
+        Carica TextBlob, lessico e modello di sentiment analizzando un testo di prova.
+        
+        Da chiamare nel processo master prima del fork (vedi gunicorn.conf.py): i worker
+        ereditano le pagine già caricate in copy-on-write e la prima richiesta non paga
+        il caricamento. Le chiamate successive non fanno nulla.
+        
+        Returns:
+            float: Secondi impiegati dal warm-up
+        """
+        if STARTUP_TIMINGS['warm_up_seconds'] is not None:
+            return STARTUP_TIMINGS['warm_up_seconds']
+        start = time.perf_counter()
+        SentimentAnalyzer._analyze('Warm up: this is a really good test.')
+        elapsed = round(time.perf_counter() - start, 3)
+        STARTUP_TIMINGS['warm_up_seconds'] = elapsed
+        logger.info(f"Warm-up modello sentiment completato in {elapsed:.3f}s")
+        return elapsed
+    
     @staticmethod
     def get_sentiment_label(polarity: float) -> str:
         """Converte polarity in label testuale"""
@@ -128,6 +318,185 @@ class SentimentAnalyzer:
         return 'neutro'
 
 
+# ============================================================================
+# Analisi Batch Parallela
+# ============================================================================
+
+_batch_pool: Optional[ProcessPoolExecutor] = None
+_batch_pool_lock = threading.Lock()
+
+
+def _analyze_chunk(texts: List[str]) -> List[Dict]:
+    """Analizza un chunk di post nel processo corrente"""
+    return [SentimentAnalyzer.analyze_text(text) for text in texts]
+
+
+def _cache_counts() -> tuple:
+    if analysis_cache is None:
+        return (0, 0, 0)
+    stats = analysis_cache.stats
+    return (stats.hits, stats.misses, stats.evictions)
+
+
+def _analyze_chunk_in_pool(texts: List[str]) -> tuple:
+    """
+    Analizza un chunk di post (eseguito nei processi del pool).
+    
+    Le metriche di un processo figlio non arrivano a /metrics: oltre alle analisi
+    restituisce durata ed esito cache di ogni analisi e i contatori della cache
+    del chunk, registrati dal processo padre (vedi _record_pool_metrics).
+    
+    Returns:
+        tuple: (analisi, [(secondi, esito cache)], (hit, miss, eviction))
+    """
+    before = _cache_counts()
+    analyses, timings = [], []
+    for text in texts:
+        start = time.perf_counter()
+        analysis, cache_result = SentimentAnalyzer._analyze_cached(text)
+        timings.append((time.perf_counter() - start, cache_result))
+        analyses.append(analysis)
+    return analyses, timings, tuple(after - b for after, b in zip(_cache_counts(), before))
+
+
+def _record_pool_metrics(timings: List[tuple], cache_counts: tuple) -> None:
+    """Registra nel processo corrente le metriche di un chunk analizzato nel pool"""
+    for seconds, cache_result in timings:
+        ANALYZE_LATENCY.observe(seconds, cache_result)
+    if analysis_cache is not None:
+        analysis_cache.stats.add(*cache_counts)
+
+
+def _init_batch_worker() -> None:
+    """Inizializzazione dei processi del pool: carica il modello prima del primo chunk"""
+    SentimentAnalyzer.warm_up()
+
+
+def get_batch_pool() -> ProcessPoolExecutor:
+    """
+    Restituisce il process pool condiviso, creandolo e scaldandolo al primo uso.
+    
+    Con gunicorn il pool viene creato in post_fork, prima della prima richiesta;
+    con il server di sviluppo all'avvio (vedi __main__).
+    
+    I processi non vengono creati con fork: a quel punto il worker web ha già
+    thread attivi (job, write-behind, richieste) e un figlio potrebbe ereditare
+    un lock acquisito. Con forkserver (o spawn dove non disponibile) i processi
+    partono da un interprete pulito e caricano il modello nell'initializer.
+    """
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            workers = app.config['BATCH_WORKERS']
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _batch_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_batch_worker
+            )
+            # Un chunk vuoto per processo: tutti i processi partono e caricano il
+            # modello ora, non alla prima richiesta batch
+            list(_batch_pool.map(_analyze_chunk_in_pool, [[]] * workers))
+            atexit.register(_batch_pool.shutdown)
+            logger.info(f"Process pool batch avviato con {workers} worker ({start_method})")
+        return _batch_pool
+
+
+def analyze_posts(posts: List[str], dedupe: bool = True) -> List[Dict]:
+    """
+    Analizza una lista di post mantenendo l'ordine.
+    
+    I post con lo stesso testo normalizzato vengono analizzati una sola volta
+    (dedupe=False se la lista è già senza duplicati). I batch piccoli (o con un
+    solo worker configurato) restano nel processo; quelli grandi vengono divisi
+    in chunk e distribuiti sul process pool.
+    """
+    if dedupe:
+        unique, positions = group_duplicates(posts)
+        if len(unique) < len(posts):
+            analyses = analyze_posts(unique, dedupe=False)
+            return [analyses[index] for index in positions]
+    
+    if len(posts) < app.config['BATCH_PARALLEL_THRESHOLD'] or app.config['BATCH_WORKERS'] <= 1:
+        return _analyze_chunk(posts)
+    
+    chunk_size = app.config['BATCH_CHUNK_SIZE']
+    chunks = [posts[i:i + chunk_size] for i in range(0, len(posts), chunk_size)]
+    analyses = []
+    for chunk_result, timings, cache_counts in get_batch_pool().map(_analyze_chunk_in_pool, chunks):
+        analyses.extend(chunk_result)
+        _record_pool_metrics(timings, cache_counts)
+    return analyses
+
+
+def store_results(topic: str, texts: List[str], analyses: List[Dict]) -> None:
+    """Salva i risultati di un chunk nello storage delle statistiche"""
+    for text, analysis in zip(texts, analyses):
+        sentiment_storage.add(topic, analysis['sentiment'], analysis['polarity'], text)
+
+
+# ============================================================================
+# Job Asincroni
+# ============================================================================
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Restituisce la coda job persistente, avviando i worker al primo uso"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(
+                os.environ.get('SENTIMENT_JOBS_DB', 'sentiment_jobs.db'),
+                analyze=analyze_posts,
+                on_results=store_results,
+                workers=int(os.environ.get('SENTIMENT_JOB_WORKERS', 2)),
+                chunk_size=int(os.environ.get('SENTIMENT_JOB_CHUNK_SIZE', 1000)),
+                retention_seconds=float(os.environ.get('SENTIMENT_JOB_RETENTION_SECONDS', 7 * 24 * 3600)) or None
+            )
+            _job_queue.start()
+        return _job_queue
+
+
+def _iter_uploaded_posts(stream):
+    """Post da un file caricato: una riga per post, testo semplice o NDJSON"""
+    for raw_line in stream:
+        line = raw_line.decode('utf-8').strip()
+        if not line:
+            continue
+        if line[0] in '{"':
+            try:
+                item = json.loads(line)
+                if isinstance(item, dict):
+                    item = item.get('text')
+                if isinstance(item, str):
+                    yield item
+                    continue
+            except ValueError:
+                pass
+        yield line
+
+
+def summarize_stats(running: RunningStats) -> Dict:
+    """Statistiche aggregate di un topic a partire dagli aggregati incrementali"""
+    total = running.count
+    counts = {label: running.label_count(label) for label in ('positivo', 'negativo', 'neutro')}
+    return {
+        'total_analyzed': total,
+        'positive': counts['positivo'],
+        'negative': counts['negativo'],
+        'neutral': counts['neutro'],
+        'avg_polarity': round(running.mean, 3) if total else 0,
+        'polarity_std': round(running.variance ** 0.5, 3),
+        'sentiment_distribution': {
+            label: f"{(count/total*100 if total else 0):.1f}%"
+            for label, count in counts.items()
+        }
+    }
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -255,6 +624,14 @@ def home():
 }</code>
             </div>
             
+            <div class="endpoint">
+                <span class="method post">POST</span>
+                <strong>/api/v1/analyze/stream</strong>
+                <p>Analisi in streaming: un post per riga (NDJSON), risultati restituiti riga per riga</p>
+                <code>{"text": "Adoro Netflix!", "topic": "Netflix"}
+{"text": "Netflix non mi piace", "topic": "Netflix"}</code>
+            </div>
+            
             <div class="endpoint">
                 <span class="method get">GET</span>
                 <strong>/api/v1/stats/&lt;topic&gt;</strong>
@@ -377,12 +754,7 @@ def analyze_single():
         }
         
         # Salva in storage per statistiche
-        sentiment_storage[topic].append({
-            'text': text,
-            'sentiment': analysis['sentiment'],
-            'polarity': analysis['polarity'],
-            'timestamp': datetime.now().isoformat()
-        })
+        sentiment_storage.add(topic, analysis['sentiment'], analysis['polarity'], text)
         
         logger.info(f"Analizzato testo per topic '{topic}': {analysis['sentiment']}")
         
@@ -408,8 +780,11 @@ def analyze_batch():
     Body JSON:
         {
             "topic": str (required),
-            "posts": list[str] (required)
+            "posts": list[str] (required),
+            "near_duplicates": bool (optional, cluster di post quasi uguali nelle statistiche)
         }
+    
+    I post con lo stesso testo normalizzato vengono analizzati una sola volta.
     """
     try:
         data = request.get_json()
@@ -429,10 +804,15 @@ def analyze_batch():
                 'error': 'Campo "posts" deve essere una lista'
             }), 400
         
-        # Analizza tutti i post
+        BATCH_SIZE.observe(len(posts), 'batch')
+        
+        # Analizza una volta ogni testo unico (in parallelo per i batch grandi)
+        # e riporta il risultato su tutte le posizioni
+        unique_posts, positions = group_duplicates(posts)
+        unique_analyses = analyze_posts(unique_posts, dedupe=False)
         results = []
-        for post in posts:
-            analysis = SentimentAnalyzer.analyze_text(post)
+        for post, index in zip(posts, positions):
+            analysis = unique_analyses[index]
             results.append({
                 'post': post,
                 'sentiment': analysis['sentiment'],
@@ -443,12 +823,7 @@ def analyze_batch():
             })
             
             # Salva in storage
-            sentiment_storage[topic].append({
-                'text': post,
-                'sentiment': analysis['sentiment'],
-                'polarity': analysis['polarity'],
-                'timestamp': datetime.now().isoformat()
-            })
+            sentiment_storage.add(topic, analysis['sentiment'], analysis['polarity'], post)
         
         # Calcola statistiche aggregate
         sentiments = [r['sentiment'] for r in results]
@@ -456,6 +831,7 @@ def analyze_batch():
         
         stats = {
             'total_posts': len(results),
+            'unique_posts': len(unique_posts),
             'positive': sentiments.count('positivo'),
             'negative': sentiments.count('negativo'),
             'neutral': sentiments.count('neutro'),
@@ -467,7 +843,15 @@ def analyze_batch():
             }
         }
         
-        logger.info(f"Analizzati {len(posts)} post per topic '{topic}'")
+        if data.get('near_duplicates'):
+            lsh = MinHashLSH(
+                threshold=app.config['NEAR_DUP_THRESHOLD'],
+                bands=app.config['NEAR_DUP_BANDS'],
+                rows=app.config['NEAR_DUP_ROWS']
+            )
+            stats['near_duplicates'] = near_duplicate_stats(unique_posts, positions, lsh)
+        
+        logger.info(f"Analizzati {len(posts)} post ({len(unique_posts)} unici) per topic '{topic}'")
         
         return jsonify({
             'success': True,
@@ -485,13 +869,208 @@ def analyze_batch():
         }), 500
 
 
+@app.route('/api/v1/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Analizza post in streaming (NDJSON in ingresso e in uscita)
+    
+    Body NDJSON, un post per riga:
+        {"text": str, "topic": str (optional)}   oppure   "testo del post"
+    
+    Query params:
+        topic: topic di default per le righe senza topic (default: general)
+    
+    Risposta NDJSON: un risultato per riga appena pronto, errori per riga
+    ({"line": n, "error": ...}) e in chiusura una riga {"type": "statistics"}
+    con le statistiche per topic. La memoria resta costante: i post vengono
+    letti, analizzati e scritti uno alla volta.
+    """
+    default_topic = request.args.get('topic', 'general')
+    stream = request.stream
+    
+    def generate():
+        running = {}
+        line_number = 0
+        for raw_line in iter(stream.readline, b''):
+            line_number += 1
+            if not raw_line.strip():
+                continue
+            try:
+                item = json.loads(raw_line)
+                if isinstance(item, str):
+                    text, topic = item, default_topic
+                elif isinstance(item, dict) and isinstance(item.get('text'), str):
+                    text, topic = item['text'], item.get('topic', default_topic)
+                else:
+                    raise ValueError('ogni riga deve essere una stringa o un oggetto con "text"')
+            except ValueError as e:
+                yield json.dumps({'line': line_number, 'error': str(e)}, ensure_ascii=False) + '\n'
+                continue
+            
+            analysis = SentimentAnalyzer.analyze_text(text)
+            sentiment_storage.add(topic, analysis['sentiment'], analysis['polarity'], text)
+            running.setdefault(topic, RunningStats()).add(
+                SENTIMENT_CODES[analysis['sentiment']], analysis['polarity']
+            )
+            yield json.dumps({'line': line_number, 'topic': topic, 'post': text, **analysis},
+                             ensure_ascii=False) + '\n'
+        
+        logger.info(f"Stream completato: {line_number} righe, {len(running)} topic")
+        yield json.dumps({
+            'type': 'statistics',
+            'topics': {topic: summarize_stats(stats) for topic, stats in running.items()},
+            'timestamp': datetime.now().isoformat()
+        }, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/v1/jobs', methods=['POST'])
+def submit_job():
+    """
+    Crea un job asincrono per batch molto grandi
+    
+    Body JSON:
+        {"topic": str (optional), "posts": list[str] (required)}
+    oppure multipart/form-data:
+        topic: str (optional), file: un post per riga (testo o NDJSON)
+    """
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            topic = request.form.get('topic', 'general')
+            posts = _iter_uploaded_posts(upload.stream)
+        else:
+            data = request.get_json(silent=True)
+            if not data or not isinstance(data.get('posts'), list):
+                return jsonify({
+                    'success': False,
+                    'error': 'Serve un campo "posts" (lista) oppure un file'
+                }), 400
+            if not all(isinstance(post, str) for post in data['posts']):
+                return jsonify({
+                    'success': False,
+                    'error': 'Campo "posts" deve contenere solo stringhe'
+                }), 400
+            topic = data.get('topic', 'general')
+            posts = data['posts']
+        
+        queue = get_job_queue()
+        job_id = queue.submit(topic, posts)
+        job = queue.get(job_id)
+        BATCH_SIZE.observe(job['total'], 'job')
+        
+        return jsonify({
+            'success': True,
+            'job': job,
+            'status_url': f'/api/v1/jobs/{job_id}',
+            'results_url': f'/api/v1/jobs/{job_id}/results'
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Errore in /jobs: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/v1/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Stato e avanzamento di un job"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job "{job_id}" non trovato'
+        }), 404
+    return jsonify({'success': True, 'job': job})
+
+
+@app.route('/api/v1/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """
+    Risultati di un job, a pagine
+    
+    Query params:
+        page: numero di pagina (default: 1)
+        page_size: risultati per pagina (default: 1000, max: 10000)
+    """
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job "{job_id}" non trovato'
+        }), 404
+    
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = min(max(request.args.get('page_size', 1000, type=int), 1), 10000)
+    results = queue.results(job_id, page, page_size)
+    has_next = page * page_size < job['total']
+    
+    return jsonify({
+        'success': True,
+        'job': job,
+        'page': page,
+        'page_size': page_size,
+        'results': results,
+        'next_page': f'/api/v1/jobs/{job_id}/results?page={page + 1}&page_size={page_size}' if has_next else None
+    })
+
+
+# Formati di export: mimetype ed estensione del file
+EXPORT_FORMATS = {'csv': ('text/csv', 'csv'), 'jsonl': ('application/x-ndjson', 'jsonl')}
+EXPORT_FIELDS = ['text', 'sentiment', 'polarity', 'timestamp']
+# Righe serializzate per chunk della risposta
+EXPORT_CHUNK_ROWS = 1000
+
+
+def export_records(records, export_format: str):
+    """
+    Serializza i record di un topic a blocchi di EXPORT_CHUNK_ROWS righe.
+    
+    Args:
+        records: Iteratore di record (TopicStore.records / SQLiteTopicView.records)
+        export_format: 'csv' o 'jsonl'
+    
+    Yields:
+        str: Blocchi di righe pronti per la risposta
+    """
+    buffer = io.StringIO()
+    if export_format == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(record):
+            buffer.write(json.dumps(record, ensure_ascii=False))
+            buffer.write('\n')
+    
+    rows = 0
+    for record in records:
+        write(record)
+        rows += 1
+        if rows % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
 @app.route('/api/v1/stats/<topic>', methods=['GET'])
 def get_stats(topic):
     """
     Ottieni statistiche aggregate per un topic
     
     Query params:
-        format: 'json' | 'csv' (default: json)
+        format: 'json' | 'csv' | 'jsonl' (default: json)
+        from, to, sentiment: filtri dell'export csv/jsonl, applicati dallo storage
+            (TopicStore.records / SQLiteTopicView.records)
+    
+    Gli export csv e jsonl sono generati riga per riga e inviati in streaming
+    (chunked): iniziano subito e usano memoria costante anche con milioni di post.
     """
     try:
         if topic not in sentiment_storage:
@@ -500,16 +1079,149 @@ def get_stats(topic):
                 'error': f'Nessun dato disponibile per topic "{topic}"'
             }), 404
         
-        data = sentiment_storage[topic]
-        
-        # Calcola statistiche
-        total = len(data)
-        sentiments = [d['sentiment'] for d in data]
-        polarities = [d['polarity'] for d in data]
+        store = sentiment_storage[topic]
         
+        # Statistiche dagli aggregati incrementali (O(1), indipendente dallo storico)
         stats = {
             'topic': topic,
-            'total_analyzed': total,
-     
+            **summarize_stats(store.stats),
+            'last_update': ms_to_iso(store.last_timestamp_ms) if len(store) else None
+        }
+        
+        # Export in streaming
+        export_format = request.args.get('format', 'json')
+        if export_format in EXPORT_FORMATS:
+            sentiment = request.args.get('sentiment')
+            if sentiment is not None and sentiment not in SENTIMENT_CODES:
+                return jsonify({
+                    'success': False,
+                    'error': f'Parametro "sentiment" deve essere uno tra {list(SENTIMENT_CODES)}'
+                }), 400
+            try:
+                from_ms = _parse_time_param(request.args.get('from'))
+                to_ms = _parse_time_param(request.args.get('to'))
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'error': 'Parametri "from"/"to" devono essere epoch in secondi o date ISO 8601'
+                }), 400
+            
+            records = store.records(from_ms=from_ms, to_ms=to_ms, sentiment=sentiment)
+            mimetype, extension = EXPORT_FORMATS[export_format]
+            return Response(
+                stream_with_context(export_records(records, export_format)),
+                mimetype=mimetype,
+                headers={'Content-Disposition': f'attachment; filename=sentiment_{topic}.{extension}'}
+            )
+        
+        return jsonify({
+            'success': True,
+            'statistics': stats,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Errore in /stats: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _parse_time_param(value: Optional[str]) -> Optional[int]:
+    """
+    Converte un parametro temporale (epoch in secondi o data ISO) in millisecondi.
+    
+    Le date ISO senza fuso orario sono in UTC, come i bucket delle serie temporali.
+    """
+    if not value:
+        return None
+    try:
+        return int(float(value) * 1000)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp() * 1000)
 
 
+@app.route('/api/v1/stats/<topic>/timeseries', methods=['GET'])
+def get_timeseries(topic):
+    """
+    Serie temporale del sentiment per un topic
+    
+    Query params:
+        interval: 'minute' | 'hour' | 'day' (default: hour)
+        from: inizio intervallo, epoch in secondi o ISO 8601 (optional)
+        to: fine intervallo (esclusa), epoch in secondi o ISO 8601 (optional)
+    
+    I bucket sono allineati in UTC; le date ISO senza fuso orario sono in UTC.
+    """
+    if topic not in sentiment_storage:
+        return jsonify({
+            'success': False,
+            'error': f'Nessun dato disponibile per topic "{topic}"'
+        }), 404
+    
+    interval = request.args.get('interval', 'hour')
+    if interval not in TIMESERIES_INTERVALS:
+        return jsonify({
+            'success': False,
+            'error': f'Intervallo non valido, usare uno tra: {", ".join(TIMESERIES_INTERVALS)}'
+        }), 400
+    
+    try:
+        from_ms = _parse_time_param(request.args.get('from'))
+        to_ms = _parse_time_param(request.args.get('to'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Parametro temporale non valido: {e}'
+        }), 400
+    
+    series = sentiment_storage[topic].timeseries_range(interval, from_ms, to_ms)
+    return jsonify({
+        'success': True,
+        'topic': topic,
+        'interval': interval,
+        'series': series,
+        'timestamp': datetime.now().isoformat()
+    })
+
+
+@app.route('/api/v1/health', methods=['GET'])
+def health_check():
+    """Health check dell'API"""
+    return jsonify({
+        'status': 'healthy',
+        'topics_tracked': len(sentiment_storage),
+        'cache': {
+            'backend': analysis_cache.backend,
+            **analysis_cache.stats.as_dict()
+        } if analysis_cache is not None else None,
+        'startup': {**STARTUP_TIMINGS, 'model_loaded': _TextBlob is not None},
+        'timestamp': datetime.now().isoformat()
+    })
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Metriche del processo nel formato testuale di Prometheus"""
+    return Response(metrics.render(), content_type=metrics.content_type)
+
+
+STARTUP_TIMINGS['import_seconds'] = round(time.perf_counter() - _MODULE_START, 3)
+logger.info(f"Modulo caricato in {STARTUP_TIMINGS['import_seconds']:.3f}s")
+
+
+# ============================================================================
+# Main
+# ============================================================================
+
+if __name__ == '__main__':
+    logger.info("Avvio Sentiment Analysis API su http://localhost:5000")
+    SentimentAnalyzer.warm_up()
+    if app.config['BATCH_WORKERS'] > 1:
+        get_batch_pool()  # pool pronto prima della prima richiesta batch
+    get_job_queue()  # riprende i job rimasti in sospeso
+    app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,371 @@
+"""
+Storage persistente dei risultati di sentiment su SQLite (modalità WAL).
+
+Le scritture non toccano il disco nel thread della richiesta: vengono accodate e
+un thread di write-behind le salva a blocchi, in una sola transazione per blocco,
+aggiornando nella stessa transazione gli aggregati per topic e i bucket delle
+serie temporali. Tutti i worker leggono gli stessi aggregati dal database
+(consistenza entro `flush_interval` secondi).
+
+La retention (numero massimo di post per topic e/o età massima) viene applicata
+nella stessa transazione ai topic del blocco: i post scartati vengono tolti anche
+dagli aggregati, come in TopicStore. Il limite di età viene applicato anche dalle
+letture, quindi un topic che non riceve più post non riporta record e statistiche
+scaduti; le serie temporali restano indipendenti dalla retention.
+
+Espone la stessa interfaccia di SentimentStorage, quindi gli endpoint non cambiano.
+"""
+
+from typing import Dict, Iterator, List, Optional
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from sentiment_store import (
+    RunningStats, SENTIMENT_CODES, SENTIMENT_LABELS, TIMESERIES_INTERVALS,
+    format_bucket, ms_to_iso, now_ms
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS posts (
+    topic TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    sentiment INTEGER NOT NULL,
+    polarity REAL NOT NULL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_posts_topic_ts ON posts(topic, ts_ms);
+CREATE TABLE IF NOT EXISTS topic_stats (
+    topic TEXT PRIMARY KEY,
+    positive INTEGER NOT NULL,
+    negative INTEGER NOT NULL,
+    neutral INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    last_ts_ms INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS topic_buckets (
+    topic TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start_ms INTEGER NOT NULL,
+    positive INTEGER NOT NULL,
+    negative INTEGER NOT NULL,
+    neutral INTEGER NOT NULL,
+    polarity_sum REAL NOT NULL,
+    PRIMARY KEY (topic, interval, start_ms)
+);
+'''
+
+_BUCKET_UPSERT = '''
+INSERT INTO topic_buckets (topic, interval, start_ms, positive, negative, neutral, polarity_sum)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (topic, interval, start_ms) DO UPDATE SET
+    positive = positive + excluded.positive,
+    negative = negative + excluded.negative,
+    neutral = neutral + excluded.neutral,
+    polarity_sum = polarity_sum + excluded.polarity_sum
+'''
+
+
+class SQLiteSentimentStorage:
+    """
+    Storage condiviso tra processi con coda di write-behind.
+
+    Args:
+        path: File SQLite
+        max_records: Numero massimo di post conservati per topic (None = illimitati)
+        max_age_seconds: Età massima dei post conservati (None = nessun limite)
+        keep_text: Se False il testo dei post non viene salvato
+        flush_interval: Attesa massima (secondi) prima di scrivere un blocco
+        batch_size: Numero massimo di record per transazione
+    """
+
+    def __init__(self, path: str, max_records: Optional[int] = None,
+                 max_age_seconds: Optional[float] = None, keep_text: bool = True,
+                 flush_interval: float = 1.0, batch_size: int = 1000):
+        self.path = path
+        self.max_records = max_records
+        self.max_age_ms = int(max_age_seconds * 1000) if max_age_seconds else None
+        self.keep_text = keep_text
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._queue: queue.Queue = queue.Queue()
+        self._connection().executescript(_SCHEMA)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid: Optional[int] = None
+        self._writer_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connessione per thread, ricreata dopo un fork (pid diverso)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _ensure_writer(self) -> None:
+        # Il thread di scrittura non sopravvive al fork: uno per processo
+        if self._writer_pid == os.getpid():
+            return
+        with self._writer_lock:
+            if self._writer_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._writer = threading.Thread(target=self._write_loop, name='sentiment-writer', daemon=True)
+                self._writer.start()
+                self._writer_pid = os.getpid()
+
+    # ------------------------------------------------------------------
+    # Scrittura
+    # ------------------------------------------------------------------
+
+    def add(self, topic: str, sentiment: str, polarity: float, text: Optional[str] = None) -> None:
+        """Accoda un record (nessun accesso al disco nel thread chiamante)"""
+        self._ensure_writer()
+        self._queue.put((topic, now_ms(), SENTIMENT_CODES[sentiment], float(polarity),
+                         text if self.keep_text else None))
+
+    def flush(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Attende che tutti i record accodati siano scritti.
+
+        Args:
+            timeout: Attesa massima in secondi (None = senza limite)
+
+        Returns:
+            bool: False se allo scadere del timeout restano record da scrivere
+        """
+        if self._writer_pid != os.getpid():
+            return True
+        pending = self._queue
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with pending.all_tasks_done:
+            while pending.unfinished_tasks:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    logger.warning(f"Storage SQLite: {pending.unfinished_tasks} record non scritti allo scadere del flush")
+                    return False
+                pending.all_tasks_done.wait(remaining)
+        return True
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Qualsiasi errore: il blocco va perso ma il thread di scrittura resta attivo
+                logger.error(f"Errore scrittura storage SQLite ({len(batch)} record persi): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[tuple]) -> None:
+        # Aggregati del blocco calcolati in memoria, poi uniti a quelli salvati
+        batch_stats: Dict[str, RunningStats] = {}
+        last_ts: Dict[str, int] = {}
+        buckets: Dict[tuple, list] = {}
+        slots = {1: 0, -1: 1, 0: 2}
+        for topic, ts_ms, code, polarity, _ in batch:
+            batch_stats.setdefault(topic, RunningStats()).add(code, polarity)
+            last_ts[topic] = max(last_ts.get(topic, ts_ms), ts_ms)
+            for interval, size in TIMESERIES_INTERVALS.items():
+                bucket = buckets.setdefault((topic, interval, ts_ms - ts_ms % size), [0, 0, 0, 0.0])
+                bucket[slots[code]] += 1
+                bucket[3] += polarity
+
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT INTO posts (topic, ts_ms, sentiment, polarity, text) VALUES (?, ?, ?, ?, ?)', batch
+            )
+            merged_stats: Dict[str, RunningStats] = {}
+            for topic, stats in batch_stats.items():
+                merged = merged_stats[topic] = self._load_stats(conn, topic) or RunningStats()
+                merged.merge(stats)
+            self._apply_retention(conn, merged_stats, max(last_ts.values()))
+            for topic, merged in merged_stats.items():
+                conn.execute(
+                    'INSERT OR REPLACE INTO topic_stats '
+                    '(topic, positive, negative, neutral, mean, m2, last_ts_ms) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (topic, merged.counts[1], merged.counts[-1], merged.counts[0],
+                     merged.mean, merged.m2, last_ts[topic])
+                )
+            conn.executemany(_BUCKET_UPSERT, [key + tuple(values) for key, values in buckets.items()])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _apply_retention(self, conn: sqlite3.Connection, merged_stats: Dict[str, RunningStats],
+                         current_ms: int) -> None:
+        """
+        Elimina i post dei topic del blocco fuori dalla retention e li toglie dagli
+        aggregati (`merged_stats`, aggiornato sul posto).
+
+        I topic senza nuovi post non vengono letti: il limite di età viene applicato
+        alla loro prossima lettura (vedi expire).
+        """
+        for topic, stats in merged_stats.items():
+            if self.max_age_ms is not None:
+                self._remove_older(conn, topic, stats, current_ms - self.max_age_ms)
+            if self.max_records is not None and stats.count > self.max_records:
+                removed = conn.execute(
+                    'SELECT rowid, sentiment, polarity FROM posts WHERE topic = ? '
+                    'ORDER BY ts_ms, rowid LIMIT ?', (topic, stats.count - self.max_records)
+                ).fetchall()
+                for _, code, polarity in removed:
+                    stats.remove(code, polarity)
+                conn.executemany('DELETE FROM posts WHERE rowid = ?', [(row[0],) for row in removed])
+
+    @staticmethod
+    def _remove_older(conn: sqlite3.Connection, topic: str, stats: RunningStats, cutoff: int) -> bool:
+        """Elimina i post del topic con timestamp < cutoff e li toglie da `stats`"""
+        removed = conn.execute(
+            'SELECT sentiment, polarity FROM posts WHERE topic = ? AND ts_ms < ?', (topic, cutoff)
+        ).fetchall()
+        if not removed:
+            return False
+        for code, polarity in removed:
+            stats.remove(code, polarity)
+        conn.execute('DELETE FROM posts WHERE topic = ? AND ts_ms < ?', (topic, cutoff))
+        return True
+
+    def expire(self, topic: str) -> None:
+        """
+        Retention per età al momento della lettura (anche senza nuovi inserimenti).
+
+        Il controllo usa l'indice (topic, ts_ms) senza lock di scrittura; la
+        transazione viene aperta solo se ci sono post scaduti.
+        """
+        if self.max_age_ms is None:
+            return
+        cutoff = now_ms() - self.max_age_ms
+        conn = self._connection()
+        expired = conn.execute(
+            'SELECT 1 FROM posts WHERE topic = ? AND ts_ms < ? LIMIT 1', (topic, cutoff)
+        ).fetchone()
+        if expired is None:
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            stats = self._load_stats(conn, topic)
+            if stats is not None and self._remove_older(conn, topic, stats, cutoff):
+                conn.execute(
+                    'UPDATE topic_stats SET positive = ?, negative = ?, neutral = ?, mean = ?, m2 = ? '
+                    'WHERE topic = ?',
+                    (stats.counts[1], stats.counts[-1], stats.counts[0], stats.mean, stats.m2, topic)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    # ------------------------------------------------------------------
+    # Lettura (interfaccia di SentimentStorage)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load_stats(conn: sqlite3.Connection, topic: str) -> Optional[RunningStats]:
+        row = conn.execute(
+            'SELECT positive, negative, neutral, mean, m2 FROM topic_stats WHERE topic = ?', (topic,)
+        ).fetchone()
+        if row is None:
+            return None
+        positive, negative, neutral, mean, m2 = row
+        return RunningStats.from_values({1: positive, -1: negative, 0: neutral}, mean, m2)
+
+    def __contains__(self, topic: str) -> bool:
+        return self._connection().execute(
+            'SELECT 1 FROM topic_stats WHERE topic = ?', (topic,)
+        ).fetchone() is not None
+
+    def __getitem__(self, topic: str) -> 'SQLiteTopicView':
+        if topic not in self:
+            raise KeyError(topic)
+        return SQLiteTopicView(self, topic)
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM topic_stats').fetchone()[0]
+
+    def topics(self):
+        rows = self._connection().execute('SELECT topic FROM topic_stats').fetchall()
+        return [(topic, SQLiteTopicView(self, topic)) for (topic,) in rows]
+
+
+class SQLiteTopicView:
+    """Vista di un topic sul database, con la stessa interfaccia di TopicStore"""
+
+    def __init__(self, storage: SQLiteSentimentStorage, topic: str):
+        self.storage = storage
+        self.topic = topic
+
+    @property
+    def stats(self) -> RunningStats:
+        """Aggregati dei post nella finestra di retention"""
+        self.storage.expire(self.topic)
+        return self.storage._load_stats(self.storage._connection(), self.topic) or RunningStats()
+
+    def __len__(self) -> int:
+        return self.stats.count
+
+    @property
+    def last_timestamp_ms(self) -> Optional[int]:
+        row = self.storage._connection().execute(
+            'SELECT last_ts_ms FROM topic_stats WHERE topic = ?', (self.topic,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def timeseries_range(self, interval: str, from_ms: Optional[int] = None,
+                         to_ms: Optional[int] = None) -> List[Dict]:
+        size = TIMESERIES_INTERVALS[interval]
+        from_ms = from_ms - from_ms % size if from_ms is not None else -1
+        to_ms = to_ms if to_ms is not None else 2 ** 62
+        rows = self.storage._connection().execute(
+            'SELECT start_ms, positive, negative, neutral, polarity_sum FROM topic_buckets '
+            'WHERE topic = ? AND interval = ? AND start_ms >= ? AND start_ms < ? ORDER BY start_ms',
+            (self.topic, interval, from_ms, to_ms)
+        ).fetchall()
+        return [format_bucket(*row) for row in rows]
+
+    def records(self, from_ms: Optional[int] = None, to_ms: Optional[int] = None,
+                sentiment: Optional[str] = None) -> Iterator[Dict]:
+        """Record del topic letti dal cursore, senza caricarli tutti in memoria (filtri come TopicStore)"""
+        query = 'SELECT text, sentiment, polarity, ts_ms FROM posts WHERE topic = ?'
+        params = [self.topic]
+        if self.storage.max_age_ms is not None:
+            # Solo lettura: i post scaduti vengono eliminati da expire
+            cutoff = now_ms() - self.storage.max_age_ms
+            from_ms = cutoff if from_ms is None else max(from_ms, cutoff)
+        if from_ms is not None:
+            query += ' AND ts_ms >= ?'
+            params.append(from_ms)
+        if to_ms is not None:
+            query += ' AND ts_ms < ?'
+            params.append(to_ms)
+        if sentiment is not None:
+            query += ' AND sentiment = ?'
+            params.append(SENTIMENT_CODES[sentiment])
+        cursor = self.storage._connection().execute(query + ' ORDER BY ts_ms', params)
+        for text, code, polarity, ts_ms in cursor:
+            yield {
+                'text': text,
+                'sentiment': SENTIMENT_LABELS[code],
+                'polarity': round(polarity, 3),
+                'timestamp': ms_to_iso(ts_ms)
+            }
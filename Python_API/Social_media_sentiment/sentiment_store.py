@@ -0,0 +1,342 @@
+"""
+Storage colonnare per i risultati di sentiment, per topic.
+
+Ogni topic conserva i post in array tipizzati (modulo `array` della libreria standard):
+  • polarity   float32  (4 byte)
+  • sentiment  int8     (1 byte, codice -1/0/+1)
+  • timestamp  int64    (8 byte, epoch in millisecondi)
+
+Circa 13 byte per post (più il testo, se conservato), con limite di retention
+per numero di record e/o età: la memoria resta prevedibile anche con milioni di post.
+"""
+
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+import threading
+import time
+
+# Codifica compatta delle label di sentiment
+SENTIMENT_CODES = {'negativo': -1, 'neutro': 0, 'positivo': 1}
+SENTIMENT_LABELS = {code: label for label, code in SENTIMENT_CODES.items()}
+
+# Compatta gli array solo quando la parte scartata è consistente (costo ammortizzato O(1))
+_COMPACT_MIN = 1024
+# Record copiati per volta (sotto lock) durante l'iterazione di records()
+_RECORDS_BLOCK = 1000
+
+
+def now_ms() -> int:
+    """Timestamp corrente in millisecondi dall'epoch"""
+    return int(time.time() * 1000)
+
+
+def ms_to_iso(timestamp_ms: int) -> str:
+    """Converte un timestamp in millisecondi nel formato ISO usato dalle API (UTC, con offset)"""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat()
+
+
+class RunningStats:
+    """
+    Aggregati incrementali di un topic: conteggi per label e media/varianza della
+    polarity con l'algoritmo di Welford. Aggiornamento e lettura costano O(1).
+    """
+
+    def __init__(self):
+        self.counts = {code: 0 for code in SENTIMENT_LABELS}
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, code: int, polarity: float) -> None:
+        self.counts[code] += 1
+        self.count += 1
+        delta = polarity - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (polarity - self.mean)
+
+    def remove(self, code: int, polarity: float) -> None:
+        """Toglie un valore (record uscito dalla finestra di retention)"""
+        self.counts[code] -= 1
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self._m2 = 0.0
+            return
+        delta = polarity - self.mean
+        self.mean -= delta / self.count
+        self._m2 = max(self._m2 - delta * (polarity - self.mean), 0.0)
+
+    def merge(self, other: 'RunningStats') -> None:
+        """Unisce gli aggregati di un altro insieme di valori (formula di Chan)"""
+        if other.count == 0:
+            return
+        for code, count in other.counts.items():
+            self.counts[code] += count
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+
+    @classmethod
+    def from_values(cls, counts: Dict[int, int], mean: float, m2: float) -> 'RunningStats':
+        """Ricostruisce gli aggregati da valori salvati (es. database)"""
+        stats = cls()
+        stats.counts.update(counts)
+        stats.count = sum(counts.values())
+        stats.mean = mean
+        stats._m2 = m2
+        return stats
+
+    @property
+    def m2(self) -> float:
+        return self._m2
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    def label_count(self, label: str) -> int:
+        return self.counts[SENTIMENT_CODES[label]]
+
+
+# Intervalli delle serie temporali (millisecondi) e numero massimo di bucket conservati
+TIMESERIES_INTERVALS = {'minute': 60_000, 'hour': 3_600_000, 'day': 86_400_000}
+TIMESERIES_MAX_BUCKETS = {'minute': 7 * 24 * 60, 'hour': 365 * 24, 'day': None}
+
+
+class TimeSeries:
+    """
+    Rollup per minuto/ora/giorno (UTC) mantenuti all'inserimento.
+
+    Ogni bucket contiene [positivi, negativi, neutri, somma polarity]; le query
+    leggono solo i bucket nell'intervallo richiesto (ricerca binaria sugli inizi).
+    I rollup sono indipendenti dalla retention dei singoli post.
+    """
+
+    # Indice nel bucket per codice di sentiment
+    _SLOT = {1: 0, -1: 1, 0: 2}
+
+    def __init__(self):
+        self._buckets = {name: {} for name in TIMESERIES_INTERVALS}
+        self._starts = {name: [] for name in TIMESERIES_INTERVALS}
+
+    def add(self, timestamp_ms: int, code: int, polarity: float) -> None:
+        for name, size in TIMESERIES_INTERVALS.items():
+            start = timestamp_ms - timestamp_ms % size
+            buckets = self._buckets[name]
+            bucket = buckets.get(start)
+            if bucket is None:
+                bucket = buckets[start] = [0, 0, 0, 0.0]
+                starts = self._starts[name]
+                if not starts or start > starts[-1]:
+                    starts.append(start)
+                else:
+                    insort(starts, start)
+                limit = TIMESERIES_MAX_BUCKETS[name]
+                if limit is not None and len(starts) > limit:
+                    del buckets[starts.pop(0)]
+            bucket[self._SLOT[code]] += 1
+            bucket[3] += polarity
+
+    def query(self, interval: str, from_ms: Optional[int] = None, to_ms: Optional[int] = None) -> List[Dict]:
+        """Bucket che si sovrappongono a [from_ms, to_ms)"""
+        starts = self._starts[interval]
+        buckets = self._buckets[interval]
+        lo = bisect_left(starts, from_ms - from_ms % TIMESERIES_INTERVALS[interval]) if from_ms is not None else 0
+        hi = bisect_left(starts, to_ms) if to_ms is not None else len(starts)
+        return [format_bucket(start, *buckets[start]) for start in starts[lo:hi]]
+
+
+def format_bucket(start_ms: int, positive: int, negative: int, neutral: int, polarity_sum: float) -> Dict:
+    """Bucket di serie temporale nel formato restituito dalle API"""
+    total = positive + negative + neutral
+    return {
+        'start': ms_to_iso(start_ms),
+        'total': total,
+        'positive': positive,
+        'negative': negative,
+        'neutral': neutral,
+        'avg_polarity': round(polarity_sum / total, 3) if total else 0
+    }
+
+
+class TopicStore:
+    """
+    Finestra di retention di un topic su array tipizzati.
+
+    I record più vecchi vengono scartati avanzando l'indice di testa; gli array
+    vengono compattati quando la parte scartata supera metà della capacità.
+    Il limite di età viene applicato anche dalle letture, quindi un topic che non
+    riceve più post non riporta record e statistiche scaduti.
+    """
+
+    def __init__(self, max_records: Optional[int] = None,
+                 max_age_seconds: Optional[float] = None,
+                 keep_text: bool = True):
+        self.max_records = max_records
+        self.max_age_ms = int(max_age_seconds * 1000) if max_age_seconds else None
+        self.keep_text = keep_text
+        self._polarity = array('f')
+        self._sentiment = array('b')
+        self._timestamp = array('q')
+        self._text = [] if keep_text else None
+        self._head = 0
+        self._offset = 0  # record rimossi dalle compattazioni (indice assoluto = _offset + locale)
+        self._lock = threading.Lock()
+        self._stats = RunningStats()
+        self.timeseries = TimeSeries()
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._timestamp) - self._head
+
+    @property
+    def stats(self) -> RunningStats:
+        """Aggregati dei record nella finestra di retention"""
+        self._expire()
+        return self._stats
+
+    def append(self, sentiment: str, polarity: float,
+               text: Optional[str] = None, timestamp_ms: Optional[int] = None) -> None:
+        """Aggiunge un record e applica la retention"""
+        timestamp_ms = now_ms() if timestamp_ms is None else timestamp_ms
+        code = SENTIMENT_CODES[sentiment]
+        with self._lock:
+            self._polarity.append(polarity)
+            self._sentiment.append(code)
+            self._timestamp.append(timestamp_ms)
+            if self._text is not None:
+                self._text.append(text)
+            # Aggregati con il valore memorizzato (float32), come quelli che verranno rimossi
+            self._stats.add(code, self._polarity[-1])
+            self.timeseries.add(timestamp_ms, code, polarity)
+            self._evict(timestamp_ms)
+
+    def _evict(self, current_ms: int) -> None:
+        end = len(self._timestamp)
+        head = self._head
+        if self.max_records is not None and end - head > self.max_records:
+            head = end - self.max_records
+        if self.max_age_ms is not None:
+            cutoff = current_ms - self.max_age_ms
+            while head < end and self._timestamp[head] < cutoff:
+                head += 1
+        for index in range(self._head, head):
+            self._stats.remove(self._sentiment[index], self._polarity[index])
+        self._head = head
+        if head >= _COMPACT_MIN and head * 2 >= end:
+            self._compact()
+
+    def _expire(self) -> None:
+        """Retention per età al momento della lettura (anche senza nuovi inserimenti)"""
+        if self.max_age_ms is not None:
+            with self._lock:
+                self._evict(now_ms())
+
+    def _compact(self) -> None:
+        head = self._head
+        del self._polarity[:head]
+        del self._sentiment[:head]
+        del self._timestamp[:head]
+        if self._text is not None:
+            del self._text[:head]
+        self._offset += head
+        self._head = 0
+
+    def timeseries_range(self, interval: str, from_ms: Optional[int] = None,
+                         to_ms: Optional[int] = None) -> List[Dict]:
+        """Serie temporale aggregata del topic (vedi TimeSeries.query)"""
+        with self._lock:
+            if self.max_age_ms is not None:
+                self._evict(now_ms())
+            return self.timeseries.query(interval, from_ms, to_ms)
+
+    @property
+    def last_timestamp_ms(self) -> Optional[int]:
+        return self._timestamp[-1] if len(self) else None
+
+    def records(self, from_ms: Optional[int] = None, to_ms: Optional[int] = None,
+                sentiment: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Record nel formato storico (text, sentiment, polarity, timestamp ISO).
+        
+        I record vengono copiati a blocchi sotto lock, quindi l'iterazione usa memoria
+        costante ed è sicura anche con inserimenti e compattazioni concorrenti; restituisce
+        i record presenti all'inizio dell'iterazione e ancora nella finestra di retention.
+        
+        Args:
+            from_ms: Solo record con timestamp >= from_ms
+            to_ms: Solo record con timestamp < to_ms
+            sentiment: Solo record con questa label
+        """
+        code = SENTIMENT_CODES[sentiment] if sentiment is not None else None
+        self._expire()
+        with self._lock:
+            end = self._offset + len(self._timestamp)
+            start = self._head
+            if from_ms is not None:
+                start = bisect_left(self._timestamp, from_ms, start)
+            position = self._offset + start
+        
+        while position < end:
+            with self._lock:
+                local = max(position - self._offset, self._head)
+                stop = min(local + _RECORDS_BLOCK, end - self._offset)
+                timestamps = self._timestamp[local:stop]
+                codes = self._sentiment[local:stop]
+                polarities = self._polarity[local:stop]
+                texts = self._text[local:stop] if self._text is not None else None
+                position = self._offset + stop
+            for i, timestamp_ms in enumerate(timestamps):
+                if to_ms is not None and timestamp_ms >= to_ms:
+                    return
+                if code is not None and codes[i] != code:
+                    continue
+                yield {
+                    'text': texts[i] if texts is not None else None,
+                    'sentiment': SENTIMENT_LABELS[codes[i]],
+                    'polarity': round(polarities[i], 3),
+                    'timestamp': ms_to_iso(timestamp_ms)
+                }
+
+    def memory_bytes(self) -> int:
+        """Memoria occupata dagli array numerici (testo escluso)"""
+        return sum(
+            arr.buffer_info()[1] * arr.itemsize
+            for arr in (self._polarity, self._sentiment, self._timestamp)
+        )
+
+
+class SentimentStorage:
+    """Raccolta di TopicStore, creati al primo inserimento con la retention configurata"""
+
+    def __init__(self, max_records: Optional[int] = None,
+                 max_age_seconds: Optional[float] = None,
+                 keep_text: bool = True):
+        self.max_records = max_records
+        self.max_age_seconds = max_age_seconds
+        self.keep_text = keep_text
+        self._topics: Dict[str, TopicStore] = {}
+
+    def __contains__(self, topic: str) -> bool:
+        return topic in self._topics
+
+    def __getitem__(self, topic: str) -> TopicStore:
+        return self._topics[topic]
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def topics(self):
+        """Coppie (topic, store) copiate: sicure anche se un'altra richiesta crea un topic"""
+        return list(self._topics.items())
+
+    def add(self, topic: str, sentiment: str, polarity: float, text: Optional[str] = None) -> None:
+        store = self._topics.get(topic)
+        if store is None:
+            store = self._topics.setdefault(topic, TopicStore(
+                self.max_records, self.max_age_seconds, self.keep_text
+            ))
+        store.append(sentiment, polarity, text)
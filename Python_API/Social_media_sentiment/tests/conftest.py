@@ -0,0 +1,17 @@
+"""
+Configurazione dei test del servizio di sentiment.
+
+I moduli del servizio diventano importabili e i file SQLite creati all'import
+di main.py (coda dei job) finiscono in una cartella temporanea.
+"""
+
+import os
+import sys
+import tempfile
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_DIR not in sys.path:
+    sys.path.insert(0, SERVICE_DIR)
+
+os.environ.setdefault('SENTIMENT_JOBS_DB', os.path.join(tempfile.mkdtemp(), 'sentiment_jobs.db'))
+os.environ.setdefault('SENTIMENT_CACHE_BACKEND', 'memory')
@@ -0,0 +1,51 @@
+"""Test della cache dei risultati di analisi (chiavi, TTL, LRU, backend SQLite)"""
+
+import time
+
+import pytest
+
+from analysis_cache import MemoryCache, SQLiteCache, cache_key, create_cache, normalize_text
+
+
+def test_key_ignores_urls_and_whitespace():
+    assert cache_key('Adoro   Netflix https://t.co/abc') == cache_key('Adoro Netflix')
+    assert normalize_text('  a \n b  www.example.com ') == 'a b'
+
+
+@pytest.mark.parametrize('upper, lower', [('I am happy :D', 'i am happy :d'), ('Nice :-D', 'nice :-d')])
+def test_key_preserves_case(upper, lower):
+    # TextBlob distingue le maiuscole negli emoticon: le due varianti non condividono la chiave
+    assert cache_key(upper) != cache_key(lower)
+
+
+def test_cached_analysis_matches_textblob_for_case_variants(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, 'analysis_cache', MemoryCache())
+    texts = ['Nice :-D', 'nice :-d', 'I am happy :D', 'i am happy :d']
+    for text in texts:
+        main.SentimentAnalyzer.analyze_text(text)
+    for text in texts:
+        assert main.SentimentAnalyzer.analyze_text(text)['polarity'] == main.SentimentAnalyzer._analyze(text)['polarity']
+
+
+def test_memory_cache_ttl_and_lru():
+    cache = MemoryCache(max_size=2, ttl=0.05)
+    cache.set('a', {'v': 1})
+    cache.set('b', {'v': 2})
+    assert cache.get('a') == {'v': 1}
+    cache.set('c', {'v': 3})  # 'b' è il meno recente
+    assert cache.get('b') is None
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    assert cache.stats.as_dict()['hits'] == 1
+    assert cache.stats.evictions == 2
+
+
+def test_sqlite_cache_roundtrip(tmp_path):
+    cache = create_cache('sqlite', max_size=10, ttl=60, path=str(tmp_path / 'cache.db'))
+    assert isinstance(cache, SQLiteCache)
+    cache.set('k', {'sentiment': 'positivo'})
+    assert cache.get('k') == {'sentiment': 'positivo'}
+    assert cache.get('missing') is None
+    assert create_cache('none') is None
@@ -0,0 +1,21 @@
+"""Test dell'analisi batch sul process pool"""
+
+import main
+
+
+def test_pool_results_match_serial_analysis(monkeypatch):
+    monkeypatch.setitem(main.app.config, 'BATCH_WORKERS', 2)
+    monkeypatch.setitem(main.app.config, 'BATCH_PARALLEL_THRESHOLD', 1)
+    monkeypatch.setitem(main.app.config, 'BATCH_CHUNK_SIZE', 2)
+    monkeypatch.setattr(main, '_batch_pool', None)
+    posts = ['I love it', 'terrible service', 'Nice :-D', 'nice :-d', 'just a text']
+    try:
+        pool = main.get_batch_pool()
+        # Il pool è già scaldato: tutti i processi sono avviati prima del primo batch
+        assert len(pool._processes) == 2
+        analyses = main.analyze_posts(posts)
+        assert main.get_batch_pool() is pool
+    finally:
+        if main._batch_pool is not None:
+            main._batch_pool.shutdown()
+    assert [a['polarity'] for a in analyses] == [main.SentimentAnalyzer._analyze(p)['polarity'] for p in posts]
@@ -0,0 +1,46 @@
+"""Test della deduplicazione dei batch e dei cluster di quasi-duplicati"""
+
+from dedup import MinHashLSH, group_duplicates, near_duplicate_stats
+
+
+def test_group_duplicates_keeps_order_and_positions():
+    unique, positions = group_duplicates(['a b', 'c', 'a  b https://t.co/x', 'c', None])
+    assert unique == ['a b', 'c', None]
+    assert positions == [0, 1, 0, 1, 2]
+
+
+def test_group_duplicates_is_case_sensitive():
+    # Regressione: 'nice :-d' ha una polarity diversa da 'Nice :-D'
+    unique, positions = group_duplicates(['Nice :-D', 'nice :-d', 'Nice :-D'])
+    assert unique == ['Nice :-D', 'nice :-d']
+    assert positions == [0, 1, 0]
+
+
+def test_batch_endpoint_matches_serial_analysis_for_case_variants():
+    import main
+
+    posts = ['Nice :-D', 'nice :-d']
+    response = main.app.test_client().post('/api/v1/analyze/batch', json={'topic': 'dedup', 'posts': posts})
+    results = response.get_json()['results']
+    assert [r['polarity'] for r in results] == [main.SentimentAnalyzer._analyze(p)['polarity'] for p in posts]
+    assert response.get_json()['statistics']['unique_posts'] == 2
+
+
+def test_near_duplicates_ignore_case_and_count_repeats():
+    posts = [
+        'the new season of the show is really great',
+        'The new season of the show is really GREAT',
+        'completely different text about the weather today',
+        'the new season of the show is really great',
+    ]
+    unique, positions = group_duplicates(posts)
+    stats = near_duplicate_stats(unique, positions, MinHashLSH(threshold=0.8))
+    assert stats['clusters'] == 1
+    assert stats['largest_cluster'] == 3
+    assert stats['posts_in_clusters'] == 3
+
+
+def test_empty_texts_are_never_clustered():
+    lsh = MinHashLSH()
+    assert lsh.signature('   ') is None
+    assert lsh.clusters(['', '']) == [0, 1]
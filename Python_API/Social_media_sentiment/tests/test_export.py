@@ -0,0 +1,50 @@
+"""Test dell'export in streaming (CSV/JSONL) dei post di un topic"""
+
+import csv
+import io
+import json
+
+import pytest
+
+import main
+from sentiment_store import TopicStore
+
+BASE_MS = 1_762_000_000_000  # 2025-11-01T12:26:40Z
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = TopicStore()
+    posts = [('positivo', 0.5, 'great, "really"'), ('negativo', -0.5, 'bad'),
+             ('positivo', 0.25, 'nice\nline'), ('neutro', 0.0, 'ok')]
+    for i, (sentiment, polarity, text) in enumerate(posts):
+        store.append(sentiment, polarity, text, timestamp_ms=BASE_MS + i * 1000)
+    monkeypatch.setattr(main, 'sentiment_storage', {'brand': store})
+    return main.app.test_client()
+
+
+def test_csv_export_with_filters(client):
+    response = client.get(f'/api/v1/stats/brand?format=csv&sentiment=positivo&from={BASE_MS // 1000}')
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=sentiment_brand.csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(r['text'], r['polarity']) for r in rows] == [('great, "really"', '0.5'), ('nice\nline', '0.25')]
+    assert rows[0]['timestamp'] == '2025-11-01T12:26:40+00:00'
+
+
+def test_jsonl_export_time_range(client):
+    response = client.get(f'/api/v1/stats/brand?format=jsonl&from={BASE_MS // 1000 + 1}&to={BASE_MS // 1000 + 3}')
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r['text'] for r in records] == ['bad', 'nice\nline']
+
+
+def test_invalid_filters_are_rejected(client):
+    assert client.get('/api/v1/stats/brand?format=csv&sentiment=felice').status_code == 400
+    assert client.get('/api/v1/stats/brand?format=jsonl&from=ieri').status_code == 400
+
+
+def test_export_records_is_chunked(monkeypatch):
+    monkeypatch.setattr(main, 'EXPORT_CHUNK_ROWS', 2)
+    records = ({'text': str(i), 'sentiment': 'neutro', 'polarity': 0.0, 'timestamp': 't'} for i in range(5))
+    chunks = list(main.export_records(records, 'jsonl'))
+    assert [chunk.count('\n') for chunk in chunks] == [2, 2, 1]
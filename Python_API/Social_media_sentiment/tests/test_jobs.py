@@ -0,0 +1,107 @@
+"""Test della coda persistente dei job"""
+
+import sqlite3
+import time
+
+import pytest
+
+from jobs import JobQueue
+
+
+def _analyze(texts):
+    return [{'sentiment': 'neutro', 'length': len(text)} for text in texts]
+
+
+def _wait_for(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} non concluso: {queue.get(job_id)}")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+
+def test_submit_does_not_hold_write_lock_while_reading_upload(db_path):
+    queue = JobQueue(db_path, _analyze, chunk_size=2)
+    other = sqlite3.connect(db_path, timeout=0, isolation_level=None)
+
+    def upload():
+        for i in range(5):
+            # Un'altra connessione può scrivere mentre l'upload viene letto
+            other.execute('BEGIN IMMEDIATE')
+            other.execute('COMMIT')
+            yield f'post {i}'
+
+    job_id = queue.submit('t', upload())
+    job = queue.get(job_id)
+    assert (job['status'], job['total']) == ('queued', 5)
+
+
+def test_failed_upload_leaves_no_job(db_path):
+    queue = JobQueue(db_path, _analyze, chunk_size=2)
+
+    def upload():
+        yield 'a'
+        yield 'b'
+        yield 'c'
+        raise ValueError('upload interrotto')
+
+    with pytest.raises(ValueError):
+        queue.submit('t', upload())
+    conn = queue._connection()
+    assert conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 0
+    assert conn.execute('SELECT COUNT(*) FROM job_items').fetchone()[0] == 0
+
+
+def test_jobs_run_to_completion_and_save_results(db_path):
+    stored = []
+    queue = JobQueue(db_path, _analyze, on_results=lambda topic, texts, analyses: stored.extend(texts),
+                     workers=1, chunk_size=2)
+    posts = ['uno', 'due', 'tre', 'quattro', 'cinque']
+    job_id = queue.submit('t', posts)
+    queue.start()
+    try:
+        job = _wait_for(queue, job_id)
+    finally:
+        queue.stop()
+    assert (job['status'], job['processed'], job['progress']) == ('done', 5, '100.0%')
+    assert job['finished_at'] is not None
+    assert [r['length'] for r in queue.results(job_id)] == [len(p) for p in posts]
+    assert [r['index'] for r in queue.results(job_id, page=2, page_size=2)] == [2, 3]
+    assert stored == posts
+
+
+def test_failed_job_records_error_and_finish_time(db_path):
+    def broken(texts):
+        raise RuntimeError('modello non disponibile')
+
+    queue = JobQueue(db_path, broken, workers=1)
+    job_id = queue.submit('t', ['a'])
+    queue.start()
+    try:
+        job = _wait_for(queue, job_id)
+    finally:
+        queue.stop()
+    assert job['status'] == 'failed'
+    assert job['error'] == 'modello non disponibile'
+    assert job['finished_at'] is not None
+
+
+def test_cleanup_removes_only_expired_finished_jobs(db_path):
+    queue = JobQueue(db_path, _analyze, retention_seconds=3600)
+    old, recent, queued = (queue.submit('t', ['a', 'b']) for _ in range(3))
+    conn = queue._connection()
+    conn.execute("UPDATE jobs SET status = 'done', finished_at = '2000-01-01T00:00:00' WHERE id = ?", (old,))
+    conn.execute("UPDATE jobs SET status = 'failed', finished_at = '2999-01-01T00:00:00' WHERE id = ?", (recent,))
+
+    assert queue.cleanup() == 1
+    assert queue.get(old) is None
+    assert queue.get(recent) is not None and queue.get(queued) is not None
+    assert conn.execute('SELECT COUNT(*) FROM job_items WHERE job_id = ?', (old,)).fetchone()[0] == 0
+    assert JobQueue(db_path, _analyze).cleanup() == 0
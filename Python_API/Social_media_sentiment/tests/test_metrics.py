@@ -0,0 +1,45 @@
+"""Test del formato Prometheus e dell'endpoint /metrics"""
+
+import main
+from metrics import Gauge, Histogram, MetricsRegistry
+from sentiment_store import SentimentStorage
+
+
+def test_histogram_buckets_are_cumulative_and_labels_escaped():
+    histogram = Histogram('latency_seconds', 'Latenza', buckets=(0.1, 1.0), labelnames=('path',))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/a"b')
+    lines = histogram.render()
+    assert lines[:2] == ['# HELP latency_seconds Latenza', '# TYPE latency_seconds histogram']
+    assert lines[2:] == [
+        'latency_seconds_bucket{path="/a\\"b",le="0.1"} 2',
+        'latency_seconds_bucket{path="/a\\"b",le="1.0"} 3',
+        'latency_seconds_bucket{path="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{path="/a\\"b"} 3.65',
+        'latency_seconds_count{path="/a\\"b"} 4',
+    ]
+
+
+def test_registry_renders_gauges_at_scrape_time():
+    values = {'x': 1}
+    registry = MetricsRegistry()
+    registry.register(Gauge('items', 'Elementi', lambda: [((name,), v) for name, v in values.items()],
+                            labelnames=('name',), kind='counter'))
+    values['x'] = 5
+    assert registry.render() == '# HELP items Elementi\n# TYPE items counter\nitems{name="x"} 5\n'
+
+
+def test_metrics_endpoint_reports_requests_and_topics(monkeypatch):
+    storage = SentimentStorage()
+    storage.add('brand', 'positivo', 0.5)
+    monkeypatch.setattr(main, 'sentiment_storage', storage)
+
+    client = main.app.test_client()
+    client.post('/api/v1/analyze/batch', json={'topic': 'metrics', 'posts': ['good', 'bad']})
+    response = client.get('/metrics')
+    assert response.content_type == MetricsRegistry.content_type
+    body = response.get_data(as_text=True)
+    assert 'sentiment_http_request_duration_seconds_count{endpoint="/api/v1/analyze/batch",method="POST",status="200"}' in body
+    assert 'sentiment_topic_records{topic="brand"} 1' in body
+    assert 'sentiment_batch_size_posts_bucket{source="batch",le="10"}' in body
+    assert 'sentiment_cache_hits_total{backend="memory"}' in body
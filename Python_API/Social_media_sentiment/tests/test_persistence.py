@@ -0,0 +1,68 @@
+"""Test dello storage SQLite: retention e aggregati come TopicStore"""
+
+import statistics
+
+import persistence
+from persistence import SQLiteSentimentStorage
+from sentiment_store import TopicStore
+
+
+class Clock:
+    """Orologio controllato dal test (millisecondi)"""
+
+    def __init__(self, ms: int):
+        self.ms = ms
+
+    def __call__(self) -> int:
+        return self.ms
+
+
+def _posts_in_db(storage, topic):
+    return storage._connection().execute('SELECT COUNT(*) FROM posts WHERE topic = ?', (topic,)).fetchone()[0]
+
+
+def test_max_age_applies_on_read_for_idle_topics(tmp_path, monkeypatch):
+    clock = Clock(1_000_000)
+    monkeypatch.setattr(persistence, 'now_ms', clock)
+    storage = SQLiteSentimentStorage(str(tmp_path / 'stats.db'), max_age_seconds=60, flush_interval=0.01)
+    storage.add('idle', 'positivo', 0.5, 'old')
+    storage.add('idle', 'negativo', -0.5, 'old')
+    assert storage.flush()
+    assert len(storage['idle']) == 2
+
+    clock.ms += 61_000
+    storage.add('busy', 'neutro', 0.0, 'new')
+    assert storage.flush()
+    # Il blocco di 'busy' non tocca gli altri topic
+    assert _posts_in_db(storage, 'idle') == 2
+    view = storage['idle']
+    assert list(view.records()) == []
+    assert len(view) == 0
+    assert view.stats.count == 0
+    assert _posts_in_db(storage, 'idle') == 0
+    assert len(storage['busy']) == 1
+
+    # Stesso comportamento dello storage in memoria
+    memory = TopicStore(max_age_seconds=60)
+    memory.append('positivo', 0.5, 'old', timestamp_ms=1_000_000)
+    assert len(memory) == 0 and list(memory.records()) == []
+
+
+def test_max_records_keeps_newest_and_updates_aggregates(tmp_path, monkeypatch):
+    clock = Clock(1_000_000)
+    monkeypatch.setattr(persistence, 'now_ms', clock)
+    storage = SQLiteSentimentStorage(str(tmp_path / 'stats.db'), max_records=3, flush_interval=0.01)
+    values = [('positivo', 0.9), ('negativo', -0.4), ('neutro', 0.0), ('positivo', 0.3), ('negativo', -0.8)]
+    for i, (sentiment, polarity) in enumerate(values):
+        clock.ms += 1000
+        storage.add('t', sentiment, polarity, str(i))
+        assert storage.flush()
+
+    view = storage['t']
+    assert [r['text'] for r in view.records()] == ['2', '3', '4']
+    kept = [polarity for _, polarity in values[2:]]
+    stats = view.stats
+    assert stats.count == 3
+    assert stats.label_count('positivo') == 1 and stats.label_count('negativo') == 1
+    assert abs(stats.mean - statistics.fmean(kept)) < 1e-9
+    assert abs(stats.variance - statistics.pvariance(kept)) < 1e-9
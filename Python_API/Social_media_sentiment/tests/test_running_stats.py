@@ -0,0 +1,64 @@
+"""Test degli aggregati incrementali (Welford/Chan) e di /api/v1/stats/<topic>"""
+
+import random
+import statistics
+
+import pytest
+
+import main
+from sentiment_store import RunningStats, SentimentStorage
+
+
+def _sample(n, seed):
+    rng = random.Random(seed)
+    return [(rng.choice((-1, 0, 1)), rng.uniform(-1, 1)) for _ in range(n)]
+
+
+def _stats(values):
+    stats = RunningStats()
+    for code, polarity in values:
+        stats.add(code, polarity)
+    return stats
+
+
+def _assert_matches(stats, values):
+    polarities = [polarity for _, polarity in values]
+    assert stats.count == len(values)
+    assert stats.counts == {code: sum(1 for c, _ in values if c == code) for code in (-1, 0, 1)}
+    assert stats.mean == pytest.approx(statistics.fmean(polarities), abs=1e-9)
+    assert stats.variance == pytest.approx(statistics.pvariance(polarities), abs=1e-9)
+
+
+def test_add_and_remove_match_direct_computation():
+    values = _sample(500, seed=1)
+    stats = _stats(values)
+    _assert_matches(stats, values)
+    for code, polarity in values[:200]:
+        stats.remove(code, polarity)
+    _assert_matches(stats, values[200:])
+
+
+def test_merge_matches_single_pass():
+    left, right = _sample(300, seed=2), _sample(120, seed=3)
+    merged = _stats(left)
+    merged.merge(_stats(right))
+    merged.merge(RunningStats())
+    _assert_matches(merged, left + right)
+
+    restored = RunningStats.from_values(merged.counts, merged.mean, merged.m2)
+    _assert_matches(restored, left + right)
+
+
+def test_stats_endpoint_summary(monkeypatch):
+    storage = SentimentStorage()
+    for sentiment, polarity in (('positivo', 0.8), ('positivo', 0.4), ('negativo', -0.6), ('neutro', 0.0)):
+        storage.add('brand', sentiment, polarity, 'post')
+    monkeypatch.setattr(main, 'sentiment_storage', storage)
+
+    client = main.app.test_client()
+    stats = client.get('/api/v1/stats/brand').get_json()['statistics']
+    assert (stats['total_analyzed'], stats['positive'], stats['negative'], stats['neutral']) == (4, 2, 1, 1)
+    assert stats['avg_polarity'] == 0.15
+    assert stats['polarity_std'] == round(statistics.pstdev([0.8, 0.4, -0.6, 0.0]), 3)
+    assert stats['sentiment_distribution']['positivo'] == '50.0%'
+    assert client.get('/api/v1/stats/missing').status_code == 404
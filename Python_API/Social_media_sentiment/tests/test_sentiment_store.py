@@ -0,0 +1,46 @@
+"""Test di TopicStore: retention, compattazione e aggregati"""
+
+import statistics
+
+import pytest
+
+from sentiment_store import SENTIMENT_LABELS, TopicStore
+
+
+def _values(n):
+    return [(SENTIMENT_LABELS[i % 3 - 1], ((i * 37) % 200 - 100) / 100) for i in range(n)]
+
+
+def test_max_records_with_compaction_keeps_newest_window():
+    store = TopicStore(max_records=1500)
+    values = _values(5000)
+    for i, (sentiment, polarity) in enumerate(values):
+        store.append(sentiment, polarity, str(i), timestamp_ms=1000 + i)
+
+    assert len(store) == 1500
+    records = list(store.records())
+    assert [r['text'] for r in records] == [str(i) for i in range(3500, 5000)]
+    kept = [record['polarity'] for record in records]
+    assert store.stats.count == 1500
+    assert store.stats.mean == pytest.approx(statistics.fmean(kept), abs=1e-3)
+    assert store.stats.variance == pytest.approx(statistics.pvariance(kept), abs=1e-3)
+    # Circa 13 byte per post, testo escluso, anche dopo le compattazioni
+    assert store.memory_bytes() < 13 * 5000
+
+
+def test_records_filters():
+    store = TopicStore()
+    for i, (sentiment, polarity) in enumerate(_values(30)):
+        store.append(sentiment, polarity, str(i), timestamp_ms=1000 + i)
+    records = list(store.records(from_ms=1010, to_ms=1020, sentiment='positivo'))
+    assert [r['text'] for r in records] == ['11', '14', '17']
+
+
+def test_max_age_applies_on_read():
+    store = TopicStore(max_age_seconds=60, keep_text=False)
+    store.append('positivo', 0.5, 'ignored', timestamp_ms=1000)
+    assert len(store) == 0
+    assert store.stats.count == 0
+    assert list(store.records()) == []
+    # Le serie temporali restano indipendenti dalla retention
+    assert store.timeseries_range('day')[0]['total'] == 1
@@ -0,0 +1,40 @@
+"""Test dell'avvio: TextBlob importato solo al primo utilizzo, warm-up e tempi in /health"""
+
+import json
+import os
+import subprocess
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Eseguito in un interprete nuovo: negli altri test TextBlob è già caricato
+SCRIPT = '''
+import json, sys
+import main
+
+client = main.app.test_client()
+client.get('/')
+client.get('/api/v1/stats/nessuno')
+before = {"textblob": "textblob" in sys.modules, "health": client.get('/api/v1/health').get_json()["startup"]}
+seconds = main.SentimentAnalyzer.warm_up()
+after = {"textblob": "textblob" in sys.modules, "health": client.get('/api/v1/health').get_json()["startup"],
+         "again": main.SentimentAnalyzer.warm_up() == seconds}
+print(json.dumps({"before": before, "after": after}))
+'''
+
+
+def test_lazy_import_and_warm_up(tmp_path):
+    env = {**os.environ, 'SENTIMENT_JOBS_DB': str(tmp_path / 'jobs.db'), 'SENTIMENT_CACHE_BACKEND': 'memory'}
+    env.pop('SENTIMENT_DB_PATH', None)
+    output = subprocess.run([sys.executable, '-c', SCRIPT], cwd=SERVICE_DIR, env=env,
+                            capture_output=True, text=True, timeout=120, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    before, after = result['before'], result['after']
+    assert not before['textblob']
+    assert before['health']['model_loaded'] is False
+    assert before['health']['import_seconds'] is not None
+    assert before['health']['warm_up_seconds'] is None
+    assert after['textblob'] and after['health']['model_loaded'] is True
+    assert after['health']['warm_up_seconds'] is not None
+    assert after['again']
@@ -0,0 +1,34 @@
+"""Test dell'endpoint di ingest NDJSON in streaming"""
+
+import json
+
+import main
+from sentiment_store import SentimentStorage
+
+
+def test_stream_analyzes_lines_and_reports_errors(monkeypatch):
+    storage = SentimentStorage()
+    monkeypatch.setattr(main, 'sentiment_storage', storage)
+    body = '\n'.join([
+        json.dumps('I love this phone'),
+        '',
+        json.dumps({'text': 'terrible battery', 'topic': 'battery'}),
+        '{broken',
+        json.dumps({'topic': 'no text'}),
+        json.dumps({'text': 'what a great camera'}),
+    ]) + '\n'
+
+    response = main.app.test_client().post('/api/v1/analyze/stream?topic=phone', data=body,
+                                           content_type='application/x-ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    results = [line for line in lines if 'sentiment' in line]
+    assert [(r['line'], r['topic']) for r in results] == [(1, 'phone'), (3, 'battery'), (6, 'phone')]
+    assert results[0]['polarity'] == main.SentimentAnalyzer._analyze('I love this phone')['polarity']
+    assert [line['line'] for line in lines if 'error' in line] == [4, 5]
+
+    summary = lines[-1]
+    assert summary['type'] == 'statistics'
+    assert {topic: s['total_analyzed'] for topic, s in summary['topics'].items()} == {'phone': 2, 'battery': 1}
+    assert len(storage['phone']) == 2 and len(storage['battery']) == 1
@@ -0,0 +1,40 @@
+"""Test delle serie temporali: bucket e parametri from/to in UTC"""
+
+from datetime import datetime, timezone
+
+import main
+from sentiment_store import TopicStore, ms_to_iso
+
+HOUR_MS = 3_600_000
+# 2025-11-01T10:00:00Z
+BASE_MS = int(datetime(2025, 11, 1, 10, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def test_ms_to_iso_is_utc_with_offset():
+    assert ms_to_iso(BASE_MS) == '2025-11-01T10:00:00+00:00'
+
+
+def test_naive_iso_params_are_utc():
+    assert main._parse_time_param('2025-11-01T10:00:00') == BASE_MS
+    assert main._parse_time_param('2025-11-01T12:00:00+02:00') == BASE_MS
+    assert main._parse_time_param(str(BASE_MS // 1000)) == BASE_MS
+
+
+def test_timeseries_endpoint_buckets_and_range(monkeypatch):
+    store = TopicStore()
+    store.append('positivo', 0.5, timestamp_ms=BASE_MS + 60_000)
+    store.append('negativo', -0.5, timestamp_ms=BASE_MS + 120_000)
+    store.append('neutro', 0.0, timestamp_ms=BASE_MS + HOUR_MS)
+    monkeypatch.setattr(main, 'sentiment_storage', {'series': store})
+
+    client = main.app.test_client()
+    series = client.get('/api/v1/stats/series/timeseries?interval=hour').get_json()['series']
+    assert [(b['start'], b['total']) for b in series] == [
+        ('2025-11-01T10:00:00+00:00', 2),
+        ('2025-11-01T11:00:00+00:00', 1),
+    ]
+    assert series[0]['avg_polarity'] == 0
+
+    response = client.get('/api/v1/stats/series/timeseries?interval=hour&from=2025-11-01T11:00:00')
+    assert [b['start'] for b in response.get_json()['series']] == ['2025-11-01T11:00:00+00:00']
+    assert client.get('/api/v1/stats/series/timeseries?interval=week').status_code == 400
@@ -1,22 +1,133 @@
 ### **`api_client.py`**
 
-import requests
 import configparser
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_type, datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fixture_cache import FixtureCache
+
+DEFAULT_BASE_URL = "https://api-football-v1.p.rapidapi.com/v3/"
+
 
 class FootballAPIClient:
-    def __init__(self):
+    def __init__(self, base_url: str = None, max_workers: int = None, cache: FixtureCache = None):
         config = configparser.ConfigParser()
         config.read('config.ini')
-        self.api_key = config['API']['key']
-        self.base_url = "https://api-football-v1.p.rapidapi.com/v3/"
+        api = config['API']
+        self.api_key = api['key']
+        self.base_url = base_url or api.get('base_url', DEFAULT_BASE_URL)
+        self.season = api.getint('season', fallback=2025)
+        # Limiti del provider: richieste concorrenti e richieste al secondo
+        self.max_workers = max_workers or api.getint('max_concurrency', fallback=4)
+        self.requests_per_second = api.getfloat('requests_per_second', fallback=5.0)
+        self.max_retries = api.getint('max_retries', fallback=5)
+        self.backoff = api.getfloat('backoff_seconds', fallback=1.0)
+        # Cache su disco delle partite (disattivata se cache_dir non è configurata)
+        if cache is None and api.get('cache_dir'):
+            cache = FixtureCache(api['cache_dir'], ttl=api.getfloat('cache_ttl', fallback=300),
+                                 tz=api.get('timezone', 'Europe/Rome'))
+        self.cache = cache
         self.headers = {
             "X-RapidAPI-Key": self.api_key,
             "X-RapidAPI-Host": "api-football-v1.p.rapidapi.com"
         }
 
-    def get_matches(self, league_id: int, date: str) -> dict:
-        """Recupera le partite della Serie A per una data specifica."""
-        endpoint = f"fixtures?league={league_id}&season=2025&date={date}"
-        response = requests.get(f"{self.base_url}{endpoint}", headers=self.headers)
+        # Sessione condivisa: connessioni keep-alive riutilizzate tra i thread
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Tetto globale alle richieste in volo, anche con più leghe elaborate in parallelo
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def _throttle(self) -> None:
+        """Distanzia le richieste per rispettare requests_per_second tra tutti i thread."""
+        if self.requests_per_second <= 0:
+            return
+        interval = 1.0 / self.requests_per_second
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> float:
+        """Rispetta Retry-After se presente, altrimenti backoff esponenziale con jitter."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    def _get(self, endpoint: str, params: dict, headers: dict = None) -> requests.Response:
+        """GET con throttling e retry/backoff sulle risposte 429."""
+        for attempt in range(self.max_retries + 1):
+            with self._slots:
+                self._throttle()
+                response = self.session.get(f"{self.base_url}{endpoint}", params=params,
+                                            headers=headers, timeout=30)
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            time.sleep(self._retry_delay(response, attempt))
         response.raise_for_status()
-        return response.json()
+        return response
+
+    def get_matches(self, league_id: int, date: str, season: int = None) -> dict:
+        """Recupera le partite della Serie A per una data specifica."""
+        season = season or self.season
+        params = {"league": league_id, "season": season, "date": date}
+        if self.cache is None:
+            return self._get("fixtures", params).json()
+
+        payload, entry = self.cache.lookup(league_id, season, date)
+        if payload is not None:
+            return payload
+        response = self._get("fixtures", params, self.cache.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            return self.cache.revalidate(league_id, season, date, entry)
+        payload = response.json()
+        self.cache.put(league_id, season, date, payload,
+                       etag=response.headers.get("ETag"),
+                       last_modified=response.headers.get("Last-Modified"))
+        return payload
+
+    def get_matches_range(self, league_id: int, season: int, start, end) -> dict:
+        """
+        Recupera in parallelo le partite di tutte le date tra start ed end (inclusi).
+
+        Le richieste condividono la sessione HTTP e sono limitate a max_workers
+        concorrenti e requests_per_second; le risposte 429 vengono ritentate.
+
+        Returns:
+            dict: {data 'YYYY-MM-DD': risposta API}, in ordine di data
+        """
+        start, end = _to_date(start), _to_date(end)
+        dates = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+        return self.get_matches_dates(league_id, season, dates)
+
+    def get_matches_dates(self, league_id: int, season: int, dates: list) -> dict:
+        """Recupera in parallelo le partite di un insieme di date (stessi limiti di get_matches_range)."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            responses = executor.map(lambda d: self.get_matches(league_id, d, season), dates)
+            return dict(zip(dates, responses))
+
+
+def _to_date(value) -> date_type:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
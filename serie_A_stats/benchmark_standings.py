@@ -0,0 +1,88 @@
+"""
+Benchmark: calculate_standings (dict per partita) vs percorso colonnare NumPy/pandas.
+
+Il percorso colonnare parte dal dataset Parquet: il frame viene caricato una volta
+(load_fixtures_frame, tempo riportato a parte) e riusato per tutti i calcoli di
+classifica. Il dataset viene scritto in una cartella temporanea, fuori dai tempi.
+
+Uso:
+    python benchmark_standings.py --fixtures 100000
+"""
+import argparse
+import random
+import tempfile
+import time
+from itertools import groupby
+
+from data_processor import calculate_standings
+from vectorized_standings import (
+    calculate_standings_vectorized, fixtures_to_frame, load_fixtures_frame, standings_frame
+)
+
+
+def synthetic_fixtures(n: int, teams: int = 20, seed: int = 42) -> list:
+    """Partite casuali su più leghe e stagioni (380 partite per stagione)."""
+    rng = random.Random(seed)
+    names = [f"Team {i:02d}" for i in range(teams)]
+    matches = []
+    for i in range(n):
+        home, away = rng.sample(names, 2)
+        matches.append({
+            'fixture': {'id': i},
+            'league': {'id': 135 + (i // 3800) % 5, 'season': 2000 + i // 380},
+            'teams': {'home': {'name': home}, 'away': {'name': away}},
+            'score': {'fulltime': f"{rng.randint(0, 4)}:{rng.randint(0, 4)}"},
+        })
+    return matches
+
+
+def timed(label: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed * 1000:>10.1f} ms")
+    return result, elapsed
+
+
+def write_dataset(matches: list, root: str) -> None:
+    """Dataset Parquet delle partite sintetiche: una partizione per lega e stagione."""
+    from parquet_exporter import export_to_parquet
+
+    def key(m):
+        return m['league']['id'], m['league']['season']
+
+    for (league_id, season), group in groupby(sorted(matches, key=key), key=key):
+        export_to_parquet(list(group), None, root, league_id, season, f"{season + 1}-05-31")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", type=int, default=100_000)
+    args = parser.parse_args()
+
+    matches = synthetic_fixtures(args.fixtures)
+    print(f"{args.fixtures} partite\n")
+
+    expected, t_dict = timed("calculate_standings (tabella unica)", calculate_standings, matches)
+    result, t_vec = timed("calculate_standings_vectorized", calculate_standings_vectorized, matches)
+    assert result == expected, "Il percorso colonnare non coincide con calculate_standings"
+
+    timed("fixtures_to_frame (conversione dei dict)", fixtures_to_frame, matches)
+
+    with tempfile.TemporaryDirectory() as root:
+        write_dataset(matches, root)
+        df, t_load = timed("load_fixtures_frame (dataset Parquet)", load_fixtures_frame, root)
+        table, t_frame = timed("standings_frame (tabella unica)", standings_frame, df, group_keys=())
+        timed("standings_frame per lega/stagione + scontri diretti", standings_frame, df, head_to_head=True)
+    totals = {team: (points, gd) for team, points, gd in zip(table['team'], table['points'], table['gd'])}
+    assert totals == {team: (t['points'], t['gd']) for team, t in expected}, \
+        "Il percorso da Parquet non coincide con calculate_standings"
+
+    print(f"\nAdattatore per dict (calculate_standings_vectorized): {t_dict / t_vec:.1f}x")
+    print(f"Frame caricato una volta, per classifica calcolata: {t_dict / t_frame:.1f}x")
+    if t_dict > t_frame:
+        print(f"Il caricamento del frame si ripaga dopo {t_load / (t_dict - t_frame):.1f} classifiche")
+
+
+if __name__ == "__main__":
+    main()
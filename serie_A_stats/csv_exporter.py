@@ -0,0 +1,41 @@
+import csv
+import os
+
+from data_processor import parse_result
+
+
+def scorers(match: dict) -> str:
+    """Marcatori della partita dagli eventi 'Goal', es. 'Gioc1 (J), Gioc2 (M)'."""
+    goals = [e for e in match.get('events', []) if e.get('type') == 'Goal']
+    return ", ".join(
+        f"{e.get('player', {}).get('name', '?')} ({e.get('team', {}).get('name', '?')[:1]})" for e in goals
+    )
+
+
+def export_to_csv(matches: list, standings: list, filename: str) -> str:
+    """
+    Esporta partite e classifica in un file CSV.
+
+    Le partite hanno le colonne Data, Squadra Casa, Squadra Ospite, Risultato e
+    Marcatori; dopo una riga vuota segue la classifica (formato calculate_standings).
+    """
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Data", "Squadra Casa", "Squadra Ospite", "Risultato", "Marcatori"])
+        for match in matches:
+            result = parse_result(match)
+            writer.writerow([
+                (match.get('fixture', {}).get('date') or "")[:10],
+                match['teams']['home']['name'],
+                match['teams']['away']['name'],
+                f"{result[2]}-{result[3]}" if result else "",
+                scorers(match),
+            ])
+        writer.writerow([])
+        writer.writerow(["Posizione", "Squadra", "Punti", "Differenza Reti"])
+        for position, (team, totals) in enumerate(standings, 1):
+            writer.writerow([position, team, totals['points'], totals['gd']])
+    return filename
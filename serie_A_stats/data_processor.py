@@ -1,23 +1,38 @@
+def parse_result(match: dict):
+    """Restituisce (squadra casa, squadra ospite, gol casa, gol ospite) o None se manca il risultato."""
+    score = match['score']['fulltime']
+    if not score:
+        return None
+    h_goals, a_goals = map(int, score.split(':'))
+    return match['teams']['home']['name'], match['teams']['away']['name'], h_goals, a_goals
+
+
+def apply_result(standings: dict, home: str, away: str, h_goals: int, a_goals: int) -> None:
+    """Applica il risultato di una singola partita alla classifica (delta)."""
+    # Aggiorna punti e differenza reti
+    standings.setdefault(home, {'points': 0, 'gd': 0})
+    standings.setdefault(away, {'points': 0, 'gd': 0})
+    if h_goals > a_goals:
+        standings[home]['points'] += 3
+    elif h_goals == a_goals:
+        standings[home]['points'] += 1
+        standings[away]['points'] += 1
+    else:
+        standings[away]['points'] += 3
+    standings[home]['gd'] += h_goals - a_goals
+    standings[away]['gd'] += a_goals - h_goals
+
+
+def sort_standings(standings: dict) -> list:
+    """Ordina per punti e differenza reti."""
+    return sorted(standings.items(), key=lambda x: (-x[1]['points'], -x[1]['gd']))
+
+
 def calculate_standings(matches: list) -> list:
     """Calcola la classifica aggiornata."""
     standings = {}
     for match in matches:
-        home = match['teams']['home']['name']
-        away = match['teams']['away']['name']
-        score = match['score']['fulltime']
-        if score:
-            h_goals, a_goals = map(int, score.split(':'))
-            # Aggiorna punti e differenza reti
-            standings.setdefault(home, {'points': 0, 'gd': 0})
-            standings.setdefault(away, {'points': 0, 'gd': 0})
-            if h_goals > a_goals:
-                standings[home]['points'] += 3
-            elif h_goals == a_goals:
-                standings[home]['points'] += 1
-                standings[away]['points'] += 1
-            else:
-                standings[away]['points'] += 3
-            standings[home]['gd'] += h_goals - a_goals
-            standings[away]['gd'] += a_goals - h_goals
-    # Ordina per punti e differenza reti
-    return sorted(standings.items(), key=lambda x: (-x[1]['points'], -x[1]['gd']))
+        result = parse_result(match)
+        if result:
+            apply_result(standings, *result)
+    return sort_standings(standings)
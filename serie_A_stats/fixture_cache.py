@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from datetime import date as date_type, datetime, timezone
+from zoneinfo import ZoneInfo
+
+from standings_store import is_finished
+
+# Stati definitivi per una data già passata: partita rinviata (e spostata su
+# un'altra data), cancellata o assegnata a tavolino
+SETTLED_STATUSES = {"PST", "CANC", "AWD", "WO"}
+
+
+def is_settled(match: dict) -> bool:
+    """True se la partita non verrà giocata in questa data (vedi SETTLED_STATUSES)."""
+    return match.get("fixture", {}).get("status", {}).get("short") in SETTLED_STATUSES
+
+
+class FixtureCache:
+    """
+    Cache su disco delle risposte /fixtures, per (lega, stagione, data).
+
+    Le giornate con tutte le partite concluse non cambiano più e restano in cache
+    per sempre, come le date passate senza partite (la maggior parte del calendario
+    in un backfill) o con partite rinviate, cancellate o assegnate a tavolino;
+    quelle in corso o future scadono dopo `ttl` secondi e vengono
+    rivalidate con richieste condizionali (ETag / Last-Modified) se l'API le supporta.
+    """
+
+    def __init__(self, directory: str = "cache", ttl: float = 300, tz: str = "Europe/Rome"):
+        self.directory = directory
+        self.ttl = ttl
+        # Fuso della lega per decidere quali date sono già passate
+        self.tz = ZoneInfo(tz)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+    def _path(self, league_id: int, season: int, date: str) -> str:
+        return os.path.join(self.directory, str(league_id), str(season), f"{date}.json")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, league_id: int, season: int, date: str):
+        """Restituisce la voce in cache (anche scaduta) o None."""
+        path = self._path(league_id, season, date)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def is_fresh(self, entry: dict) -> bool:
+        return entry["final"] or time.time() - entry["fetched_at"] < self.ttl
+
+    def lookup(self, league_id: int, season: int, date: str):
+        """
+        Cerca una risposta valida in cache.
+
+        Returns:
+            tuple: (payload o None se serve una richiesta, voce scaduta o None)
+        """
+        entry = self.get(league_id, season, date)
+        if entry is not None and self.is_fresh(entry):
+            self._count("hits")
+            return entry["payload"], entry
+        self._count("misses")
+        return None, entry
+
+    def conditional_headers(self, entry) -> dict:
+        """Header per la richiesta condizionale a partire da una voce scaduta."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_past(self, date: str) -> bool:
+        """True se la data è precedente a oggi sia nel fuso della lega sia in UTC (fuso del parametro date dell'API)."""
+        now = datetime.now(timezone.utc)
+        today = min(now.date(), now.astimezone(self.tz).date())
+        return date_type.fromisoformat(date) < today
+
+    def put(self, league_id: int, season: int, date: str, payload: dict,
+            etag: str = None, last_modified: str = None) -> dict:
+        """
+        Salva una risposta. È definitiva se non contiene errori e tutte le partite
+        sono concluse, oppure se la data è già passata e ogni partita è conclusa o
+        in uno stato definitivo (SETTLED_STATUSES), anche senza partite.
+        """
+        matches = payload.get("response", [])
+        if payload.get("errors"):
+            final = False
+        elif matches and all(is_finished(m) for m in matches):
+            final = True
+        else:
+            final = self.is_past(date) and all(is_finished(m) or is_settled(m) for m in matches)
+        entry = {
+            "payload": payload,
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "final": final,
+        }
+        self._write(self._path(league_id, season, date), entry)
+        return entry
+
+    def revalidate(self, league_id: int, season: int, date: str, entry: dict) -> dict:
+        """Risposta 304: la voce resta valida, si aggiorna solo l'istante di fetch."""
+        self._count("revalidated")
+        entry["fetched_at"] = time.time()
+        self._write(self._path(league_id, season, date), entry)
+        return entry["payload"]
+
+    def _write(self, path: str, entry: dict) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> dict:
+        """Contatori per monitorare il risparmio di quota API."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -1,22 +1,130 @@
 from api_client import FootballAPIClient
 from data_processor import calculate_standings
+from standings_store import StandingsStore
 from csv_exporter import export_to_csv
 import argparse
-from datetime import datetime
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+# Nome breve usato nei file di output (le altre leghe usano l'id)
+LEAGUE_NAMES = {135: "seriea", 136: "serieb"}
+
+
+def league_name(league_id: int) -> str:
+    return LEAGUE_NAMES.get(league_id, str(league_id))
+
+
+def date_range(start: str, end: str) -> list:
+    """Tutte le date tra start ed end (inclusi), formato YYYY-MM-DD."""
+    first = datetime.strptime(start, "%Y-%m-%d")
+    days = (datetime.strptime(end, "%Y-%m-%d") - first).days
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days + 1)]
+
+
+def process_league(client: FootballAPIClient, league_id: int, season: int, dates: list, args) -> dict:
+    """Scarica, calcola la classifica ed esporta una lega; restituisce i tempi delle fasi."""
+    timings = {"league": league_id}
+    start = time.perf_counter()
+    by_date = client.get_matches_dates(league_id, season, dates)
+    fixtures = [match for payload in by_date.values() for match in payload['response']]
+    timings["fixtures"] = len(fixtures)
+    timings["fetch"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if args.store:
+        # Classifica di stagione: applica solo le partite nuove e salva lo snapshot
+        store = StandingsStore(args.store.format(league=league_name(league_id)))
+        store.apply(fixtures)
+        store.save()
+        standings = store.table()
+    else:
+        standings = calculate_standings(fixtures)
+    timings["standings"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    last_date = dates[-1]
+    if args.format == "parquet":
+        # Import qui: pyarrow serve solo per l'export Parquet
+        from parquet_exporter import export_to_parquet
+        # Una partizione per data (riscrivibile); la classifica va nella partizione dell'ultima data
+        for day, payload in by_date.items():
+            export_to_parquet(payload['response'], standings if day == last_date else None,
+                              args.dataset, league_id, season, day)
+    else:
+        filename = f"output/risultati_{league_name(league_id)}_{last_date.replace('-', '')}.csv"
+        export_to_csv(fixtures, standings, filename)
+    timings["export"] = time.perf_counter() - start
+    return timings
+
+
+def print_summary(results: list) -> None:
+    """Riepilogo dei tempi per lega."""
+    print(f"\n{'Lega':<10} {'Partite':>8} {'Fetch (s)':>10} {'Classifica (s)':>15} {'Export (s)':>11} {'Totale (s)':>11}")
+    for r in sorted(results, key=lambda r: r["league"]):
+        total = r["fetch"] + r["standings"] + r["export"]
+        print(f"{league_name(r['league']):<10} {r['fixtures']:>8} {r['fetch']:>10.2f} "
+              f"{r['standings']:>15.3f} {r['export']:>11.3f} {total:>11.2f}")
+
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--date", type=str, default=datetime.now().strftime("%Y-%m-%d"),
                         help="Data delle partite (YYYY-MM-DD)")
+    parser.add_argument("--dates", type=str, nargs="+", default=None,
+                        help="Elenco di date da elaborare (alternativo a --date/--start)")
+    parser.add_argument("--leagues", type=int, nargs="+", default=[135],
+                        help="Id delle leghe da elaborare (135 = Serie A, 136 = Serie B)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Leghe elaborate in parallelo")
+    parser.add_argument("--store", type=str, default=None,
+                        help="Snapshot JSON della classifica incrementale, {league} viene sostituito "
+                             "(es. output/classifica_{league}.json)")
+    parser.add_argument("--start", type=str, default=None,
+                        help="Backfill: prima data dell'intervallo (YYYY-MM-DD), fino a --date")
+    parser.add_argument("--season", type=int, default=None,
+                        help="Stagione (default: season in config.ini)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="csv: un file per data; parquet: dataset partizionato lega/stagione/data")
+    parser.add_argument("--dataset", type=str, default="output/dataset",
+                        help="Radice del dataset Parquet (con --format parquet)")
     args = parser.parse_args()
+    # Una lega ripetuta non va elaborata due volte (stesso snapshot e stessi file)
+    args.leagues = list(dict.fromkeys(args.leagues))
+    if args.store and len(args.leagues) > 1 and "{league}" not in args.store:
+        # Un solo snapshot condiviso mescolerebbe le classifiche delle leghe
+        parser.error("con più --leagues il percorso di --store deve contenere {league}")
+
+    if args.dates:
+        dates = sorted(args.dates)
+    elif args.start:
+        dates = date_range(args.start, args.date)
+    else:
+        dates = [args.date]
 
+    # Client condiviso: il tetto di richieste concorrenti vale per tutte le leghe insieme
     client = FootballAPIClient()
-    matches = client.get_matches(league_id=135, date=args.date)  # 135 = Serie A
-    standings = calculate_standings(matches['response'])
+    season = args.season or client.season
+    results = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(process_league, client, league_id, season, dates, args): league_id
+                   for league_id in args.leagues}
+        for future in as_completed(futures):
+            league_id = futures[future]
+            try:
+                results.append(future.result())
+                print(f"Lega {league_name(league_id)} completata")
+            except Exception as e:
+                failed.append(league_id)
+                print(f"Errore nella lega {league_name(league_id)}: {e}")
 
-    filename = f"output/risultati_seriea_{args.date.replace('-', '')}.csv"
-    export_to_csv(matches['response'], standings, filename)
-    print(f"Dati esportati in {filename}")
+    print_summary(results)
+    if client.cache is not None:
+        print(f"Cache API: {client.cache.stats()}")
+    # Codice di uscita non nullo se almeno una lega è fallita
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from data_processor import parse_result
+
+PART_FILE = "part-0.parquet"
+
+
+def fixtures_table(matches: list) -> pa.Table:
+    """Partite in formato Arrow (gol nulli per le partite senza risultato)."""
+    rows = {'fixture_id': [], 'kickoff': [], 'status': [], 'home': [], 'away': [],
+            'home_goals': [], 'away_goals': []}
+    for match in matches:
+        fixture = match.get('fixture', {})
+        result = parse_result(match)
+        rows['fixture_id'].append(fixture.get('id'))
+        rows['kickoff'].append(fixture.get('date'))
+        rows['status'].append(fixture.get('status', {}).get('short'))
+        rows['home'].append(match['teams']['home']['name'])
+        rows['away'].append(match['teams']['away']['name'])
+        rows['home_goals'].append(result[2] if result else None)
+        rows['away_goals'].append(result[3] if result else None)
+    return pa.table({
+        'fixture_id': pa.array(rows['fixture_id'], pa.int64()),
+        'kickoff': pa.array(rows['kickoff'], pa.string()),
+        'status': pa.array(rows['status'], pa.string()),
+        'home': pa.array(rows['home'], pa.string()),
+        'away': pa.array(rows['away'], pa.string()),
+        'home_goals': pa.array(rows['home_goals'], pa.int16()),
+        'away_goals': pa.array(rows['away_goals'], pa.int16()),
+    })
+
+
+def standings_table(standings: list) -> pa.Table:
+    """Classifica (formato calculate_standings) in formato Arrow."""
+    return pa.table({
+        'position': pa.array(range(1, len(standings) + 1), pa.int16()),
+        'team': pa.array([team for team, _ in standings], pa.string()),
+        'points': pa.array([totals['points'] for _, totals in standings], pa.int16()),
+        'gd': pa.array([totals['gd'] for _, totals in standings], pa.int16()),
+    })
+
+
+def partition_dir(root: str, dataset: str, league_id: int, season: int, date: str) -> str:
+    """Percorso della partizione hive-style lega/stagione/data."""
+    return os.path.join(root, dataset, f"league={league_id}", f"season={season}", f"date={date}")
+
+
+def write_partition(table: pa.Table, path: str) -> str:
+    """
+    Scrive (o riscrive) una partizione in modo idempotente.
+
+    Il file viene scritto con nome temporaneo e poi rinominato atomicamente sul nome
+    fisso della partizione, quindi rieseguire l'export della stessa data lo sostituisce.
+    """
+    os.makedirs(path, exist_ok=True)
+    target = os.path.join(path, PART_FILE)
+    tmp_path = os.path.join(path, f".{uuid.uuid4().hex}.tmp")
+    # Lega, stagione e data sono nel percorso della partizione, non nel file
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, target)
+    return target
+
+
+def export_to_parquet(matches: list, standings: list, root: str,
+                      league_id: int, season: int, date: str) -> str:
+    """Aggiunge partite e (se fornita) classifica della data al dataset partizionato."""
+    write_partition(fixtures_table(matches),
+                    partition_dir(root, "fixtures", league_id, season, date))
+    if standings is not None:
+        write_partition(standings_table(standings),
+                        partition_dir(root, "standings", league_id, season, date))
+    return os.path.join(root, "fixtures")
+
+
+def read_season(root: str, league_id: int, season: int, dataset: str = "fixtures") -> pa.Table:
+    """Legge una stagione con una sola scansione (le altre partizioni vengono saltate)."""
+    data = ds.dataset(os.path.join(root, dataset), format="parquet", partitioning="hive")
+    return data.to_table(filter=(ds.field("league") == league_id) & (ds.field("season") == season))
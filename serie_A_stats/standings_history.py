@@ -0,0 +1,67 @@
+from bisect import bisect_right
+
+from data_processor import parse_result, apply_result, sort_standings
+
+
+def match_date(match: dict) -> str:
+    """Data della partita (YYYY-MM-DD) dal timestamp ISO di API-FOOTBALL."""
+    return match['fixture']['date'][:10]
+
+
+class StandingsHistory:
+    """
+    Indice dei totali cumulativi per giornata (data).
+
+    Le partite vengono riapplicate una sola volta in ordine di data; per ogni data si
+    conserva la classifica risultante, così "classifica al giorno X" e "andamento della
+    posizione della squadra T" sono semplici lookup invece di un replay completo.
+    """
+
+    def __init__(self, matches: list):
+        by_date = {}
+        for match in matches:
+            result = parse_result(match)
+            if result:
+                by_date.setdefault(match_date(match), []).append(result)
+
+        self.dates = sorted(by_date)
+        self.tables = []
+        self.positions = {}
+        standings = {}
+        for index, day in enumerate(self.dates):
+            for result in by_date[day]:
+                apply_result(standings, *result)
+            table = tuple(
+                (team, totals['points'], totals['gd']) for team, totals in sort_standings(standings)
+            )
+            self.tables.append(table)
+            for position, (team, _, _) in enumerate(table, start=1):
+                self.positions.setdefault(team, [None] * len(self.dates))[index] = position
+
+    def _index(self, date: str) -> int:
+        """Indice dell'ultima giornata disputata entro la data (inclusa), -1 se nessuna."""
+        return bisect_right(self.dates, date) - 1
+
+    def standings_at(self, date: str) -> list:
+        """Classifica alla data indicata, nello stesso formato di calculate_standings."""
+        index = self._index(date)
+        if index < 0:
+            return []
+        return [(team, {'points': points, 'gd': gd}) for team, points, gd in self.tables[index]]
+
+    def position_at(self, team: str, date: str):
+        """Posizione della squadra alla data indicata (None se non ha ancora giocato)."""
+        index = self._index(date)
+        if index < 0 or team not in self.positions:
+            return None
+        return self.positions[team][index]
+
+    def position_history(self, team: str) -> list:
+        """
+        Andamento della posizione di una squadra, per grafici.
+
+        Returns:
+            list: Coppie (data, posizione) per ogni giornata da quando la squadra è in classifica
+        """
+        history = self.positions.get(team, [])
+        return [(day, pos) for day, pos in zip(self.dates, history) if pos is not None]
@@ -0,0 +1,84 @@
+import json
+import os
+
+from data_processor import parse_result, apply_result, sort_standings
+
+# Stati API-FOOTBALL di una partita conclusa (risultato definitivo)
+FINISHED_STATUSES = {'FT', 'AET', 'PEN'}
+
+
+def fixture_key(match: dict) -> str:
+    """Chiave univoca della partita: id API-FOOTBALL, altrimenti data + squadre."""
+    fixture = match.get('fixture', {})
+    if fixture.get('id') is not None:
+        return str(fixture['id'])
+    return f"{fixture.get('date', '')}|{match['teams']['home']['name']}|{match['teams']['away']['name']}"
+
+
+def is_finished(match: dict) -> bool:
+    """True se la partita è terminata e il risultato non può più cambiare."""
+    status = match.get('fixture', {}).get('status', {}).get('short')
+    if status is None:
+        # Payload senza stato: ci si affida alla presenza del risultato finale
+        return bool(match['score']['fulltime'])
+    return status in FINISHED_STATUSES
+
+
+class StandingsStore:
+    """
+    Classifica persistente aggiornata in modo incrementale.
+
+    Ogni partita conclusa viene applicata una sola volta come delta (chiave: id partita);
+    lo stato viene salvato su disco tra un'esecuzione e l'altra, quindi un aggiornamento
+    costa O(nuove partite) invece di O(stagione).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.standings = {}
+        self.applied = set()
+        self.load()
+
+    def load(self) -> None:
+        """Carica lo snapshot salvato, se presente."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        self.standings = snapshot['standings']
+        self.applied = set(snapshot['applied'])
+
+    def save(self) -> None:
+        """Salva lo snapshot in modo atomico (file temporaneo + rename)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'standings': self.standings, 'applied': sorted(self.applied)}, f)
+        os.replace(tmp_path, self.path)
+
+    def apply(self, matches: list) -> int:
+        """
+        Applica le partite concluse non ancora registrate.
+
+        Returns:
+            int: Numero di partite applicate in questa chiamata
+        """
+        applied = 0
+        for match in matches:
+            if not is_finished(match):
+                continue
+            key = fixture_key(match)
+            if key in self.applied:
+                continue
+            result = parse_result(match)
+            if result:
+                apply_result(self.standings, *result)
+                self.applied.add(key)
+                applied += 1
+        return applied
+
+    def table(self) -> list:
+        """Classifica ordinata, nello stesso formato di calculate_standings."""
+        return sort_standings(self.standings)
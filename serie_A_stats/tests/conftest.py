@@ -0,0 +1,24 @@
+"""
+Configurazione dei test di serie_A_stats.
+
+I moduli del progetto diventano importabili; main.py viene caricato con un nome
+proprio (fixture `cli`) per non confondersi con altri main.py del repository.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
+
+
+@pytest.fixture
+def cli():
+    spec = importlib.util.spec_from_file_location("serie_a_main", os.path.join(PROJECT_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,12 @@
+"""Partite di prova per i test di serie_A_stats"""
+
+
+def make_match(fixture_id, home, away, score, date="2025-09-01T18:00:00+00:00",
+               status="FT", league=135, season=2025):
+    """Partita nel formato della risposta /fixtures usato dal progetto."""
+    return {
+        'fixture': {'id': fixture_id, 'date': date, 'status': {'short': status}},
+        'league': {'id': league, 'season': season},
+        'teams': {'home': {'name': home}, 'away': {'name': away}},
+        'score': {'fulltime': score},
+    }
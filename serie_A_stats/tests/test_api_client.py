@@ -0,0 +1,86 @@
+"""Test del backfill concorrente di FootballAPIClient (HTTP simulato)"""
+
+import threading
+
+import pytest
+
+from api_client import FootballAPIClient
+from match_factory import make_match
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """Risponde per data; la prima richiesta di ogni data in `throttled` riceve un 429"""
+
+    def __init__(self, throttled=(), status='FT'):
+        self.calls = []
+        self.status = status
+        self.throttled = set(throttled)
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        date = params['date']
+        with self.lock:
+            self.calls.append((date, headers or {}))
+            if date in self.throttled:
+                self.throttled.discard(date)
+                return FakeResponse(429, headers={'Retry-After': '0'})
+        if headers and headers.get('If-None-Match') == '"v1"':
+            return FakeResponse(304)
+        payload = {'response': [make_match(int(date[-2:]), 'Inter', 'Milan', '2:1', date=date, status=self.status)], 'errors': []}
+        return FakeResponse(200, payload, headers={'ETag': '"v1"'})
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def build(cache_dir='', **session_args):
+        (tmp_path / 'config.ini').write_text(
+            "[API]\nkey = test\nseason = 2025\nmax_concurrency = 3\nrequests_per_second = 0\n"
+            f"backoff_seconds = 0\ncache_dir = {cache_dir}\ncache_ttl = 0\n",
+            encoding='utf-8'
+        )
+        client = FootballAPIClient()
+        client.session = FakeSession(**session_args)
+        return client
+    return build
+
+
+def test_range_returns_every_date_in_order_and_retries_429(make_client):
+    client = make_client(throttled={'2025-09-02'})
+    responses = client.get_matches_range(135, 2025, '2025-09-01', '2025-09-05')
+    assert list(responses) == [f'2025-09-0{day}' for day in range(1, 6)]
+    assert all(r['response'][0]['fixture']['date'] == d for d, r in responses.items())
+    # Una richiesta per data più il tentativo rifiutato con 429
+    assert len(client.session.calls) == 6
+
+
+def test_finished_matchday_is_served_from_cache(make_client):
+    client = make_client(cache_dir='cache')
+    first = client.get_matches(135, '2025-09-01')
+    assert client.get_matches(135, '2025-09-01') == first
+    assert len(client.session.calls) == 1
+    assert client.cache.stats()['hits'] == 1
+
+
+def test_cache_revalidates_expired_entries_with_etag(make_client):
+    client = make_client(cache_dir='cache', status='NS')
+    first = client.get_matches(135, '2999-01-01')
+    # Partita da giocare e TTL 0: la voce è scaduta, la richiesta è condizionale e riceve 304
+    assert client.get_matches(135, '2999-01-01') == first
+    assert client.session.calls[-1][1] == {'If-None-Match': '"v1"'}
+    assert client.cache.revalidated == 1
@@ -0,0 +1,62 @@
+"""Test della CLI multi-lega (main.py)"""
+
+import sys
+
+import pytest
+
+from match_factory import make_match
+
+
+class FakeClient:
+    season = 2025
+    cache = None
+
+    def get_matches_dates(self, league_id, season, dates):
+        if league_id == 999:
+            raise RuntimeError("lega non disponibile")
+        return {d: {'response': [make_match(league_id, 'Juventus', 'Milan', '2:1')]} for d in dates}
+
+
+@pytest.fixture
+def run(cli, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, 'FootballAPIClient', FakeClient)
+
+    def run_cli(*argv):
+        monkeypatch.setattr(sys, 'argv', ['main.py', *argv])
+        return cli.main()
+    return run_cli
+
+
+def test_date_range_is_inclusive(cli):
+    assert cli.date_range("2025-12-30", "2026-01-02") == ["2025-12-30", "2025-12-31", "2026-01-01", "2026-01-02"]
+
+
+def test_store_requires_league_placeholder(run):
+    with pytest.raises(SystemExit):
+        run('--leagues', '135', '136', '--store', 'classifica.json')
+
+
+def test_repeated_league_runs_once(run, cli, monkeypatch, tmp_path):
+    calls = []
+    original = cli.process_league
+    monkeypatch.setattr(cli, 'process_league', lambda *a: calls.append(a[1]) or original(*a))
+    assert run('--leagues', '135', '135', '--date', '2025-09-01', '--store', str(tmp_path / 'c.json')) == 0
+    assert calls == [135]
+
+
+def test_exit_status_reports_failed_leagues(run, tmp_path):
+    assert run('--leagues', '135', '999', '--date', '2025-09-01') == 1
+    assert (tmp_path / 'output' / 'risultati_seriea_20250901.csv').exists()
+
+
+def test_csv_export(tmp_path):
+    from csv_exporter import export_to_csv
+
+    match = make_match(1, 'Juventus', 'Milan', '2:1')
+    match['events'] = [{'type': 'Goal', 'player': {'name': 'Gioc1'}, 'team': {'name': 'Juventus'}},
+                       {'type': 'Card', 'player': {'name': 'X'}, 'team': {'name': 'Milan'}}]
+    path = export_to_csv([match], [('Juventus', {'points': 3, 'gd': 1})], str(tmp_path / 'out' / 'r.csv'))
+    lines = open(path, encoding='utf-8').read().splitlines()
+    assert lines[1] == '2025-09-01,Juventus,Milan,2-1,Gioc1 (J)'
+    assert lines[-1] == '1,Juventus,3,1'
@@ -0,0 +1,50 @@
+"""Test della cache delle risposte /fixtures: quali giornate diventano definitive"""
+
+import pytest
+
+from fixture_cache import FixtureCache
+from match_factory import make_match
+
+NO_SCORE = {'home': None, 'away': None}
+PAST, FUTURE = "2020-01-05", "2999-01-05"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FixtureCache(str(tmp_path), ttl=300)
+
+
+def _payload(*matches, errors=None):
+    return {"response": list(matches), "errors": errors or []}
+
+
+def test_finished_matchday_is_final_on_any_date(cache):
+    payload = _payload(make_match(1, "Inter", "Milan", {'home': 2, 'away': 1}))
+    assert cache.put(135, 2025, FUTURE, payload)["final"]
+
+
+@pytest.mark.parametrize("status", ["PST", "CANC", "AWD", "WO"])
+def test_settled_statuses_are_final_only_on_past_dates(cache, status):
+    payload = _payload(
+        make_match(1, "Inter", "Milan", {'home': 2, 'away': 1}),
+        make_match(2, "Roma", "Lazio", NO_SCORE, status=status),
+    )
+    assert cache.put(135, 2025, PAST, payload)["final"]
+    assert not cache.put(135, 2025, FUTURE, payload)["final"]
+
+
+def test_open_matches_and_errors_are_not_final(cache):
+    live = _payload(make_match(1, "Inter", "Milan", {'home': 0, 'away': 0}, status="2H"))
+    assert not cache.put(135, 2025, PAST, live)["final"]
+    assert not cache.put(135, 2025, PAST, _payload(errors={"rateLimit": "too many"}))["final"]
+    assert cache.put(135, 2025, PAST, _payload())["final"]
+    assert not cache.put(135, 2025, FUTURE, _payload())["final"]
+
+
+def test_lookup_counts_hits_and_misses(cache):
+    assert cache.lookup(135, 2025, PAST) == (None, None)
+    cache.put(135, 2025, PAST, _payload(), etag='"v1"')
+    payload, entry = cache.lookup(135, 2025, PAST)
+    assert payload == _payload() and entry["etag"] == '"v1"'
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
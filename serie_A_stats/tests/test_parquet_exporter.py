@@ -0,0 +1,42 @@
+"""Test del dataset Parquet partizionato per lega/stagione/data"""
+
+import os
+
+from data_processor import calculate_standings
+from match_factory import make_match
+from parquet_exporter import export_to_parquet, read_season
+from vectorized_standings import load_fixtures_frame, standings_frame
+
+DAY_1 = [make_match(1, 'Inter', 'Milan', '2:1'), make_match(2, 'Roma', 'Lazio', None, status='PST')]
+DAY_2 = [make_match(3, 'Milan', 'Roma', '0:0', date='2025-09-08T18:00:00+00:00')]
+
+
+def test_round_trip_and_idempotent_rewrite(tmp_path):
+    root = str(tmp_path)
+    export_to_parquet(DAY_1, calculate_standings(DAY_1), root, 135, 2025, '2025-09-01')
+    export_to_parquet([make_match(3, 'Milan', 'Roma', '1:0')], None, root, 135, 2025, '2025-09-08')
+    # Riesportare la stessa data sostituisce la partizione invece di duplicarla
+    export_to_parquet(DAY_2, None, root, 135, 2025, '2025-09-08')
+    export_to_parquet(DAY_2, None, root, 136, 2025, '2025-09-08')
+
+    fixtures = read_season(root, 135, 2025).sort_by('fixture_id')
+    assert fixtures['fixture_id'].to_pylist() == [1, 2, 3]
+    assert fixtures['home_goals'].to_pylist() == [2, None, 0]
+    assert fixtures['status'].to_pylist() == ['FT', 'PST', 'FT']
+    standings = read_season(root, 135, 2025, dataset='standings')
+    assert standings['team'].to_pylist() == ['Inter', 'Milan']
+    leftovers = [name for _, _, files in os.walk(root) for name in files if name.endswith('.tmp')]
+    assert leftovers == []
+
+
+def test_columnar_standings_from_dataset(tmp_path):
+    root = str(tmp_path)
+    export_to_parquet(DAY_1, None, root, 135, 2025, '2025-09-01')
+    export_to_parquet(DAY_2, None, root, 135, 2025, '2025-09-08')
+    export_to_parquet(DAY_2, None, root, 136, 2024, '2025-09-08')
+
+    frame = load_fixtures_frame(root, leagues=[135], seasons=[2025])
+    assert len(frame) == 2  # la partita rinviata non ha risultato
+    table = standings_frame(frame)
+    expected = calculate_standings(DAY_1 + DAY_2)
+    assert list(zip(table['team'], table['points'])) == [(team, s['points']) for team, s in expected]
@@ -0,0 +1,31 @@
+"""Test delle classifiche per giornata (StandingsHistory) contro il replay completo"""
+
+from benchmark_standings import synthetic_fixtures
+from data_processor import calculate_standings
+from match_factory import make_match
+from standings_history import StandingsHistory, match_date
+
+
+def test_standings_at_matches_replay_up_to_date():
+    matches = synthetic_fixtures(200, teams=10, seed=5)
+    for i, match in enumerate(matches):
+        match['fixture']['date'] = f"2025-{9 + i // 100:02d}-{1 + i % 25:02d}T18:00:00+00:00"
+    history = StandingsHistory(matches)
+
+    for day in ('2025-09-01', '2025-09-13', '2025-10-25', '2025-12-31'):
+        played = [m for m in matches if match_date(m) <= day]
+        assert history.standings_at(day) == calculate_standings(sorted(played, key=match_date))
+    assert history.standings_at('2025-08-31') == []
+
+
+def test_position_lookups():
+    history = StandingsHistory([
+        make_match(1, 'Inter', 'Milan', '2:0', date='2025-09-01T18:00:00+00:00'),
+        make_match(2, 'Roma', 'Lazio', '0:0', date='2025-09-08T18:00:00+00:00'),
+        make_match(3, 'Milan', 'Roma', '3:0', date='2025-09-15T18:00:00+00:00'),
+    ])
+    assert history.position_at('Milan', '2025-09-07') == 2
+    assert history.position_at('Milan', '2025-09-20') == 2
+    assert history.position_at('Roma', '2025-09-01') is None
+    assert history.position_at('Juventus', '2025-09-20') is None
+    assert history.position_history('Roma') == [('2025-09-08', 2), ('2025-09-15', 4)]
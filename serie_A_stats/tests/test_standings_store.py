@@ -0,0 +1,46 @@
+"""Test della classifica incrementale persistente"""
+
+from data_processor import calculate_standings
+from match_factory import make_match
+from standings_store import StandingsStore, fixture_key, is_finished
+
+ROUND_1 = [
+    make_match(1, 'Inter', 'Milan', '2:1'),
+    make_match(2, 'Juventus', 'Roma', '0:0'),
+]
+ROUND_2 = [
+    make_match(3, 'Milan', 'Juventus', '1:3'),
+    make_match(4, 'Roma', 'Inter', '1:1'),
+    make_match(5, 'Napoli', 'Lazio', '1:0', status='2H'),
+]
+
+
+def test_incremental_updates_match_full_recompute(tmp_path):
+    path = str(tmp_path / 'standings.json')
+    store = StandingsStore(path)
+    assert store.apply(ROUND_1) == 2
+    store.save()
+
+    # Nuova esecuzione: lo stato viene ricaricato e le partite già applicate ignorate
+    store = StandingsStore(path)
+    assert store.apply(ROUND_1 + ROUND_2) == 2
+    finished = [m for m in ROUND_1 + ROUND_2 if is_finished(m)]
+    assert store.table() == calculate_standings(finished)
+    assert len(store.applied) == 4
+
+
+def test_live_match_is_applied_once_finished(tmp_path):
+    store = StandingsStore(str(tmp_path / 'standings.json'))
+    live = make_match(5, 'Napoli', 'Lazio', '1:0', status='2H')
+    assert store.apply([live]) == 0
+    assert store.apply([make_match(5, 'Napoli', 'Lazio', '2:0')]) == 1
+    assert dict(store.table())['Napoli'] == {'points': 3, 'gd': 2}
+
+
+def test_fixture_key_and_status_fallbacks():
+    match = make_match(None, 'Inter', 'Milan', '2:1', date='2025-09-01')
+    assert fixture_key(match) == '2025-09-01|Inter|Milan'
+    del match['fixture']['status']
+    assert is_finished(match)
+    match['score']['fulltime'] = None
+    assert not is_finished(match)
@@ -0,0 +1,48 @@
+"""Test delle classifiche vettoriali: equivalenza con calculate_standings e spareggi"""
+
+from itertools import groupby
+
+from benchmark_standings import synthetic_fixtures
+from data_processor import calculate_standings
+from match_factory import make_match
+from vectorized_standings import calculate_standings_vectorized, fixtures_to_frame, standings_frame
+
+
+def _matches(*results):
+    return [make_match(i, home, away, score) for i, (home, away, score) in enumerate(results, 1)]
+
+
+def test_same_table_and_order_as_calculate_standings():
+    matches = synthetic_fixtures(760, teams=8, seed=7)
+    matches[3]['score']['fulltime'] = None  # partita senza risultato: ignorata da entrambi
+    assert calculate_standings_vectorized(matches) == calculate_standings(matches)
+
+
+def test_head_to_head_decides_ties_on_points():
+    matches = _matches(
+        ('A', 'B', '1:0'), ('A', 'C', '0:0'), ('B', 'C', '5:0'), ('B', 'D', '0:0'),
+    )
+    assert [team for team, _ in calculate_standings_vectorized(matches)] == ['B', 'A', 'D', 'C']
+    # A ha battuto B; C e D non si sono affrontate: decide la differenza reti
+    assert [team for team, _ in calculate_standings_vectorized(matches, head_to_head=True)] == ['A', 'B', 'D', 'C']
+
+
+def test_goals_scored_break_remaining_ties():
+    matches = _matches(('Y', 'X', '1:1'), ('X', 'Z', '3:1'), ('Y', 'Z', '2:0'))
+    table = calculate_standings_vectorized(matches, head_to_head=True)
+    assert [team for team, _ in table] == ['X', 'Y', 'Z']
+    assert table[0][1] == table[1][1] == {'points': 4, 'gd': 2}
+
+
+def test_standings_frame_separates_league_and_season():
+    matches = synthetic_fixtures(1140, teams=6, seed=3)
+    table = standings_frame(fixtures_to_frame(matches))
+    for (league, season), rows in groupby(
+        zip(table['league'], table['season'], table['team'], table['points'], table['position']),
+        key=lambda row: row[:2]
+    ):
+        rows = list(rows)
+        group = [m for m in matches if (m['league']['id'], m['league']['season']) == (league, season)]
+        expected = calculate_standings(group)
+        assert [(team, points) for _, _, team, points, _ in rows] == [(t, s['points']) for t, s in expected]
+        assert [position for *_, position in rows] == list(range(1, len(rows) + 1))
@@ -0,0 +1,167 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+GROUP_KEYS = ('league', 'season')
+
+
+def fixtures_to_frame(matches: list) -> pd.DataFrame:
+    """
+    Carica le partite con risultato in formato colonnare.
+
+    Returns:
+        DataFrame: colonne league, season, home, away, home_goals, away_goals
+    """
+    played = [m for m in matches if m['score']['fulltime']]
+    leagues = [m.get('league', {}) for m in played]
+    # Parsing vettoriale del risultato "casa:ospite": una sola split su tutta la colonna
+    goals = np.array(':'.join(m['score']['fulltime'] for m in played).split(':') if played else [],
+                     dtype=np.int64).reshape(-1, 2)
+    return pd.DataFrame({
+        'league': np.array([l.get('id', -1) for l in leagues], dtype=np.int64),
+        'season': np.array([l.get('season', -1) for l in leagues], dtype=np.int64),
+        'home': np.array([m['teams']['home']['name'] for m in played], dtype=object),
+        'away': np.array([m['teams']['away']['name'] for m in played], dtype=object),
+        'home_goals': goals[:, 0],
+        'away_goals': goals[:, 1],
+    })
+
+
+def load_fixtures_frame(root: str, leagues=None, seasons=None) -> pd.DataFrame:
+    """
+    Carica le partite con risultato dal dataset Parquet di parquet_exporter.
+
+    È il punto d'ingresso del percorso colonnare: le colonne arrivano già tipizzate
+    da Arrow, senza passare dai dict JSON, e lega/stagione vengono dalle partizioni
+    (le altre partizioni non vengono lette). Richiede pyarrow.
+
+    Args:
+        root: Radice del dataset (es. output/dataset)
+        leagues: Id delle leghe da leggere (default: tutte)
+        seasons: Stagioni da leggere (default: tutte)
+
+    Returns:
+        DataFrame: stesse colonne di fixtures_to_frame
+    """
+    import pyarrow.dataset as ds
+
+    data = ds.dataset(os.path.join(root, "fixtures"), format="parquet", partitioning="hive")
+    condition = ds.field('home_goals').is_valid() & ds.field('away_goals').is_valid()
+    if leagues is not None:
+        condition &= ds.field('league').isin(list(leagues))
+    if seasons is not None:
+        condition &= ds.field('season').isin(list(seasons))
+    table = data.to_table(columns=['league', 'season', 'home', 'away', 'home_goals', 'away_goals'],
+                          filter=condition)
+    return pd.DataFrame({
+        'league': table['league'].to_numpy().astype(np.int64),
+        'season': table['season'].to_numpy().astype(np.int64),
+        'home': table['home'].to_numpy(zero_copy_only=False),
+        'away': table['away'].to_numpy(zero_copy_only=False),
+        'home_goals': table['home_goals'].to_numpy().astype(np.int64),
+        'away_goals': table['away_goals'].to_numpy().astype(np.int64),
+    })
+
+
+def _points(goals_for: np.ndarray, goals_against: np.ndarray) -> np.ndarray:
+    return np.where(goals_for > goals_against, 3, np.where(goals_for == goals_against, 1, 0))
+
+
+def standings_frame(df: pd.DataFrame, group_keys=GROUP_KEYS, head_to_head: bool = False) -> pd.DataFrame:
+    """
+    Classifiche per ogni gruppo (default: lega e stagione) con operazioni vettoriali.
+
+    Args:
+        df: Partite in formato colonnare (vedi fixtures_to_frame)
+        group_keys: Colonne che identificano una classifica separata
+        head_to_head: Se True, a parità di punti si applicano gli scontri diretti
+            (punti, poi differenza reti) prima di differenza reti e gol fatti
+
+    Returns:
+        DataFrame: una riga per squadra, ordinata per gruppo e posizione
+    """
+    keys = list(group_keys)
+    n = len(df)
+    home_goals = df['home_goals'].to_numpy(dtype=np.int64)
+    away_goals = df['away_goals'].to_numpy(dtype=np.int64)
+
+    # Codici interi: squadre in ordine di prima apparizione (casa, ospite, casa, ...)
+    # come l'inserimento nel dict di calculate_standings
+    names = np.empty(2 * n, dtype=object)
+    names[0::2] = df['home'].to_numpy()
+    names[1::2] = df['away'].to_numpy()
+    team_codes, teams = pd.factorize(names)
+    home_team, away_team = team_codes[0::2], team_codes[1::2]
+    # Codice di gruppo combinando i codici delle singole colonne chiave
+    group_codes = np.zeros(n, dtype=np.int64)
+    for key in keys:
+        codes, uniques = pd.factorize(df[key].to_numpy())
+        group_codes = group_codes * max(len(uniques), 1) + codes
+    group_codes, _ = pd.factorize(group_codes)
+
+    # Chiave (gruppo, squadra) -> indice denso per le somme con bincount
+    n_teams = max(len(teams), 1)
+    keys_interleaved = np.empty(2 * n, dtype=np.int64)
+    keys_interleaved[0::2] = group_codes * n_teams + home_team
+    keys_interleaved[1::2] = group_codes * n_teams + away_team
+    slot_codes, slots = pd.factorize(keys_interleaved)
+    home_slot, away_slot = slot_codes[0::2], slot_codes[1::2]
+    size = len(slots)
+
+    def totals(mask=None):
+        """Punti, differenza reti e gol fatti per (gruppo, squadra) sulle partite selezionate."""
+        h, a, hg, ag = home_slot, away_slot, home_goals, away_goals
+        if mask is not None:
+            h, a, hg, ag = h[mask], a[mask], hg[mask], ag[mask]
+        points = (np.bincount(h, _points(hg, ag), size) + np.bincount(a, _points(ag, hg), size))
+        gd = np.bincount(h, hg - ag, size) - np.bincount(a, hg - ag, size)
+        gf = np.bincount(h, hg, size) + np.bincount(a, ag, size)
+        return points.astype(np.int64), gd.astype(np.int64), gf.astype(np.int64)
+
+    points, gd, gf = totals()
+    slot_group, slot_team = np.divmod(slots, n_teams)
+    first = np.arange(size)  # gli slot sono già in ordine di prima apparizione
+
+    # Valori delle chiavi di gruppo dalla prima partita di ciascun gruppo
+    first_match = np.full(group_codes.max() + 1 if n else 0, n, dtype=np.int64)
+    np.minimum.at(first_match, group_codes, np.arange(n))
+    columns = {key: df[key].to_numpy()[first_match[slot_group]] for key in keys}
+    columns.update(team=np.asarray(teams, dtype=object)[slot_team], points=points, gd=gd, gf=gf)
+
+    # Ordinamento con lexsort: l'ultima chiave è la principale
+    order_keys = [first]
+    if head_to_head:
+        # Mini-classifica tra squadre a pari punti nello stesso gruppo
+        tied = points[home_slot] == points[away_slot]
+        h2h_points, h2h_gd, _ = totals(tied)
+        columns.update(h2h_points=h2h_points, h2h_gd=h2h_gd)
+        order_keys += [-gf, -gd, -h2h_gd, -h2h_points]
+    else:
+        order_keys += [-gd]
+    order_keys += [-points, slot_group]
+    order = np.lexsort(order_keys)
+
+    table = pd.DataFrame({name: values[order] for name, values in columns.items()})
+    sorted_groups = slot_group[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_groups)) + 1]
+    table['position'] = np.arange(size) - np.repeat(starts, np.diff(np.r_[starts, size])) + 1 if size else []
+    return table
+
+
+def calculate_standings_vectorized(matches: list, head_to_head: bool = False) -> list:
+    """
+    Adattatore per le partite in formato JSON: stesso risultato (formato e ordine) di
+    calculate_standings, con in più gli spareggi opzionali.
+
+    Non è più veloce di calculate_standings: la conversione dei dict in colonne costa
+    quanto il calcolo stesso. Il guadagno si ha quando i dati sono già colonnari
+    (load_fixtures_frame + standings_frame).
+
+    Con head_to_head=True a parità di punti decidono scontri diretti, differenza reti e gol fatti.
+    """
+    table = standings_frame(fixtures_to_frame(matches), group_keys=(), head_to_head=head_to_head)
+    return [
+        (team, {'points': points, 'gd': gd})
+        for team, points, gd in zip(table['team'], table['points'].tolist(), table['gd'].tolist())
+    ]